@@ -0,0 +1,363 @@
+# api/cassette.py
+"""
+요청/응답 카세트 모듈
+실제 백엔드로 보낸 요청과 응답을 타이밍 정보와 함께 gzip JSONL 카세트에 기록(record)하고,
+나중에 네트워크 없이 카세트의 응답을 그대로 재생(replay)합니다.
+재생 시 기록된 지연을 재현할 수 있어, 실제 실행을 오프라인에서 같은 결과로 다시 돌려
+파싱/매칭/저장 단계를 프로파일링할 수 있습니다.
+
+사용: config["llm"]["cassette"] 또는 환경 변수
+    LLM_CASSETTE_MODE=record|replay, LLM_CASSETTE_PATH=경로, LLM_CASSETTE_REPLAY_LATENCY=1
+"""
+import asyncio
+import atexit
+import gzip
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+from api.response_cache import ResponseCache
+from api.token_accounting import usage_from_response
+from utils.config import config
+from utils.logger import logger
+
+CASSETTE_MODES = ("record", "replay")
+MODE_ENV_VAR = "LLM_CASSETTE_MODE"
+PATH_ENV_VAR = "LLM_CASSETTE_PATH"
+REPLAY_LATENCY_ENV_VAR = "LLM_CASSETTE_REPLAY_LATENCY"
+DEFAULT_CASSETTE_PATH = os.path.join("data", "cassettes", "gemini.jsonl.gz")
+
+
+class CassetteMiss(LookupError):
+    """재생 중 카세트에 없는 요청을 받은 경우"""
+
+
+def get_cassette_settings():
+    """
+    카세트 설정 (환경 변수가 config["llm"]["cassette"]보다 우선)
+
+    Returns:
+        tuple: (모드 또는 None, 경로, 재생 시 지연 재현 여부)
+
+    Raises:
+        ValueError: 알 수 없는 모드
+    """
+    cassette = config.get("llm", {}).get("cassette", {})
+    mode = (os.getenv(MODE_ENV_VAR) or cassette.get("mode") or "").strip().lower() or None
+    if mode is not None and mode not in CASSETTE_MODES:
+        raise ValueError(f"알 수 없는 카세트 모드: {mode} (사용 가능: {', '.join(CASSETTE_MODES)})")
+    path = os.getenv(PATH_ENV_VAR) or cassette.get("path") or DEFAULT_CASSETTE_PATH
+    replay_latency = os.getenv(REPLAY_LATENCY_ENV_VAR)
+    if replay_latency is None:
+        replay_latency = cassette.get("replay_latency", False)
+    else:
+        replay_latency = replay_latency.strip().lower() in ("1", "true", "yes")
+    return mode, path, bool(replay_latency)
+
+
+def _response_text(response):
+    """응답 텍스트 (차단 등으로 텍스트가 없으면 None)"""
+    try:
+        return response.text
+    except ValueError:
+        return None
+
+
+def _error_record(error):
+    return {"type": type(error).__name__, "message": getattr(error, "message", None) or str(error)}
+
+
+def _rebuild_error(record):
+    """기록된 오류를 같은 종류의 예외로 복원 (google.api_core 예외면 같은 클래스)"""
+    from google.api_core import exceptions as google_exceptions
+
+    error_type = getattr(google_exceptions, record.get("type", ""), None)
+    if isinstance(error_type, type) and issubclass(error_type, google_exceptions.GoogleAPICallError):
+        return error_type(record.get("message", ""))
+    builtin = {"TimeoutError": TimeoutError, "ConnectionError": ConnectionError, "ValueError": ValueError}
+    return builtin.get(record.get("type"), RuntimeError)(record.get("message", ""))
+
+
+class CassetteWriter:
+    """
+    gzip JSONL 카세트 기록기 (스레드 안전)
+
+    항목마다 flush하므로 프로세스가 비정상 종료돼도 그때까지의 기록은 재생할 수 있고,
+    정상 종료 시에는 atexit에서 gzip 스트림을 닫습니다.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, "at", encoding="utf-8")
+        self.records = 0
+        atexit.register(self.close)
+
+    def write(self, record):
+        record["offset"] = round(record["started_at"] - self.started, 6)
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.records += 1
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        # 닫은 기록기가 종료 처리 목록에 남아 계속 참조되지 않도록 해제
+        atexit.unregister(self.close)
+
+
+class RecordingBackend:
+    """실제 백엔드 호출을 그대로 전달하면서 요청/응답을 카세트에 기록하는 백엔드 (LLMBackend 구현)"""
+
+    def __init__(self, inner, path):
+        self.inner = inner
+        self.requires_api_key = inner.requires_api_key
+        self.writer = CassetteWriter(path)
+        logger.info(f"카세트 기록 중: {path}")
+
+    def ensure_configured(self):
+        self.inner.ensure_configured()
+
+    def probe(self, model_name):
+        return self.inner.probe(model_name)
+
+    def reset(self):
+        self.inner.reset()
+
+    def _record(self, prompt, model_name, generation_config, started_at, latency, response=None, error=None,
+                stream=False, chunks=None, first_chunk_latency=None):
+        record = {
+            "key": ResponseCache.make_key(model_name, prompt, generation_config),
+            "model": model_name,
+            "prompt": prompt,
+            "generation_config": generation_config,
+            "stream": stream,
+            "started_at": started_at,
+            "latency": round(latency, 6),
+        }
+        if error is not None:
+            record["error"] = _error_record(error)
+        else:
+            usage = usage_from_response(response)
+            record["text"] = "".join(text for text, _ in chunks) if stream else _response_text(response)
+            record["usage"] = list(usage) if usage else None
+        if stream:
+            record["chunks"] = chunks or []
+            record["first_chunk_latency"] = first_chunk_latency
+        self.writer.write(record)
+
+    def generate(self, prompt, model_name, generation_config=None, stream=False, **kwargs):
+        if stream:
+            kwargs["stream"] = True
+        started_at, start = time.time(), time.monotonic()
+        try:
+            response = self.inner.generate(prompt, model_name, generation_config, **kwargs)
+        except Exception as e:
+            self._record(prompt, model_name, generation_config, started_at, time.monotonic() - start,
+                         error=e, stream=stream)
+            raise
+        if not stream:
+            self._record(prompt, model_name, generation_config, started_at, time.monotonic() - start, response)
+            return response
+        return _RecordingStream(self, response, prompt, model_name, generation_config, started_at, start)
+
+    async def generate_async(self, prompt, model_name, generation_config=None, **kwargs):
+        started_at, start = time.time(), time.monotonic()
+        try:
+            response = await self.inner.generate_async(prompt, model_name, generation_config, **kwargs)
+        except Exception as e:
+            self._record(prompt, model_name, generation_config, started_at, time.monotonic() - start, error=e)
+            raise
+        self._record(prompt, model_name, generation_config, started_at, time.monotonic() - start, response)
+        return response
+
+
+class _RecordingStream:
+    """스트리밍 응답을 감싸 조각과 조각별 도착 시각을 기록 (스트림이 끝나거나 중단되면 1회 기록)"""
+
+    def __init__(self, backend, response, prompt, model_name, generation_config, started_at, start):
+        self._backend = backend
+        self._response = response
+        self._args = (prompt, model_name, generation_config, started_at)
+        self._start = start
+        self._chunks = []
+
+    @property
+    def usage_metadata(self):
+        return getattr(self._response, "usage_metadata", None)
+
+    def __iter__(self):
+        error = None
+        try:
+            for chunk in self._response:
+                self._chunks.append((_response_text(chunk) or "", round(time.monotonic() - self._start, 6)))
+                yield chunk
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            prompt, model_name, generation_config, started_at = self._args
+            self._backend._record(
+                prompt, model_name, generation_config, started_at, time.monotonic() - self._start,
+                response=None if error else self._response, error=error, stream=True, chunks=self._chunks,
+                first_chunk_latency=self._chunks[0][1] if self._chunks else None
+            )
+
+
+class CassetteResponse:
+    """재생 응답 (기록된 텍스트와 사용량)"""
+
+    def __init__(self, text, usage):
+        self.text = text
+        self.usage_metadata = None
+        if usage:
+            prompt_tokens, output_tokens = usage
+            self.usage_metadata = SimpleNamespace(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens
+            )
+
+
+class _ReplayStream(CassetteResponse):
+    """재생 스트리밍 응답 (지연 재현 시 기록된 조각 도착 간격을 그대로 적용)"""
+
+    def __init__(self, record, replay_latency):
+        super().__init__(record.get("text"), record.get("usage"))
+        self._chunks = record.get("chunks") or []
+        self._replay_latency = replay_latency
+
+    def __iter__(self):
+        previous = self._chunks[0][1] if self._chunks else 0.0
+        for text, arrived in self._chunks:
+            if self._replay_latency and arrived > previous:
+                time.sleep(arrived - previous)
+            previous = arrived
+            yield SimpleNamespace(text=text)
+
+
+class ReplayBackend:
+    """카세트의 응답을 네트워크 없이 재생하는 백엔드 (LLMBackend 구현, API 키 불필요)"""
+
+    requires_api_key = False
+
+    def __init__(self, path, replay_latency=False):
+        """
+        Args:
+            path: 기록된 카세트 경로
+            replay_latency: True이면 기록된 지연만큼 기다린 뒤 응답
+        """
+        self.path = path
+        self.replay_latency = replay_latency
+        self._lock = threading.Lock()
+        self._records = {}  # 키 -> 기록 목록 (같은 요청이 여러 번 기록되면 순서대로 재생)
+        self._positions = {}
+        self._stats = {"served": 0, "misses": 0}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            raise ValueError(f"재생할 카세트 파일이 없습니다: {self.path}")
+        count = 0
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 기록 중 중단된 마지막 줄은 무시
+                        logger.warning("카세트의 손상된 줄을 건너뜁니다.")
+                        continue
+                    self._records.setdefault(record["key"], []).append(record)
+                    count += 1
+            except EOFError:
+                # 기록 프로세스가 비정상 종료되어 gzip 끝 표시가 없는 경우 (flush된 기록까지 사용)
+                logger.warning(f"카세트가 정상적으로 닫히지 않았습니다. 읽은 {count}개 기록만 사용합니다.")
+        logger.info(f"카세트 재생: {self.path} ({count}개 기록)")
+
+    def ensure_configured(self):
+        """설정할 것이 없음"""
+
+    def probe(self, model_name):
+        return SimpleNamespace(name=f"models/{model_name}")
+
+    def reset(self):
+        with self._lock:
+            self._positions.clear()
+
+    def _next_record(self, prompt, model_name, generation_config):
+        """요청에 해당하는 다음 기록 (모두 재생했으면 마지막 기록을 반복)"""
+        key = ResponseCache.make_key(model_name, prompt, generation_config)
+        with self._lock:
+            records = self._records.get(key)
+            if not records:
+                self._stats["misses"] += 1
+                raise CassetteMiss(f"카세트에 없는 요청입니다 (모델 {model_name}, 키 {key[:12]})")
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            self._stats["served"] += 1
+            return records[min(position, len(records) - 1)]
+
+    def _delay(self, record):
+        if not self.replay_latency:
+            return 0.0
+        if record.get("stream") and record.get("first_chunk_latency") is not None:
+            return record["first_chunk_latency"]
+        return record.get("latency", 0.0)
+
+    def _result(self, record):
+        if "error" in record:
+            raise _rebuild_error(record["error"])
+        if record.get("stream"):
+            return _ReplayStream(record, self.replay_latency)
+        return CassetteResponse(record.get("text"), record.get("usage"))
+
+    def generate(self, prompt, model_name, generation_config=None, stream=False, **kwargs):
+        record = self._next_record(prompt, model_name, generation_config)
+        delay = self._delay(record)
+        if delay:
+            time.sleep(delay)
+        if stream and not record.get("stream") and "error" not in record:
+            # 비스트리밍으로 기록된 응답을 스트림으로 요청하면 한 조각으로 재생
+            record = dict(record, stream=True, chunks=[(record.get("text") or "", 0.0)])
+        return self._result(record)
+
+    async def generate_async(self, prompt, model_name, generation_config=None, **kwargs):
+        record = self._next_record(prompt, model_name, generation_config)
+        delay = self._delay(record)
+        if delay:
+            await asyncio.sleep(delay)
+        if record.get("stream") and "error" not in record:
+            record = dict(record, stream=False)
+        return self._result(record)
+
+    def get_stats(self):
+        """재생한 응답 수와 카세트에 없던 요청 수"""
+        with self._lock:
+            return dict(self._stats)
+
+
+def wrap_with_cassette(create_inner, mode, path, replay_latency=False):
+    """
+    카세트 모드에 맞는 백엔드 반환
+
+    Args:
+        create_inner: 실제 백엔드를 만드는 함수 (재생 모드에서는 호출하지 않음)
+    """
+    if mode == "record":
+        return RecordingBackend(create_inner(), path)
+    if mode == "replay":
+        return ReplayBackend(path, replay_latency)
+    return create_inner()
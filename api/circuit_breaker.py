@@ -0,0 +1,240 @@
+# api/circuit_breaker.py
+"""
+회로 차단기 모듈
+최근 요청의 오류율이 임계값을 넘으면 회로를 열어(open) 이후 요청을 즉시 실패시키고,
+대기 시간이 지나면 반열림(half-open) 상태에서 시험 요청만 보내 회복 여부를 확인합니다.
+생성기는 CircuitPause로 남은 대기열을 멈췄다가 회로가 반열림이 되면 이어서 처리합니다.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+
+from utils.config import config
+from utils.logger import logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+STATE_LABELS = {CLOSED: "닫힘", OPEN: "열림", HALF_OPEN: "반열림"}
+
+
+class CircuitOpenError(ValueError):
+    """회로가 열려 있어 요청을 보내지 않고 즉시 실패한 경우"""
+
+    def __init__(self, message, retry_after=0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """롤링 오류율 기반 닫힘/열림/반열림 회로 차단기 (스레드/이벤트 루프 공용)"""
+
+    def __init__(self, failure_rate_threshold=0.5, window_size=20, min_calls=5, open_seconds=30.0,
+                 half_open_max_calls=1, enabled=True):
+        """
+        Args:
+            failure_rate_threshold: 회로를 여는 최근 오류율
+            window_size: 오류율을 계산할 최근 요청 수
+            min_calls: 오류율을 판단하기 위한 최소 요청 수
+            open_seconds: 열림 상태를 유지하는 시간 (이후 반열림)
+            half_open_max_calls: 반열림 상태에서 동시에 허용하는 시험 요청 수
+            enabled: False이면 항상 닫힘 상태로 동작
+        """
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = max(1, min_calls)
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._results = deque(maxlen=max(self.min_calls, window_size))  # True: 성공, False: 실패
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._stats = {"opened": 0, "rejected": 0}
+
+    @property
+    def state(self):
+        with self._lock:
+            self._update_state(time.monotonic())
+            return self._state
+
+    def _update_state(self, now):
+        """열림 대기 시간이 지났으면 반열림으로 전환 (잠금은 호출자가 관리)"""
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._half_open_calls = 0
+            logger.info("회로 차단기 반열림: 시험 요청으로 API 회복 여부 확인")
+
+    def _open(self, now):
+        self._state = OPEN
+        self._opened_at = now
+        self._half_open_calls = 0
+        self._stats["opened"] += 1
+
+    def before_call(self):
+        """
+        요청 전 허용 여부 확인 (허용되면 반드시 record_success/record_failure/cancel 중 하나를 호출)
+
+        Raises:
+            CircuitOpenError: 회로가 열려 있거나 반열림 시험 요청 수가 찬 경우
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._update_state(now)
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return
+            self._stats["rejected"] += 1
+            label = STATE_LABELS[self._state]
+            retry_after = max(0.0, self.open_seconds - (now - self._opened_at)) if self._state == OPEN else 1.0
+        raise CircuitOpenError(f"API 회로 차단 중 ({label}) - {retry_after:.0f}초 후 재시도", retry_after)
+
+    def record_success(self):
+        """허용된 요청의 성공 기록 (반열림이면 회로를 닫음)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._results.clear()
+                logger.info("회로 차단기 닫힘: API 회복 확인")
+            self._results.append(True)
+
+    def record_failure(self, error=None):
+        """허용된 요청의 실패 기록 (오류율이 임계값을 넘거나 반열림 시험이 실패하면 회로를 엶)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if self._state == HALF_OPEN:
+                self._open(now)
+                logger.warning(f"회로 차단기 다시 열림: 시험 요청 실패 ({error})")
+                return
+            if self._state == OPEN:
+                return
+            self._results.append(False)
+            if len(self._results) < self.min_calls:
+                return
+            failure_rate = self._results.count(False) / len(self._results)
+            if failure_rate >= self.failure_rate_threshold:
+                self._open(now)
+                self._results.clear()
+                logger.warning(f"회로 차단기 열림: 최근 오류율 {failure_rate * 100:.0f}%, "
+                               f"{self.open_seconds:.0f}초 동안 요청 차단 ({error})")
+
+    def cancel(self):
+        """허용된 요청이 API를 호출하지 않고 끝난 경우 (요청 제한 대기 시간 초과, 용량 초과 응답 등)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._state == HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def get_stats(self):
+        """현재 상태와 열림/거부 횟수 반환"""
+        with self._lock:
+            self._update_state(time.monotonic())
+            stats = dict(self._stats)
+            stats["state"] = self._state
+            return stats
+
+
+class CircuitPause:
+    """
+    실행 단위 대기열 일시 정지/재개 제어
+
+    회로가 열려 요청이 거부되면 반열림이 될 때까지 기다렸다가 같은 항목을 다시 시도합니다.
+    누적 정지 시간이 max_pause를 넘거나 취소되면 실행을 중단(halted)하고,
+    이후 항목은 요청 없이 CircuitOpenError로 즉시 끝나 셀을 비워 둡니다.
+    """
+
+    def __init__(self, max_pause=300.0, cancelled=None):
+        """
+        Args:
+            max_pause: 실행 전체에서 회로 회복을 기다리는 최대 시간 (초)
+            cancelled: 취소 여부를 반환하는 함수 (선택적)
+        """
+        self.max_pause = max_pause
+        self.cancelled = cancelled or (lambda: False)
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self._paused_total = 0.0
+        self._pauses = 0
+        self._halted = threading.Event()
+
+    @classmethod
+    def from_config(cls, cancelled=None):
+        """config["circuit_breaker"]["max_pause_seconds"] 값으로 생성"""
+        return cls(config.get("circuit_breaker", {}).get("max_pause_seconds", 300), cancelled)
+
+    @property
+    def halted(self):
+        return self._halted.is_set()
+
+    def _pause_delay(self, error):
+        """
+        거부된 요청이 기다릴 시간 계산 (여러 작업이 동시에 거부돼도 정지 시간은 한 번만 누적)
+
+        Returns:
+            float or None: 대기 시간 (중단해야 하면 None)
+        """
+        if self.halted or self.cancelled():
+            self._halted.set()
+            return None
+        delay = max(0.5, getattr(error, "retry_after", 0.0))
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._paused_until:
+                if self._paused_total + delay > self.max_pause:
+                    self._halted.set()
+                    print(f"API 회로가 {self._paused_total:.0f}초 동안 회복되지 않아 남은 항목 처리를 중단합니다.")
+                    return None
+                self._paused_until = now + delay
+                self._paused_total += delay
+                self._pauses += 1
+                print(f"API 오류가 이어져 대기열을 일시 정지합니다 ({delay:.0f}초 후 재개)")
+            return max(0.5, self._paused_until - now)
+
+    def _check_halted(self):
+        if self.halted:
+            raise CircuitOpenError("API 회로 차단으로 처리하지 못함")
+
+    def call(self, func):
+        """func() 실행 (회로가 열려 있으면 재개될 때까지 기다린 뒤 다시 시도)"""
+        while True:
+            self._check_halted()
+            try:
+                return func()
+            except CircuitOpenError as e:
+                delay = self._pause_delay(e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    async def call_async(self, func):
+        """call의 비동기 버전 (func는 awaitable을 반환하는 함수)"""
+        while True:
+            self._check_halted()
+            try:
+                return await func()
+            except CircuitOpenError as e:
+                delay = self._pause_delay(e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+    def format_report(self, skipped):
+        """정지/중단 요약 문자열"""
+        if not self._pauses and not skipped:
+            return "회로 차단: 정지 없음"
+        report = f"회로 차단: {self._pauses}회 일시 정지 (총 {self._paused_total:.0f}초)"
+        if skipped:
+            report += f", 처리하지 못한 항목 {skipped}개 (셀은 비워 둠, 다시 실행해 이어서 처리)"
+        return report
@@ -0,0 +1,126 @@
+# api/client.py
+"""
+Gemini 클라이언트 모듈
+API 설정(genai.configure)을 한 번만 수행하고, 모델 이름과 생성 설정별로
+GenerativeModel 인스턴스를 재사용하는 스레드 안전 클라이언트를 제공합니다.
+"""
+import json
+import os
+import threading
+
+import google.generativeai as genai
+
+from utils.logger import logger
+
+API_KEY_MISSING_MESSAGE = "API 키가 설정되지 않았습니다. 환경 변수 GEMINI_API_KEY를 설정하세요."
+
+
+def _config_key(generation_config):
+    """생성 설정을 풀 키로 사용할 수 있는 문자열로 변환"""
+    if not generation_config:
+        return ""
+    if isinstance(generation_config, dict):
+        return json.dumps(generation_config, sort_keys=True, default=str)
+    return repr(generation_config)
+
+
+class GeminiClient:
+    """설정 1회 + 모델 핸들 풀을 관리하는 Gemini 클라이언트 (LLMBackend 구현)"""
+
+    requires_api_key = True
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._configured_key = None
+        self._models = {}
+
+    def ensure_configured(self):
+        """
+        API 키로 genai를 설정 (키가 바뀐 경우에만 재설정)
+
+        Raises:
+            ValueError: API 키가 없는 경우
+        """
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise ValueError(API_KEY_MISSING_MESSAGE)
+
+        if api_key == self._configured_key:
+            return
+
+        with self._lock:
+            if api_key != self._configured_key:
+                genai.configure(api_key=api_key)
+                self._configured_key = api_key
+                # 이전 키로 만든 모델 핸들은 폐기
+                self._models.clear()
+                logger.debug("Gemini API 설정 완료")
+
+    def get_model(self, model_name, generation_config=None):
+        """모델 이름과 생성 설정에 해당하는 GenerativeModel 반환 (없으면 생성 후 풀에 보관)"""
+        self.ensure_configured()
+        pool_key = (model_name, _config_key(generation_config))
+
+        model = self._models.get(pool_key)
+        if model is None:
+            with self._lock:
+                model = self._models.get(pool_key)
+                if model is None:
+                    model = genai.GenerativeModel(model_name, generation_config=generation_config)
+                    self._models[pool_key] = model
+        return model
+
+    def generate(self, prompt, model_name, generation_config=None, **kwargs):
+        """풀의 모델로 generate_content 호출"""
+        model = self.get_model(model_name, generation_config)
+        return model.generate_content(prompt, **kwargs)
+
+    async def generate_async(self, prompt, model_name, generation_config=None, **kwargs):
+        """풀의 모델로 generate_content_async 호출"""
+        model = self.get_model(model_name, generation_config)
+        return await model.generate_content_async(prompt, **kwargs)
+
+    def probe(self, model_name):
+        """토큰을 소비하지 않는 가벼운 연결 확인 (모델 메타데이터 조회)"""
+        self.ensure_configured()
+        name = model_name if model_name.startswith("models/") else f"models/{model_name}"
+        return genai.get_model(name)
+
+    def reset(self):
+        """설정 및 모델 풀 초기화 (API 키 변경 등)"""
+        with self._lock:
+            self._configured_key = None
+            self._models.clear()
+
+
+_client_instances = {}
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    설정된 LLM 백엔드의 공용 인스턴스 반환
+
+    기본은 GeminiClient이며, config["llm"]["backend"] 또는 환경 변수 LLM_BACKEND가
+    "local"이면 네트워크 없이 동작하는 LocalBackend를 반환합니다.
+    카세트 모드(api.cassette)가 설정되어 있으면 기록/재생 백엔드로 감쌉니다.
+    """
+    from api.llm_backend import create_backend, get_backend_name
+    from api.cassette import get_cassette_settings, wrap_with_cassette
+
+    name = get_backend_name()
+    mode, path, replay_latency = get_cassette_settings()
+    key = (name, mode, path if mode else None, replay_latency if mode == "replay" else None)
+    client = _client_instances.get(key)
+    if client is None:
+        with _client_lock:
+            client = _client_instances.get(key)
+            if client is None:
+                client = wrap_with_cassette(lambda: create_backend(name), mode, path, replay_latency)
+                _client_instances[key] = client
+    return client
+
+
+def has_api_key():
+    """요청을 보낼 수 있는지 여부 (API 키가 필요 없는 백엔드이거나 GEMINI_API_KEY가 설정된 경우)"""
+    return not get_client().requires_api_key or bool(os.getenv("GEMINI_API_KEY"))
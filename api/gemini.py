@@ -1,10 +1,27 @@
 # api/gemini.py
+import asyncio
 import os
 import sys
-import google.generativeai as genai
+import threading
+import time
+import weakref
 from dotenv import load_dotenv
-from utils.prompt_loader import load_prompts_by_type
 from utils.logger import logger
+from utils.config import config
+from api.client import get_client, has_api_key, API_KEY_MISSING_MESSAGE
+from api.response_cache import ResponseCache, get_response_cache
+from api.rate_limiter import AdaptiveRateLimiter, is_throttle_error
+from api.retry import RetryPolicy
+from api.single_flight import SingleFlight
+from api.cassette import CassetteMiss, get_cassette_settings
+from api.circuit_breaker import CircuitBreaker, CircuitOpenError, STATE_LABELS
+from api.hedging import HedgePolicy
+from api.generation_profiles import get_generation_config, profile_for_prompt_type
+from api.health import get_health_monitor, start_health_monitor, STATUS_UNKNOWN, STATUS_HEALTHY, STATUS_DEGRADED
+from api.request_context import PromptType, RequestPriority, current_prompt_type, current_priority
+from api.prompt_compiler import CompiledPromptSet, compile_prompt_set
+from api.token_accounting import (TokenBudgetExceeded, estimate_tokens, reserve_tokens, release_tokens,
+                                  record_usage)
 
 # 채팅 컨텍스트 모듈 추가
 from utils import chat_context
@@ -12,186 +29,777 @@ from utils import chat_context
 # 환경 변수 로드 (한 번만 실행)
 load_dotenv()
 
+# 보고서 생성에 사용하는 기본 모델
+DEFAULT_MODEL = "gemini-1.5-pro"
+
+EMPTY_RESPONSE_MESSAGE = "응답이 비어있습니다. 다시 시도해주세요."
+
+# 이벤트 루프별 비동기 동시 요청 세마포어
+_async_semaphores = weakref.WeakKeyDictionary()
+
+# 모든 호출 경로가 공유하는 요청 제한기와 재시도 정책
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+_retry_policy = None
+
+# 동일한 요청(모델 + 프롬프트 + 생성 설정)이 동시에 진행되지 않도록 병합
+_single_flight = SingleFlight()
+
+# API 장애 시 요청을 즉시 실패시키는 공용 회로 차단기
+_circuit_breaker = None
+
+# p95 지연을 넘긴 요청을 한 번 더 보내는 공용 헤징 정책
+_hedge_policy = None
+
 # API 키 확인 및 초기화를 위한 함수
 def initialize_api():
     """Gemini API 초기화 및 설정 확인"""
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        error_msg = "API 키가 설정되지 않았습니다. 환경 변수 GEMINI_API_KEY를 설정하세요."
-        logger.error(error_msg)
-        return False, error_msg
-        
     try:
-        genai.configure(api_key=api_key)
+        get_client().ensure_configured()
         return True, "API 초기화 성공"
+    except ValueError as e:
+        logger.error(str(e))
+        return False, str(e)
     except Exception as e:
         error_msg = f"API 초기화 중 오류 발생: {str(e)}"
         logger.error(error_msg)
         return False, error_msg
 
 def get_api_status():
-    """API 연결 상태 확인"""
+    """
+    API 연결 상태 확인 (상태 모니터의 캐시된 값, 왕복 요청 없음)
+
+    실제 요청이 TTL 동안 없었으면 백그라운드 프로브를 요청하고 마지막으로 알려진 상태를 반환합니다.
+    """
+    if not has_api_key():
+        return False, "API 키가 설정되지 않았습니다."
+
+    monitor = start_health_monitor()
+    snapshot = monitor.snapshot()
+    if snapshot["stale"]:
+        monitor.request_probe()
+
+    if snapshot["status"] == STATUS_UNKNOWN:
+        return True, "API 키 설정됨 (연결 상태 확인 중)"
+    message = monitor.format_report()
+    if snapshot["status"] in (STATUS_HEALTHY, STATUS_DEGRADED):
+        return True, message
+    if snapshot["last_error"]:
+        message += f" - {snapshot['last_error']}"
+    return False, message
+
+def call_gemini(user_input, model_name=DEFAULT_MODEL, generation_config=None, use_cache=True, profile=None):
+    """
+    기본 Gemini API 호출 함수
+
+    Args:
+        user_input: 최종 프롬프트
+        model_name: 사용할 모델 이름
+        generation_config: 생성 설정 (None이면 profile의 설정)
+        use_cache: 응답 캐시 사용 여부 (False이면 캐시 조회/저장 모두 우회)
+        profile: 생성 프로필 이름 (None이면 현재 프롬프트 타입의 기본 프로필)
+    """
+    generation_config = _resolve_generation_config(generation_config, profile)
+    cache, cache_key, cached = _lookup_cache(user_input, model_name, generation_config, use_cache)
+    if cached is not None:
+        return cached
+
+    if not has_api_key():
+        logger.error(API_KEY_MISSING_MESSAGE)
+        raise ValueError(API_KEY_MISSING_MESSAGE)
+
+    # 같은 요청이 이미 진행 중이면 새로 호출하지 않고 그 결과를 함께 받음
+    return _single_flight.do(
+        cache_key, lambda: _request_gemini(user_input, model_name, generation_config, cache, cache_key)
+    )
+
+def _request_gemini(user_input, model_name, generation_config, cache, cache_key):
+    """요청 제한/토큰 예산/회로 차단/재시도를 적용한 실제 API 호출 (call_gemini의 캐시 미스 경로)"""
+    limiter = get_rate_limiter()
+    health = get_health_monitor()
+    breaker = get_circuit_breaker()
+    estimated_tokens = _estimate_request_tokens(user_input)
+    # 채팅 등 대화형 요청은 예약 슬롯과 높은 가중치의 차선 사용
+    lane = current_priority().value
+
+    def acquire():
+        # 슬롯 대기는 마감 시간과 별도의 대기 시간(queue_timeout)을 사용
+        limiter.acquire(estimated_tokens, timeout=_queue_timeout(), lane=lane)
+
+    def attempt(remaining):
+        # 슬롯을 기다리는 동안 회로가 열렸으면 요청 없이 즉시 실패 (재시도 중 열린 경우 포함)
+        _enter_circuit(breaker, limiter, estimated_tokens, lane)
+        start = time.monotonic()
+        try:
+            # 설정 1회 + 모델 핸들 재사용 (스레드 안전), p95 안에 응답이 없으면 헤징 요청 추가
+            response = get_hedge_policy().call(
+                lambda elapsed: get_client().generate(user_input, model_name, generation_config,
+                                                      request_options={"timeout": max(0.1, remaining - elapsed)}),
+                model_name,
+                acquire_extra=lambda: limiter.try_acquire(estimated_tokens, over_limit=True, lane=lane),
+                release_extra=_hedge_release(limiter, estimated_tokens, lane)
+            )
+            text = _response_text(response)
+        except Exception as e:
+            limiter.release(success=False, throttled=is_throttle_error(e), estimated_tokens=estimated_tokens,
+                            lane=lane)
+            health.record(time.monotonic() - start, False, e)
+            _record_breaker_failure(breaker, e)
+            raise
+        limiter.release(actual_tokens=_usage_tokens(response), estimated_tokens=estimated_tokens, lane=lane)
+        health.record(time.monotonic() - start, True)
+        breaker.record_success()
+        record_usage(user_input, text, response, estimated_tokens)
+        return text
+
+    # 실행 단위 토큰 예산이 있으면 초과 시 TokenBudgetExceeded로 즉시 실패
+    reserve_tokens(estimated_tokens)
     try:
-        # API 키 확인
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            return False, "API 키가 설정되지 않았습니다."
-            
-        # 간단한 API 테스트 (짧은 프롬프트로)
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        response = model.generate_content("Hello")
-        
-        if response and response.text:
-            return True, "API 연결 정상"
-        return False, "API 응답이 비정상입니다."
+        # 재시도 가능한 오류는 백오프 후 재시도, 치명적 오류는 즉시 실패
+        result = get_retry_policy().call(attempt, acquire=acquire)
+    except (CircuitOpenError, CassetteMiss):
+        # 회로 차단은 호출자가 대기열을 멈출 수 있도록, 카세트 누락은 재생 실행을 중단하도록 감싸지 않고 전달
+        release_tokens(estimated_tokens)
+        raise
     except Exception as e:
-        return False, f"API 연결 오류: {str(e)}"
+        release_tokens(estimated_tokens)
+        error_msg = f"Gemini API 호출 중 오류 발생: {str(e)}"
+        logger.error(error_msg)
+        raise ValueError(error_msg) from e
+
+    if result is None:
+        return EMPTY_RESPONSE_MESSAGE
+    if cache is not None:
+        cache.set(cache_key, result, model_name)
+    return result
+
+async def call_gemini_async(user_input, model_name=DEFAULT_MODEL, generation_config=None, use_cache=True,
+                            profile=None):
+    """
+    call_gemini의 비동기 버전 (SDK의 generate_content_async 사용)
+
+    동시에 진행되는 요청 수는 스레드가 아닌 이벤트 루프별 세마포어
+    (config["api"]["async_concurrency"])로 제한됩니다.
+    """
+    generation_config = _resolve_generation_config(generation_config, profile)
+    cache, cache_key, cached = _lookup_cache(user_input, model_name, generation_config, use_cache)
+    if cached is not None:
+        return cached
+
+    if not has_api_key():
+        logger.error(API_KEY_MISSING_MESSAGE)
+        raise ValueError(API_KEY_MISSING_MESSAGE)
+
+    return await _single_flight.do_async(
+        cache_key, lambda: _request_gemini_async(user_input, model_name, generation_config, cache, cache_key)
+    )
+
+async def _request_gemini_async(user_input, model_name, generation_config, cache, cache_key):
+    """_request_gemini의 비동기 버전"""
+    limiter = get_rate_limiter()
+    health = get_health_monitor()
+    breaker = get_circuit_breaker()
+    estimated_tokens = _estimate_request_tokens(user_input)
+    lane = current_priority().value
+    semaphore = _get_async_semaphore()
+
+    async def acquire():
+        # 백오프 대기 중에는 세마포어를 점유하지 않도록 시도 단위로 획득 (대기는 마감 시간에서 제외)
+        await semaphore.acquire()
+        try:
+            await limiter.acquire_async(estimated_tokens, timeout=_queue_timeout(), lane=lane)
+        except BaseException:
+            semaphore.release()
+            raise
+
+    async def attempt(remaining):
+        try:
+            _enter_circuit(breaker, limiter, estimated_tokens, lane)
+            start = time.monotonic()
 
-def call_gemini(user_input):
-    """기본 Gemini API 호출 함수"""
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        error_msg = "API 키가 설정되지 않았습니다. 환경 변수 GEMINI_API_KEY를 설정하세요."
+            async def acquire_extra():
+                return limiter.try_acquire(estimated_tokens, over_limit=True, lane=lane)
+
+            try:
+                response = await get_hedge_policy().call_async(
+                    lambda elapsed: get_client().generate_async(
+                        user_input, model_name, generation_config,
+                        request_options={"timeout": max(0.1, remaining - elapsed)}
+                    ),
+                    model_name,
+                    acquire_extra=acquire_extra,
+                    release_extra=_hedge_release(limiter, estimated_tokens, lane)
+                )
+                text = _response_text(response)
+            except Exception as e:
+                limiter.release(success=False, throttled=is_throttle_error(e), estimated_tokens=estimated_tokens,
+                            lane=lane)
+                health.record(time.monotonic() - start, False, e)
+                _record_breaker_failure(breaker, e)
+                raise
+            limiter.release(actual_tokens=_usage_tokens(response), estimated_tokens=estimated_tokens, lane=lane)
+            health.record(time.monotonic() - start, True)
+            breaker.record_success()
+            record_usage(user_input, text, response, estimated_tokens)
+            return text
+        finally:
+            semaphore.release()
+
+    reserve_tokens(estimated_tokens)
+    try:
+        result = await get_retry_policy().call_async(attempt, acquire=acquire)
+    except (CircuitOpenError, CassetteMiss):
+        # 회로 차단은 호출자가 대기열을 멈출 수 있도록, 카세트 누락은 재생 실행을 중단하도록 감싸지 않고 전달
+        release_tokens(estimated_tokens)
+        raise
+    except Exception as e:
+        release_tokens(estimated_tokens)
+        error_msg = f"Gemini API 호출 중 오류 발생: {str(e)}"
         logger.error(error_msg)
-        raise ValueError(error_msg)
+        raise ValueError(error_msg) from e
+
+    if result is None:
+        return EMPTY_RESPONSE_MESSAGE
+    if cache is not None:
+        cache.set(cache_key, result, model_name)
+    return result
+
+def stream_gemini(user_input, model_name=DEFAULT_MODEL, generation_config=None, use_cache=True, profile=None):
+    """
+    스트리밍 Gemini 호출 (generate_content(stream=True))
+
+    응답 조각(str)을 도착하는 대로 yield하는 제너레이터입니다. GUI 없이 스크립트에서도
+    `for chunk in stream_gemini(prompt): ...` 형태로 사용할 수 있습니다.
+    첫 조각을 받기 전의 오류만 재시도하며, 스트림이 끝나면 전체 응답을 캐시에 저장합니다.
+
+    Raises:
+        ValueError: API 키가 없거나 호출/스트리밍 중 오류가 발생한 경우
+    """
+    generation_config = _resolve_generation_config(generation_config, profile)
+    cache, cache_key, cached = _lookup_cache(user_input, model_name, generation_config, use_cache)
+    if cached is not None:
+        yield cached
+        return
 
+    if not has_api_key():
+        logger.error(API_KEY_MISSING_MESSAGE)
+        raise ValueError(API_KEY_MISSING_MESSAGE)
+
+    limiter = get_rate_limiter()
+    health = get_health_monitor()
+    breaker = get_circuit_breaker()
+    estimated_tokens = _estimate_request_tokens(user_input)
+    lane = current_priority().value
+
+    def acquire():
+        limiter.acquire(estimated_tokens, timeout=_queue_timeout(), lane=lane)
+
+    def open_stream(remaining):
+        # 첫 조각까지 받아야 연결 오류가 드러나므로 여기까지를 한 번의 시도로 취급
+        _enter_circuit(breaker, limiter, estimated_tokens, lane)
+        start = time.monotonic()
+        try:
+            response = get_client().generate(user_input, model_name, generation_config, stream=True,
+                                             request_options={"timeout": remaining})
+            chunks = iter(response)
+            first = next(chunks, None)
+        except Exception as e:
+            limiter.release(success=False, throttled=is_throttle_error(e), estimated_tokens=estimated_tokens,
+                            lane=lane)
+            health.record(time.monotonic() - start, False, e)
+            _record_breaker_failure(breaker, e)
+            raise
+        # 스트리밍은 첫 조각까지의 지연을 왕복 지연으로 기록
+        health.record(time.monotonic() - start, True)
+        breaker.record_success()
+        return response, chunks, first
+
+    reserve_tokens(estimated_tokens)
     try:
-        genai.configure(api_key=api_key)
-        # 최신 모델 사용 (필요에 따라 변경 가능)
-        model = genai.GenerativeModel("gemini-1.5-pro")
-        response = model.generate_content(user_input)
-        
-        if not response.text:
-            logger.warning("API에서 빈 응답을 받았습니다.")
-            return "응답이 비어있습니다. 다시 시도해주세요."
-        
-        return response.text.strip()
+        response, chunks, first = get_retry_policy().call(open_stream, acquire=acquire)
+    except (CircuitOpenError, CassetteMiss):
+        # 회로 차단은 호출자가 대기열을 멈출 수 있도록, 카세트 누락은 재생 실행을 중단하도록 감싸지 않고 전달
+        release_tokens(estimated_tokens)
+        raise
     except Exception as e:
+        release_tokens(estimated_tokens)
         error_msg = f"Gemini API 호출 중 오류 발생: {str(e)}"
         logger.error(error_msg)
-        raise ValueError(error_msg)
+        raise ValueError(error_msg) from e
+
+    parts = []
+    released = False
+    try:
+        chunk = first
+        while chunk is not None:
+            text = _chunk_text(chunk)
+            if text:
+                parts.append(text)
+                yield text
+            chunk = next(chunks, None)
+    except Exception as e:
+        limiter.release(success=False, throttled=is_throttle_error(e), estimated_tokens=estimated_tokens,
+                            lane=lane)
+        released = True
+        record_usage(user_input, "".join(parts), response, estimated_tokens)
+        error_msg = f"Gemini 스트리밍 중 오류 발생: {str(e)}"
+        logger.error(error_msg)
+        raise ValueError(error_msg) from e
+    finally:
+        # 소비자가 중간에 중단(GeneratorExit)해도 슬롯은 반환
+        if not released:
+            limiter.release(actual_tokens=_usage_tokens(response), estimated_tokens=estimated_tokens, lane=lane)
+            record_usage(user_input, "".join(parts), response, estimated_tokens)
+
+    result = "".join(parts).strip()
+    if result and cache is not None:
+        cache.set(cache_key, result, model_name)
+
+def _resolve_generation_config(generation_config, profile):
+    """명시한 생성 설정이 없으면 프로필(없으면 현재 프롬프트 타입의 기본 프로필)의 설정 사용"""
+    if generation_config is not None:
+        return generation_config
+    return get_generation_config(profile or profile_for_prompt_type(current_prompt_type()))
+
+def _chunk_text(chunk):
+    """스트림 조각의 텍스트 (텍스트가 없는 조각이면 빈 문자열)"""
+    try:
+        return chunk.text or ""
+    except ValueError:
+        return ""
+
+def _lookup_cache(user_input, model_name, generation_config, use_cache):
+    """
+    응답 캐시 조회
+
+    Returns:
+        tuple: (캐시 또는 None, 요청 키, 캐시된 응답 또는 None)
+    """
+    # 캐시를 쓰지 않아도 중복 요청 병합에 같은 키를 사용
+    cache_key = ResponseCache.make_key(model_name, user_input, generation_config)
+    # 카세트 기록/재생 중에는 응답 캐시를 거치지 않음 (캐시 적중은 카세트에 남지 않아 재생이 실행을 재현하지 못함)
+    cassette_mode = get_cassette_settings()[0]
+    cache = get_response_cache() if use_cache and cassette_mode is None else None
+    if cache is None:
+        return None, cache_key, None
+
+    cached = cache.get(cache_key)
+    if cached is not None:
+        logger.debug("응답 캐시 적중")
+    return cache, cache_key, cached
+
+def _response_text(response):
+    """응답 텍스트 추출 (빈 응답이면 None)"""
+    if not response.text:
+        logger.warning("API에서 빈 응답을 받았습니다.")
+        return None
+    return response.text.strip()
+
+def get_rate_limiter():
+    """config["api"] 값으로 초기화된 공용 AdaptiveRateLimiter 반환"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                api_config = config.get("api", {})
+                _rate_limiter = AdaptiveRateLimiter(
+                    requests_per_minute=api_config.get("requests_per_minute", 360),
+                    tokens_per_minute=api_config.get("tokens_per_minute", 4000000),
+                    initial_concurrency=api_config.get("parallel_requests", 5),
+                    max_concurrency=api_config.get("max_parallel_requests", 50),
+                    interactive_reserved=api_config.get("interactive_reserved_concurrency", 1),
+                    lane_weights=api_config.get("lane_weights")
+                )
+    return _rate_limiter
+
+def get_circuit_breaker():
+    """config["circuit_breaker"] 값으로 초기화된 공용 CircuitBreaker 반환"""
+    global _circuit_breaker
+    if _circuit_breaker is None:
+        with _rate_limiter_lock:
+            if _circuit_breaker is None:
+                breaker_config = config.get("circuit_breaker", {})
+                _circuit_breaker = CircuitBreaker(
+                    failure_rate_threshold=breaker_config.get("failure_rate_threshold", 0.5),
+                    window_size=breaker_config.get("window_size", 20),
+                    min_calls=breaker_config.get("min_calls", 5),
+                    open_seconds=breaker_config.get("open_seconds", 30),
+                    half_open_max_calls=breaker_config.get("half_open_max_calls", 1),
+                    enabled=breaker_config.get("enabled", True)
+                )
+    return _circuit_breaker
+
+def get_hedge_policy():
+    """config["hedging"] 값으로 초기화된 공용 HedgePolicy 반환"""
+    global _hedge_policy
+    if _hedge_policy is None:
+        with _rate_limiter_lock:
+            if _hedge_policy is None:
+                _hedge_policy = HedgePolicy.from_config()
+    return _hedge_policy
+
+def _hedge_release(limiter, estimated_tokens, lane):
+    """헤징 요청이 끝났을 때 그 요청의 요청 제한기 슬롯을 반환하는 함수"""
+    def release(error):
+        limiter.release(success=error is None, throttled=error is not None and is_throttle_error(error),
+                        estimated_tokens=estimated_tokens, lane=lane)
+    return release
+
+def _enter_circuit(breaker, limiter, estimated_tokens, lane):
+    """요청 슬롯을 얻은 뒤 회로 차단기 통과 확인 (거부되면 슬롯을 감점 없이 반환하고 CircuitOpenError)"""
+    try:
+        breaker.before_call()
+    except CircuitOpenError:
+        limiter.release(success=False, estimated_tokens=estimated_tokens, lane=lane)
+        raise
+
+def _record_breaker_failure(breaker, error):
+    """
+    실패한 시도를 회로 차단기에 반영
+
+    용량 초과 응답은 요청 제한기가 처리하고, 카세트 누락은 API 장애가 아니므로 제외합니다.
+    """
+    if is_throttle_error(error) or isinstance(error, CassetteMiss):
+        breaker.cancel()
+    else:
+        breaker.record_failure(error)
+
+def _queue_timeout():
+    """요청 제한기 슬롯 대기 시간 (config["api"]["queue_timeout"], 0 또는 None이면 무제한)"""
+    return config.get("api", {}).get("queue_timeout", 600) or None
+
+def get_retry_policy():
+    """config["api"]의 max_retries/timeout 값으로 초기화된 공용 RetryPolicy 반환"""
+    global _retry_policy
+    if _retry_policy is None:
+        with _rate_limiter_lock:
+            if _retry_policy is None:
+                api_config = config.get("api", {})
+                _retry_policy = RetryPolicy(
+                    max_retries=api_config.get("max_retries", 3),
+                    base_delay=api_config.get("retry_base_delay", 1.0),
+                    max_delay=api_config.get("retry_max_delay", 20.0),
+                    deadline=api_config.get("timeout", 30)
+                )
+    return _retry_policy
+
+def _api_counters():
+    """실행 보고에 쓰는 API 계층 누적 카운터 (프로세스 시작 이후)"""
+    limiter_stats = get_rate_limiter().get_stats()
+    retry_stats = get_retry_policy().get_stats()
+    breaker_stats = get_circuit_breaker().get_stats()
+    return {
+        "throttled": limiter_stats["throttled"],
+        "retries": retry_stats["retries"],
+        "exhausted": retry_stats["exhausted"],
+        "coalesced": _single_flight.get_stats()["coalesced"],
+        "opened": breaker_stats["opened"],
+        "rejected": breaker_stats["rejected"]
+    }
+
+def snapshot_api_stats():
+    """실행 시작 시점의 API 카운터 스냅샷 (format_api_report에 전달하면 이번 실행분만 보고)"""
+    return _api_counters()
+
+def format_api_report(before=None):
+    """
+    요청 제한기, 재시도 정책, 중복 요청 병합, 회로 차단기, API 상태의 현재 요약 문자열
+
+    Args:
+        before: 실행 시작 시점의 snapshot_api_stats() 결과 (None이면 프로세스 시작 이후 누적 횟수)
+    """
+    limiter_stats = get_rate_limiter().get_stats()
+    breaker_stats = get_circuit_breaker().get_stats()
+    counts = _api_counters()
+    if before:
+        counts = {key: value - before.get(key, 0) for key, value in counts.items()}
+    return (
+        f"요청 제한: 동시 한도 {limiter_stats['concurrency_limit']}, "
+        f"용량 초과 응답 {counts['throttled']}회, "
+        f"{_format_lane_report(limiter_stats)}"
+        f"재시도 {counts['retries']}회, 재시도 소진 {counts['exhausted']}회, "
+        f"중복 요청 병합 {counts['coalesced']}회, "
+        f"회로 {STATE_LABELS[breaker_stats['state']]} (열림 {counts['opened']}회, "
+        f"즉시 실패 {counts['rejected']}회)\n"
+        f"{get_health_monitor().format_report()}"
+        f"{_format_hedge_report()}"
+        f"{_format_backend_report()}"
+    )
+
+def _format_lane_report(limiter_stats):
+    """대화형 차선을 사용한 경우 평균 대기 시간 (없으면 빈 문자열)"""
+    interactive = limiter_stats["lanes"][RequestPriority.INTERACTIVE.value]
+    if not interactive["acquired"]:
+        return ""
+    average = interactive["wait_seconds"] / interactive["acquired"]
+    return f"대화형 요청 {interactive['acquired']}회 (평균 대기 {average:.2f}초), "
+
+def _format_hedge_report():
+    report = get_hedge_policy().format_report()
+    return f"\n{report}" if report else ""
+
+def _format_backend_report():
+    """로컬 대역/카세트 백엔드 사용 시 요약 (실제 API를 그대로 쓰면 빈 문자열)"""
+    from api.cassette import RecordingBackend, ReplayBackend
+    from api.local_backend import LocalBackend
+
+    client = get_client()
+    if isinstance(client, RecordingBackend):
+        return f"\nLLM 백엔드: 카세트 기록 중 ({client.writer.path}, {client.writer.records}개 기록)"
+    if isinstance(client, ReplayBackend):
+        stats = client.get_stats()
+        return (f"\nLLM 백엔드: 카세트 재생 ({client.path}, 재생 {stats['served']}회, "
+                f"카세트에 없는 요청 {stats['misses']}회)")
+    if isinstance(client, LocalBackend):
+        stats = client.get_stats()
+        return (f"\nLLM 백엔드: 로컬 대역 (호출 {stats['calls']}회, 429 주입 {stats['throttled']}회, "
+                f"5xx 주입 {stats['server_errors']}회, 시간 초과 {stats['timeouts']}회)")
+    return ""
+
+def _estimate_request_tokens(prompt):
+    """요청 제한기와 토큰 예산에 사용할 예상 입력 토큰 수"""
+    return max(1, estimate_tokens(prompt))
+
+def _usage_tokens(response):
+    """응답의 usage_metadata에서 총 토큰 수 추출 (없으면 None)"""
+    usage = getattr(response, "usage_metadata", None)
+    total = getattr(usage, "total_token_count", None) if usage is not None else None
+    return total or None
+
+def _get_async_semaphore():
+    """현재 이벤트 루프에 연결된 동시 요청 제한 세마포어 반환"""
+    loop = asyncio.get_running_loop()
+    semaphore = _async_semaphores.get(loop)
+    if semaphore is None:
+        limit = config.get("api", {}).get("async_concurrency", 100)
+        semaphore = asyncio.Semaphore(max(1, int(limit)))
+        _async_semaphores[loop] = semaphore
+    return semaphore
         
-def call_gemini_with_prompts(user_input, prompt_names, standard_info=None, additional_context=None):
+def call_gemini_with_prompts(user_input, prompt_names, standard_info=None, additional_context=None, use_cache=True,
+                             prompt_type=None, slot_values=None, model_name=None, generation_config=None,
+                             raise_errors=False):
     """
     선택된 프롬프트를 모두 반영하여 Gemini 호출
     
     Args:
         user_input: 사용자 입력 텍스트
-        prompt_names: 적용할 프롬프트 이름 목록
+        prompt_names: 적용할 프롬프트 이름 목록 또는 compile_prompt_set으로 미리 만든 CompiledPromptSet
+                      (CompiledPromptSet이면 standard_info와 prompt_type은 컴파일 시점 값을 사용)
         standard_info: 규격 정보 (선택적)
         additional_context: 추가 컨텍스트 정보 (선택적)
+        use_cache: 응답 캐시 사용 여부
+        prompt_type: 프롬프트 타입 (None이면 prompt_context로 선언된 현재 범위의 타입)
+        slot_values: 프롬프트 템플릿의 {clause}/{title} 자리에 채울 값 (선택적)
+        model_name: 사용할 모델 (None이면 DEFAULT_MODEL, 보통 ModelRouter가 행별로 선택)
+        generation_config: 생성 설정 (None이면 프롬프트 타입의 기본 프로필, 예: 배치 요청의 remark-batch-json)
+        raise_errors: True이면 호출 실패를 오류 문자열로 반환하지 않고 예외로 전달
+                      (보고서 생성기는 실패 항목을 결과로 저널/매니페스트에 남기지 않도록 True 사용)
     """
-    # 문자열을 리스트로 변환 (단일 프롬프트 호환성)
-    if isinstance(prompt_names, str):
-        prompt_names = [prompt_names]
-        
-    # 프롬프트가 없는 경우 기본 호출
-    if not prompt_names:
-        return call_gemini_with_context(user_input, additional_context)
-    
-    # 프롬프트 타입 결정 (채팅인지 보고서 생성인지)
-    prompt_type = determine_prompt_type()
+    combined_prompt, prompt_type = _build_prompt_with_prompts(
+        user_input, prompt_names, standard_info, additional_context, prompt_type, slot_values
+    )
+    if combined_prompt is None:
+        return call_gemini_with_context(user_input, additional_context, use_cache=use_cache, model_name=model_name,
+                                        raise_errors=raise_errors)
     
-    # 해당 유형의 프롬프트만 가져오기
     try:
-        prompts_data = load_prompts_by_type(prompt_type, as_dict=True, include_metadata=True)
+        # API 호출
+        response = call_gemini(combined_prompt, model_name=model_name or DEFAULT_MODEL, use_cache=use_cache,
+                               generation_config=generation_config, profile=profile_for_prompt_type(prompt_type))
+        
+        # 채팅 히스토리에 메시지 추가
+        if prompt_type == "chat":
+            _record_chat_exchange(user_input, response)
+        
+        return response
+    except (TokenBudgetExceeded, CircuitOpenError, CassetteMiss):
+        # 예산 초과/회로 차단/카세트 누락은 호출자가 남은 항목 처리를 판단하도록 그대로 전달
+        raise
     except Exception as e:
-        logger.error(f"프롬프트 로드 오류: {e}")
-        prompts_data = {}
-    
-    # 선택된 프롬프트만 필터링
-    selected_prompts = {name: data for name, data in prompts_data.items() 
-                        if name in prompt_names}
+        logger.error(f"API 호출 중 오류: {e}")
+        if raise_errors:
+            raise
+        return f"오류가 발생했습니다: {str(e)}"
+
+async def call_gemini_with_prompts_async(user_input, prompt_names, standard_info=None, additional_context=None,
+                                         use_cache=True, prompt_type=None, slot_values=None, model_name=None,
+                                         generation_config=None, raise_errors=False):
+    """call_gemini_with_prompts의 비동기 버전 (인자와 반환값 동일)"""
+    combined_prompt, prompt_type = _build_prompt_with_prompts(
+        user_input, prompt_names, standard_info, additional_context, prompt_type, slot_values
+    )
+    if combined_prompt is None:
+        return await call_gemini_with_context_async(user_input, additional_context, use_cache=use_cache,
+                                                    model_name=model_name, raise_errors=raise_errors)
     
-    if not selected_prompts:
-        logger.warning(f"선택된 '{prompt_type}' 유형의 프롬프트가 없습니다.")
-        return call_gemini_with_context(user_input, additional_context)  # 컨텍스트와 함께 호출
+    try:
+        response = await call_gemini_async(combined_prompt, model_name=model_name or DEFAULT_MODEL,
+                                           use_cache=use_cache, generation_config=generation_config,
+                                           profile=profile_for_prompt_type(prompt_type))
+        
+        if prompt_type == "chat":
+            _record_chat_exchange(user_input, response)
+        
+        return response
+    except (TokenBudgetExceeded, CircuitOpenError, CassetteMiss):
+        # 예산 초과/회로 차단/카세트 누락은 호출자가 남은 항목 처리를 판단하도록 그대로 전달
+        raise
+    except Exception as e:
+        logger.error(f"API 호출 중 오류: {e}")
+        if raise_errors:
+            raise
+        return f"오류가 발생했습니다: {str(e)}"
+
+def stream_gemini_with_prompts(user_input, prompt_names, standard_info=None, additional_context=None,
+                               use_cache=True, prompt_type=None, slot_values=None, model_name=None,
+                               generation_config=None):
+    """
+    call_gemini_with_prompts의 스트리밍 버전 (응답 조각을 yield)
+
+    프롬프트 구성은 call_gemini_with_prompts와 동일하며, 스트림이 끝나면
+    채팅 히스토리에 전체 응답을 기록합니다. 오류는 ValueError로 전달됩니다.
+    """
+    combined_prompt, prompt_type = _build_prompt_with_prompts(
+        user_input, prompt_names, standard_info, additional_context, prompt_type, slot_values
+    )
+    record_chat = True
+    profile = None
+    if combined_prompt is None:
+        combined_prompt = _build_context_prompt(user_input, additional_context)
+    else:
+        record_chat = prompt_type == "chat"
+        profile = profile_for_prompt_type(prompt_type)
     
-    # 우선순위에 따라 정렬
-    sorted_prompts = sorted(selected_prompts.items(), 
-                           key=lambda x: x[1].get('priority', 999))
+    parts = []
+    for chunk in stream_gemini(combined_prompt, model_name=model_name or DEFAULT_MODEL, use_cache=use_cache,
+                               generation_config=generation_config, profile=profile):
+        parts.append(chunk)
+        yield chunk
     
-    # 최종 프롬프트 생성
-    system_instructions = []
-    for i, (name, data) in enumerate(sorted_prompts):
-        instruction = data.get('template', '')
-        if instruction:
-            # 적용 순서를 포함하여 명시적으로 표시
-            system_instructions.append(f"# {name} 지침 (우선순위: {data.get('priority', 999)}, {i+1}번째 적용)\n{instruction}")
-            logger.info(f"프롬프트 적용: {name} (우선순위: {data.get('priority', 999)}, {i+1}번째)")
+    if record_chat:
+        _record_chat_exchange(user_input, "".join(parts).strip())
+
+def _build_prompt_with_prompts(user_input, prompt_names, standard_info=None, additional_context=None,
+                               prompt_type=None, slot_values=None):
+    """
+    선택된 프롬프트, 규격 정보, 컨텍스트를 결합한 최종 프롬프트 생성
     
-    # 규격 정보가 있으면 추가
-    if standard_info and isinstance(standard_info, dict) and standard_info.get('title', '') != '미확인 규격':
-        std_info_text = f"""
-# 규격 정보 
-- 규격명: {standard_info.get('title', '미확인 규격')}
-- 설명: {standard_info.get('description', '')}
-- 적용 범위: {standard_info.get('scope', '')}
-- 주요 섹션: {', '.join(standard_info.get('key_sections', []))}
-
-위 규격에 맞춰서 검토 의견을 작성해주세요. 규격의 요구사항을 기반으로 의견을 작성하세요.
-"""
-        system_instructions.append(std_info_text)
+    Args:
+        prompt_names: 프롬프트 이름 목록 또는 실행 단위로 미리 만든 CompiledPromptSet
+        slot_values: 프롬프트 템플릿의 {clause}/{title} 자리에 채울 값
     
-    # 채팅 및 파일 컨텍스트 추가
-    if prompt_type == "chat":
-        try:
-            context_str = chat_context.get_context_for_prompt()
-            if context_str:
-                system_instructions.append(f"# 현재 컨텍스트 정보\n{context_str}")
-                
-            # 분석 요약 정보 추가
-            summary = chat_context.get_context_analysis_summary()
-            if summary and summary.get('analysis_available') and any(summary['analysis_available'].values()):
-                analysis_text = "# 컨텍스트 분석 정보\n"
-                for file_type, has_analysis in summary['analysis_available'].items():
-                    if has_analysis and file_type == 'review_sheet':
-                        analysis = chat_context._cached_file_analysis.get(file_type, {})
-                        if analysis:
-                            analysis_text += f"- 검토 시트 항목 수: {analysis.get('clause_count', '알 수 없음')}\n"
-                            if analysis.get('has_standard_structure'):
-                                analysis_text += "- 표준 구조 (예: 1.2.3 형식)가 감지됨\n"
-                system_instructions.append(analysis_text)
-        except Exception as e:
-            logger.error(f"채팅 컨텍스트 추가 중 오류: {e}")
+    Returns:
+        tuple: (결합된 프롬프트 또는 None, 프롬프트 타입)
+               적용할 프롬프트가 없으면 None을 반환하며 호출자는 컨텍스트 호출로 대체
+    """
+    if isinstance(prompt_names, CompiledPromptSet):
+        compiled = prompt_names
+        prompt_type = compiled.prompt_type
+    else:
+        # 문자열을 리스트로 변환 (단일 프롬프트 호환성)
+        if isinstance(prompt_names, str):
+            prompt_names = [prompt_names]
+            
+        # 프롬프트가 없는 경우 기본 호출
+        if not prompt_names:
+            return None, None
+        
+        # 프롬프트 타입 결정 (채팅인지 보고서 생성인지)
+        prompt_type = determine_prompt_type(prompt_type)
+        compiled = compile_prompt_set(prompt_names, standard_info, prompt_type)
+        if compiled is None:
+            return None, prompt_type  # 컨텍스트와 함께 호출
     
-    # 추가 컨텍스트가 있으면 포함
+    # 호출마다 달라지는 섹션 (채팅/파일 컨텍스트, 추가 컨텍스트)
+    extra_sections = _chat_context_sections() if prompt_type == "chat" else []
     if additional_context and isinstance(additional_context, dict):
         for key, value in additional_context.items():
             if value:
-                system_instructions.append(f"# {key}\n{value}")
+                extra_sections.append(f"# {key}\n{value}")
     
-    # 모든 지침 + 사용자 입력 결합
-    combined_prompt = "\n\n".join(system_instructions)
-    combined_prompt += f"\n\n# 사용자 입력\n{user_input}"
+    combined_prompt = compiled.render(user_input, slot_values, extra_sections)
     
     # 디버그용 로그
     prompt_preview = combined_prompt[:200] + "..." if len(combined_prompt) > 200 else combined_prompt
-    logger.debug(f"결합된 프롬프트 ({len(prompt_names)}개): {prompt_preview}")
+    logger.debug(f"결합된 프롬프트 ({len(compiled.prompt_names)}개): {prompt_preview}")
+    
+    return combined_prompt, prompt_type
+
+def _chat_context_sections():
+    """채팅 프롬프트에 넣을 현재 파일 컨텍스트와 분석 요약 섹션"""
+    sections = []
+    try:
+        context_str = chat_context.get_context_for_prompt()
+        if context_str:
+            sections.append(f"# 현재 컨텍스트 정보\n{context_str}")
+            
+        # 분석 요약 정보 추가
+        summary = chat_context.get_context_analysis_summary()
+        if summary and summary.get('analysis_available') and any(summary['analysis_available'].values()):
+            analysis_text = "# 컨텍스트 분석 정보\n"
+            for file_type, has_analysis in summary['analysis_available'].items():
+                if has_analysis and file_type == 'review_sheet':
+                    analysis = chat_context._cached_file_analysis.get(file_type, {})
+                    if analysis:
+                        analysis_text += f"- 검토 시트 항목 수: {analysis.get('clause_count', '알 수 없음')}\n"
+                        if analysis.get('has_standard_structure'):
+                            analysis_text += "- 표준 구조 (예: 1.2.3 형식)가 감지됨\n"
+            sections.append(analysis_text)
+    except Exception as e:
+        logger.error(f"채팅 컨텍스트 추가 중 오류: {e}")
+    return sections
+
+def call_gemini_with_context(user_input, context_data=None, use_cache=True, model_name=None, raise_errors=False):
+    """
+    파일 컨텍스트를 포함한 Gemini API 호출
+    
+    Args:
+        user_input: 사용자 입력 텍스트
+        context_data: 추가 컨텍스트 정보
+        use_cache: 응답 캐시 사용 여부
+        model_name: 사용할 모델 (None이면 DEFAULT_MODEL)
+        raise_errors: True이면 호출 실패를 오류 문자열로 반환하지 않고 예외로 전달
+    """
+    prompt = _build_context_prompt(user_input, context_data)
     
     try:
         # API 호출
-        response = call_gemini(combined_prompt)
+        response = call_gemini(prompt, model_name=model_name or DEFAULT_MODEL, use_cache=use_cache)
         
         # 채팅 히스토리에 메시지 추가
-        if prompt_type == "chat":
-            chat_context.add_chat_message("user", user_input)
-            chat_context.add_chat_message("assistant", response)
+        _record_chat_exchange(user_input, response)
         
         return response
+    except (TokenBudgetExceeded, CircuitOpenError, CassetteMiss):
+        # 예산 초과/회로 차단/카세트 누락은 호출자가 남은 항목 처리를 판단하도록 그대로 전달
+        raise
     except Exception as e:
         logger.error(f"API 호출 중 오류: {e}")
+        if raise_errors:
+            raise
         return f"오류가 발생했습니다: {str(e)}"
 
-def call_gemini_with_context(user_input, context_data=None):
-    """
-    파일 컨텍스트를 포함한 Gemini API 호출
+async def call_gemini_with_context_async(user_input, context_data=None, use_cache=True, model_name=None,
+                                         raise_errors=False):
+    """call_gemini_with_context의 비동기 버전"""
+    prompt = _build_context_prompt(user_input, context_data)
     
-    Args:
-        user_input: 사용자 입력 텍스트
-        context_data: 추가 컨텍스트 정보
-    """
+    try:
+        response = await call_gemini_async(prompt, model_name=model_name or DEFAULT_MODEL, use_cache=use_cache)
+        _record_chat_exchange(user_input, response)
+        return response
+    except (TokenBudgetExceeded, CircuitOpenError, CassetteMiss):
+        # 예산 초과/회로 차단/카세트 누락은 호출자가 남은 항목 처리를 판단하도록 그대로 전달
+        raise
+    except Exception as e:
+        logger.error(f"API 호출 중 오류: {e}")
+        if raise_errors:
+            raise
+        return f"오류가 발생했습니다: {str(e)}"
+
+def _build_context_prompt(user_input, context_data=None):
+    """채팅/파일 컨텍스트와 사용자 질문을 결합한 프롬프트 생성"""
     # 기본 프롬프트 구성
     prompt_parts = ["기술 문서 검토 전문가로서 다음 질문에 답변해주세요."]
     
@@ -242,28 +850,20 @@ def call_gemini_with_context(user_input, context_data=None):
     prompt_preview = prompt[:200] + "..." if len(prompt) > 200 else prompt
     logger.debug(f"컨텍스트 프롬프트: {prompt_preview}")
     
-    try:
-        # API 호출
-        response = call_gemini(prompt)
-        
-        # 채팅 히스토리에 메시지 추가
-        chat_context.add_chat_message("user", user_input)
-        chat_context.add_chat_message("assistant", response)
-        
-        return response
-    except Exception as e:
-        logger.error(f"API 호출 중 오류: {e}")
-        return f"오류가 발생했습니다: {str(e)}"
+    return prompt
+
+def _record_chat_exchange(user_input, response):
+    """채팅 히스토리에 질문과 응답 추가"""
+    chat_context.add_chat_message("user", user_input)
+    chat_context.add_chat_message("assistant", response)
 
-def determine_prompt_type():
-    """현재 호출 컨텍스트에서 프롬프트 타입 결정"""
-    import inspect
-    stack = inspect.stack()
-    for frame in stack:
-        if 'handle_chat_input' in frame.function:
-            return "chat"
-        elif 'handle_generate' in frame.function or 'generate_remarks' in frame.function:
-            return "remark"
+def determine_prompt_type(prompt_type=None):
+    """
+    프롬프트 타입 결정
     
-    # 기본값
-    return "remark"
+    명시적으로 전달된 타입이 우선이며, 없으면 prompt_context로 선언된 현재 범위의 타입
+    (선언이 없으면 "remark")을 사용합니다.
+    """
+    if prompt_type is None:
+        prompt_type = current_prompt_type()
+    return PromptType(prompt_type).value
@@ -0,0 +1,74 @@
+# api/generation_profiles.py
+"""
+생성 설정 프로필 모듈
+AppContext.config["ai_settings"](temperature, top_p, top_k, max_output_tokens)를 기본값으로,
+용도별 프로필(config["generation_profiles"])의 값을 덮어써 모든 호출에 generation_config를 지정합니다.
+응답을 JSON으로 파싱하는 호출은 JSON 응답 MIME 타입을 사용하고, 검토 의견은 출력 토큰을 짧게 제한합니다.
+"""
+from api.request_context import PromptType
+from utils.config import config
+
+PROFILE_REMARK_SHORT = "remark-short"
+PROFILE_REMARK_BATCH_JSON = "remark-batch-json"
+PROFILE_CHAT = "chat"
+PROFILE_MATCHING_JSON = "matching-json"
+PROFILE_ANALYZER_JSON = "analyzer-json"
+
+PROFILES = (PROFILE_REMARK_SHORT, PROFILE_REMARK_BATCH_JSON, PROFILE_CHAT, PROFILE_MATCHING_JSON,
+            PROFILE_ANALYZER_JSON)
+
+JSON_MIME_TYPE = "application/json"
+
+# AppContext를 사용할 수 없을 때의 기본값 (AppContext.config["ai_settings"]와 동일)
+DEFAULT_AI_SETTINGS = {"temperature": 0.3, "top_p": 0.9, "top_k": 40, "max_output_tokens": 2048}
+
+# Gemini 모델의 최대 출력 토큰 수 (배치 프로필의 항목 수 배율 상한)
+MAX_OUTPUT_TOKENS = 8192
+
+_GENERATION_KEYS = ("temperature", "top_p", "top_k", "max_output_tokens", "response_mime_type")
+
+# 프롬프트 타입별 기본 프로필
+_PROMPT_TYPE_PROFILES = {PromptType.REMARK: PROFILE_REMARK_SHORT, PromptType.CHAT: PROFILE_CHAT}
+
+
+def _ai_settings():
+    """AppContext의 ai_settings (tkinter가 없는 환경 등에서는 기본값)"""
+    try:
+        from utils.app_context import AppContext
+        settings = AppContext.get_instance().config.get("ai_settings") or {}
+    except Exception:
+        settings = {}
+    return {**DEFAULT_AI_SETTINGS, **settings}
+
+
+def get_generation_config(profile, item_count=1):
+    """
+    프로필의 generation_config 생성
+
+    Args:
+        profile: 프로필 이름 (PROFILES 중 하나)
+        item_count: 한 요청에 묶은 항목 수 (remark-batch-json은 항목당 remark-short 상한 × 항목 수)
+
+    Returns:
+        dict: google.generativeai GenerationConfig에 넘길 값 (값이 없는 키는 제외)
+
+    Raises:
+        ValueError: 알 수 없는 프로필
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"알 수 없는 생성 프로필: {profile} (사용 가능: {', '.join(PROFILES)})")
+    overrides = config.get("generation_profiles", {})
+    settings = _ai_settings()
+    settings.update(overrides.get(profile, {}))
+
+    if profile == PROFILE_REMARK_BATCH_JSON:
+        per_item = {**_ai_settings(), **overrides.get(PROFILE_REMARK_SHORT, {})}["max_output_tokens"]
+        if per_item:
+            settings["max_output_tokens"] = min(MAX_OUTPUT_TOKENS, per_item * max(1, item_count))
+
+    return {key: settings[key] for key in _GENERATION_KEYS if settings.get(key) is not None and settings[key] != ""}
+
+
+def profile_for_prompt_type(prompt_type):
+    """프롬프트 타입의 기본 프로필 (보고서 생성은 remark-short, 채팅은 chat)"""
+    return _PROMPT_TYPE_PROFILES.get(PromptType(prompt_type), PROFILE_REMARK_SHORT)
@@ -0,0 +1,289 @@
+# api/health.py
+"""
+API 상태 모니터 모듈
+실제 요청의 왕복 지연과 오류를 수동으로 집계해 롤링 p50/p95와 오류율을 계산하고,
+회선이 TTL 이상 유휴 상태일 때만 가벼운 프로브(모델 메타데이터 조회)를 보냅니다.
+상태가 바뀌면 AppContext 이벤트("api_health_changed")로 스냅숏을 알립니다.
+"""
+import threading
+import time
+from collections import deque
+
+from utils.config import config
+from utils.logger import logger
+
+HEALTH_EVENT = "api_health_changed"
+
+# 상태 값
+STATUS_UNKNOWN = "unknown"
+STATUS_HEALTHY = "healthy"
+STATUS_DEGRADED = "degraded"
+STATUS_DOWN = "down"
+STATUS_NO_KEY = "no_key"
+
+STATUS_LABELS = {
+    STATUS_UNKNOWN: "확인 대기",
+    STATUS_HEALTHY: "정상",
+    STATUS_DEGRADED: "지연/불안정",
+    STATUS_DOWN: "연결 오류",
+    STATUS_NO_KEY: "API 키 없음",
+}
+
+# 같은 상태에서 지연 통계만 바뀐 경우의 최소 알림 간격 (초)
+_PUBLISH_INTERVAL = 1.0
+
+
+def _has_api_key():
+    from api.client import has_api_key
+    return has_api_key()
+
+
+def _percentile(sorted_values, fraction):
+    """정렬된 목록의 백분위 값 (최근접 순위)"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class HealthMonitor:
+    """실제 트래픽 기반 API 상태 집계기 (유휴 시에만 백그라운드 프로브)"""
+
+    def __init__(self, ttl=60.0, window_size=200, window_seconds=300.0, slow_latency=15.0,
+                 degraded_error_rate=0.2, down_error_rate=0.6, probe_func=None, check_interval=5.0):
+        """
+        Args:
+            ttl: 상태 유효 시간 (마지막 표본이 이보다 오래되면 유휴로 보고 프로브)
+            window_size: 롤링 창에 보관하는 최대 표본 수
+            window_seconds: 이보다 오래된 표본은 통계에서 제외
+            slow_latency: p95가 이 값(초)을 넘으면 지연 상태
+            degraded_error_rate / down_error_rate: 지연/오류 상태로 보는 오류율
+            probe_func: 유휴 시 호출할 프로브 함수 (예외가 없으면 성공)
+            check_interval: 백그라운드 스레드의 유휴 확인 간격 (초)
+        """
+        self.ttl = ttl
+        self.window_seconds = window_seconds
+        self.slow_latency = slow_latency
+        self.degraded_error_rate = degraded_error_rate
+        self.down_error_rate = down_error_rate
+        self.probe_func = probe_func
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window_size)  # (시각, 지연, 성공 여부)
+        self._last_error = None
+        self._probes = 0
+        self._published = (None, 0.0)  # (상태, 시각)
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def record(self, latency, success, error=None, probe=False):
+        """요청 1회의 왕복 지연(초)과 성공 여부 기록"""
+        with self._lock:
+            self._samples.append((time.time(), float(latency), bool(success)))
+            if probe:
+                self._probes += 1
+            if not success:
+                self._last_error = str(error) if error is not None else None
+        self._maybe_publish()
+
+    def _recent_samples(self, now):
+        cutoff = now - self.window_seconds
+        return [sample for sample in self._samples if sample[0] >= cutoff]
+
+    def snapshot(self):
+        """
+        현재 상태 스냅숏
+
+        Returns:
+            dict: status, label, p50, p95 (초 또는 None), error_rate, samples, age (마지막 표본 이후 초),
+                  stale (TTL 경과 여부), last_error, probes
+        """
+        now = time.time()
+        with self._lock:
+            samples = self._recent_samples(now)
+            last_error = self._last_error
+            probes = self._probes
+            last_at = self._samples[-1][0] if self._samples else None
+
+        latencies = sorted(latency for _, latency, success in samples if success)
+        errors = sum(1 for _, _, success in samples if not success)
+        error_rate = errors / len(samples) if samples else 0.0
+        p50 = _percentile(latencies, 0.5)
+        p95 = _percentile(latencies, 0.95)
+
+        if not _has_api_key():
+            status = STATUS_NO_KEY
+        elif not samples:
+            status = STATUS_UNKNOWN
+        elif error_rate >= self.down_error_rate:
+            status = STATUS_DOWN
+        elif error_rate >= self.degraded_error_rate or (p95 is not None and p95 > self.slow_latency):
+            status = STATUS_DEGRADED
+        else:
+            status = STATUS_HEALTHY
+
+        age = now - last_at if last_at is not None else None
+        return {
+            "status": status,
+            "label": STATUS_LABELS[status],
+            "p50": p50,
+            "p95": p95,
+            "error_rate": error_rate,
+            "samples": len(samples),
+            "age": age,
+            "stale": age is None or age > self.ttl,
+            "last_error": last_error,
+            "probes": probes,
+        }
+
+    def is_available(self):
+        """요청을 보낼 만한 상태인지 (키가 있고 연결 오류 상태가 아님)"""
+        return self.snapshot()["status"] not in (STATUS_NO_KEY, STATUS_DOWN)
+
+    def _maybe_publish(self, force=False):
+        """
+        알림 간격이 지났으면 스냅숏을 이벤트로 알림
+
+        요청마다 호출되므로 간격 안에서는 스냅숏(표본 정렬, API 키 확인)을 만들지 않습니다.
+        간격 안에서 바뀐 상태는 다음 요청이나 백그라운드 확인 때 알립니다.
+        """
+        now = time.monotonic()
+        with self._lock:
+            last_status, last_at = self._published
+            if not force and now - last_at < _PUBLISH_INTERVAL:
+                return
+            self._published = (last_status, now)  # 다른 스레드가 같은 간격에 중복 알림하지 않게 먼저 표시
+
+        snapshot = self.snapshot()
+        with self._lock:
+            self._published = (snapshot["status"], now)
+
+        if snapshot["status"] != last_status:
+            logger.info(f"API 상태: {snapshot['label']}")
+        try:
+            from utils.app_context import AppContext
+            AppContext.get_instance().trigger_event(HEALTH_EVENT, snapshot)
+        except Exception as e:
+            logger.debug(f"API 상태 알림 실패: {e}")
+
+    def probe_if_idle(self):
+        """
+        TTL 동안 실제 요청이 없었을 때만 프로브 1회 실행
+
+        Returns:
+            bool: 프로브를 보냈는지 여부
+        """
+        if self.probe_func is None or not _has_api_key():
+            return False
+        if not self.snapshot()["stale"]:
+            return False
+
+        start = time.monotonic()
+        try:
+            self.probe_func()
+        except Exception as e:
+            self.record(time.monotonic() - start, False, e, probe=True)
+            logger.debug(f"API 상태 프로브 실패: {e}")
+        else:
+            self.record(time.monotonic() - start, True, probe=True)
+        return True
+
+    def request_probe(self):
+        """백그라운드 스레드가 다음 확인을 바로 하도록 깨움"""
+        self._wake.set()
+
+    def start(self):
+        """유휴 확인 백그라운드 스레드 시작 (이미 실행 중이면 무시)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="api-health-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """백그라운드 스레드 종료"""
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.probe_if_idle()
+                self._maybe_publish()
+            except Exception as e:
+                logger.debug(f"API 상태 확인 중 오류: {e}")
+            self._wake.wait(self.check_interval)
+            self._wake.clear()
+
+    def format_report(self):
+        """상태 요약 문자열"""
+        snapshot = self.snapshot()
+        if not snapshot["samples"]:
+            return f"API 상태: {snapshot['label']}"
+        latency = ""
+        if snapshot["p50"] is not None:
+            latency = f", 지연 p50 {snapshot['p50']:.2f}s / p95 {snapshot['p95']:.2f}s"
+        return (f"API 상태: {snapshot['label']}{latency}, "
+                f"오류율 {snapshot['error_rate'] * 100:.0f}% (최근 {snapshot['samples']}회)")
+
+
+_monitor = None
+_monitor_lock = threading.Lock()
+
+
+def _default_probe():
+    """가벼운 프로브: 토큰을 쓰지 않는 모델 메타데이터 조회"""
+    from api.client import get_client
+    get_client().probe(config.get("health", {}).get("probe_model", "gemini-1.5-flash"))
+
+
+def get_health_monitor():
+    """
+    config["health"] 값으로 초기화된 공용 HealthMonitor 반환
+
+    유휴 프로브 스레드는 start_health_monitor()(GUI 시작 시) 또는 get_api_status() 호출 시에만 시작되므로
+    스크립트나 테스트에서는 실제 요청의 수동 집계만 동작합니다.
+    """
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                health_config = config.get("health", {})
+                monitor = HealthMonitor(
+                    ttl=health_config.get("ttl_seconds", 60),
+                    window_size=health_config.get("window_size", 200),
+                    window_seconds=health_config.get("window_seconds", 300),
+                    slow_latency=health_config.get("slow_latency_seconds", 15),
+                    probe_func=_default_probe,
+                    check_interval=health_config.get("check_interval_seconds", 5)
+                )
+                _monitor = monitor
+    return _monitor
+
+
+def start_health_monitor():
+    """공용 모니터의 유휴 프로브 스레드 시작 (config["health"]["background_probe"]가 False면 수동 집계만)"""
+    monitor = get_health_monitor()
+    if config.get("health", {}).get("background_probe", True):
+        monitor.start()
+    return monitor
+
+
+def check_run_health():
+    """
+    실행 시작 전 캐시된 API 상태 확인 (왕복 요청 없음)
+
+    연결 오류/지연 상태이면 경고를 출력합니다. 실행 자체는 막지 않습니다.
+
+    Returns:
+        dict: HealthMonitor.snapshot() 결과
+    """
+    snapshot = get_health_monitor().snapshot()
+    if snapshot["status"] in (STATUS_DOWN, STATUS_DEGRADED):
+        message = f"경고: 최근 API 상태가 '{snapshot['label']}'입니다. {get_health_monitor().format_report()}"
+        print(message)
+        logger.warning(message)
+    return snapshot
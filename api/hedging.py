@@ -0,0 +1,282 @@
+# api/hedging.py
+"""
+요청 헤징 모듈
+모델별 롤링 지연 히스토그램으로 p95 지연을 추적하고, 요청이 그 시간 안에 끝나지 않으면
+같은 요청을 한 번 더 보내 먼저 성공한 응답을 사용합니다 (나머지는 취소하거나 무시).
+추가 요청 비율에 상한을 두어 평균 부하는 거의 늘리지 않고 꼬리 지연만 줄입니다.
+"""
+import asyncio
+import bisect
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from api.request_context import submit_in_context
+from utils.config import config
+from utils.logger import logger
+
+# 히스토그램 구간 경계 (0.05초부터 1.25배 간격, 약 300초까지)
+_BUCKET_BOUNDS = []
+_bound = 0.05
+while _bound < 300:
+    _BUCKET_BOUNDS.append(round(_bound, 4))
+    _bound *= 1.25
+
+
+class LatencyHistogram:
+    """최근 window_size개 표본의 로그 간격 지연 히스토그램 (백분위 계산이 구간 수에 비례)"""
+
+    def __init__(self, window_size=500):
+        self._samples = deque()
+        self._window_size = max(1, window_size)
+        self._counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def record(self, latency):
+        bucket = bisect.bisect_left(_BUCKET_BOUNDS, latency)
+        self._samples.append(bucket)
+        self._counts[bucket] += 1
+        if len(self._samples) > self._window_size:
+            self._counts[self._samples.popleft()] -= 1
+
+    def percentile(self, fraction):
+        """백분위 지연 (해당 구간의 상한, 표본이 없으면 None)"""
+        total = len(self._samples)
+        if not total:
+            return None
+        target = fraction * total
+        seen = 0
+        for bucket, count in enumerate(self._counts):
+            seen += count
+            if seen >= target:
+                return _BUCKET_BOUNDS[bucket] if bucket < len(_BUCKET_BOUNDS) else _BUCKET_BOUNDS[-1]
+        return _BUCKET_BOUNDS[-1]
+
+
+class HedgePolicy:
+    """p95 지연 기반 헤징 정책 (스레드/이벤트 루프 공용)"""
+
+    def __init__(self, enabled=False, percentile=0.95, max_extra_ratio=0.05, min_samples=20, min_delay=1.0,
+                 window_size=500, max_workers=32):
+        """
+        Args:
+            enabled: False이면 헤징하지 않음 (지연 기록은 계속)
+            percentile: 헤징 요청을 보낼 지연 백분위
+            max_extra_ratio: 전체 요청 대비 헤징 요청 비율 상한
+            min_samples: 헤징을 시작하기 위한 모델별 최소 표본 수
+            min_delay: 헤징 전 최소 대기 시간 (초)
+            window_size: 모델별 히스토그램의 최근 표본 수
+            max_workers: 동기 헤징에 사용하는 스레드 수
+        """
+        self.enabled = enabled
+        self.percentile = percentile
+        self.max_extra_ratio = max_extra_ratio
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.window_size = window_size
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._executor = None
+        self._stats = {"requests": 0, "hedged": 0, "hedge_wins": 0}
+
+    @classmethod
+    def from_config(cls):
+        """config["hedging"] 값으로 생성"""
+        hedging = config.get("hedging", {})
+        return cls(
+            enabled=hedging.get("enabled", False),
+            percentile=hedging.get("percentile", 0.95),
+            max_extra_ratio=hedging.get("max_extra_ratio", 0.05),
+            min_samples=hedging.get("min_samples", 20),
+            min_delay=hedging.get("min_delay_seconds", 1.0),
+            window_size=hedging.get("window_size", 500),
+            max_workers=config.get("api", {}).get("max_parallel_requests", 32)
+        )
+
+    def record_latency(self, model_name, latency):
+        """완료된 개별 요청의 지연 기록 (헤징 요청 포함, 헤징 결과가 아닌 실제 호출 지연)"""
+        with self._lock:
+            histogram = self._histograms.get(model_name)
+            if histogram is None:
+                histogram = self._histograms[model_name] = LatencyHistogram(self.window_size)
+            histogram.record(latency)
+
+    def hedge_delay(self, model_name):
+        """
+        헤징 요청을 보내기까지 기다릴 시간
+
+        Returns:
+            float or None: 대기 시간 (헤징하지 않으면 None)
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            histogram = self._histograms.get(model_name)
+            if histogram is None or len(histogram) < self.min_samples:
+                return None
+            return max(self.min_delay, histogram.percentile(self.percentile))
+
+    def _begin(self):
+        with self._lock:
+            self._stats["requests"] += 1
+
+    def _has_hedge_room(self):
+        """지금 헤징 1회를 더 보낼 비율 여유가 있는지 (예약하지 않고 확인만)"""
+        with self._lock:
+            return self._stats["hedged"] + 1 <= self.max_extra_ratio * self._stats["requests"]
+
+    def _reserve_hedge(self):
+        """추가 요청 비율 상한 안이면 헤징 1회 예약"""
+        with self._lock:
+            if self._stats["hedged"] + 1 > self.max_extra_ratio * self._stats["requests"]:
+                return False
+            self._stats["hedged"] += 1
+            return True
+
+    def _unreserve_hedge(self):
+        with self._lock:
+            self._stats["hedged"] -= 1
+
+    def _count_win(self):
+        with self._lock:
+            self._stats["hedge_wins"] += 1
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hedge")
+            return self._executor
+
+    def _timed(self, func, model_name, elapsed):
+        start = time.monotonic()
+        try:
+            return func(elapsed)
+        finally:
+            self.record_latency(model_name, time.monotonic() - start)
+
+    def call(self, func, model_name, acquire_extra=None, release_extra=None):
+        """
+        func(경과 시간)를 실행하고, p95 안에 끝나지 않으면 헤징 요청을 한 번 더 보냄
+
+        Args:
+            func: 원 요청 시작 후 경과 시간(초)을 받아 응답을 반환하는 함수 (헤징 요청의 시간 제한 계산용)
+            model_name: 지연 히스토그램을 구분할 모델 이름
+            acquire_extra: 헤징 요청 전 호출, False를 반환하면 헤징하지 않음 (요청 제한기 슬롯 등)
+            release_extra: 헤징 요청이 끝나면 오류(또는 None)를 인자로 호출
+
+        헤징 비율 여유가 없으면 원 요청을 호출 스레드에서 바로 실행합니다. 스레드 풀에서 실행하는 요청은
+        호출 스레드의 컨텍스트(프롬프트 타입, 우선순위 차선, 토큰 장부)를 복사해 실행합니다.
+
+        Raises:
+            두 요청이 모두 실패하면 원 요청의 예외
+        """
+        self._begin()
+        if not self.enabled or not self._has_hedge_room():
+            return self._timed(func, model_name, 0.0)
+
+        executor = self._get_executor()
+        started = time.monotonic()
+        primary = submit_in_context(executor, self._timed, func, model_name, 0.0)
+        # 표본이 모이기 전(실행 초반)에 시작한 요청도 헤징할 수 있도록 기다리면서 지연 기준을 다시 확인
+        while True:
+            delay = self.hedge_delay(model_name)
+            timeout = self.min_delay if delay is None else max(0.0, delay - (time.monotonic() - started))
+            done, _ = wait([primary], timeout=timeout)
+            if done:
+                return primary.result()
+            if delay is not None:
+                break
+        if not self._reserve_hedge():
+            return primary.result()
+        if acquire_extra is not None and not acquire_extra():
+            self._unreserve_hedge()
+            return primary.result()
+
+        logger.debug(f"헤징 요청 전송 ({model_name}, {delay:.1f}초 경과)")
+        hedge = submit_in_context(executor, self._timed, func, model_name, time.monotonic() - started)
+        if release_extra is not None:
+            hedge.add_done_callback(lambda future: release_extra(future.exception()))
+
+        # 먼저 성공한 응답 사용 (늦은 쪽은 결과를 무시)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in (primary, hedge):
+                if future in done and future.exception() is None:
+                    if future is hedge:
+                        self._count_win()
+                    return future.result()
+        raise primary.exception()
+
+    async def call_async(self, func, model_name, acquire_extra=None, release_extra=None):
+        """call의 비동기 버전 (func는 awaitable을 반환, 늦은 쪽 요청은 취소)"""
+        self._begin()
+
+        async def timed(elapsed):
+            start = time.monotonic()
+            try:
+                return await func(elapsed)
+            finally:
+                self.record_latency(model_name, time.monotonic() - start)
+
+        if not self.enabled:
+            return await timed(0.0)
+
+        started = time.monotonic()
+        primary = asyncio.ensure_future(timed(0.0))
+        tasks = [primary]
+        try:
+            while True:
+                delay = self.hedge_delay(model_name)
+                timeout = self.min_delay if delay is None else max(0.0, delay - (time.monotonic() - started))
+                done, _ = await asyncio.wait({primary}, timeout=timeout)
+                if done:
+                    return primary.result()
+                if delay is not None:
+                    break
+            if not self._reserve_hedge():
+                return await primary
+            if acquire_extra is not None and not await acquire_extra():
+                self._unreserve_hedge()
+                return await primary
+
+            logger.debug(f"헤징 요청 전송 ({model_name}, {delay:.1f}초 경과)")
+            hedge = asyncio.ensure_future(timed(time.monotonic() - started))
+            if release_extra is not None:
+                hedge.add_done_callback(
+                    lambda task: release_extra(None if task.cancelled() else task.exception())
+                )
+            tasks.append(hedge)
+
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in (primary, hedge):
+                    if task in done and task.exception() is None:
+                        if task is hedge:
+                            self._count_win()
+                        return task.result()
+            raise primary.exception()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def get_stats(self):
+        """전체 요청 수, 헤징 요청 수, 헤징 요청이 먼저 응답한 횟수"""
+        with self._lock:
+            return dict(self._stats)
+
+    def format_report(self):
+        """헤징 요약 문자열 (비활성이면 빈 문자열)"""
+        if not self.enabled:
+            return ""
+        stats = self.get_stats()
+        ratio = stats["hedged"] * 100 / stats["requests"] if stats["requests"] else 0
+        return (f"요청 헤징: {stats['hedged']}회 ({ratio:.1f}%, 상한 {self.max_extra_ratio * 100:.0f}%), "
+                f"헤징 응답 채택 {stats['hedge_wins']}회")
@@ -0,0 +1,74 @@
+# api/llm_backend.py
+"""
+LLM 백엔드 인터페이스 모듈
+api/gemini.py가 사용하는 백엔드 규약(LLMBackend)과 백엔드 선택 규칙을 정의합니다.
+config["llm"]["backend"] 또는 환경 변수 LLM_BACKEND로 "gemini"(실제 API)와
+"local"(네트워크 없이 동작하는 대역 백엔드) 중 하나를 고릅니다.
+"""
+import os
+from typing import Any, Optional, Protocol, runtime_checkable
+
+from utils.config import config
+
+BACKEND_ENV_VAR = "LLM_BACKEND"
+DEFAULT_BACKEND = "gemini"
+BACKEND_NAMES = ("gemini", "local")
+
+
+@runtime_checkable
+class LLMBackend(Protocol):
+    """
+    생성 요청 백엔드 규약
+
+    generate/generate_async의 반환값은 google.generativeai 응답과 같은 모양
+    (text, usage_metadata, stream=True이면 text 속성을 가진 조각의 반복자)이어야 하며,
+    오류는 google.api_core.exceptions 예외로 알려 재시도/요청 제한/회로 차단이 그대로 동작하게 합니다.
+    """
+
+    # API 키(GEMINI_API_KEY)가 필요한 백엔드인지 여부
+    requires_api_key: bool
+
+    def ensure_configured(self) -> None:
+        """요청 전 설정 확인 (설정할 수 없으면 ValueError)"""
+        ...
+
+    def generate(self, prompt: str, model_name: str, generation_config: Optional[Any] = None,
+                 **kwargs: Any) -> Any:
+        """동기 생성 요청 (stream=True, request_options={"timeout": 초} 인자 지원)"""
+        ...
+
+    async def generate_async(self, prompt: str, model_name: str, generation_config: Optional[Any] = None,
+                             **kwargs: Any) -> Any:
+        """비동기 생성 요청"""
+        ...
+
+    def probe(self, model_name: str) -> Any:
+        """토큰을 소비하지 않는 가벼운 연결 확인"""
+        ...
+
+    def reset(self) -> None:
+        """설정 및 내부 상태 초기화"""
+        ...
+
+
+def get_backend_name():
+    """
+    사용할 백엔드 이름 (환경 변수 LLM_BACKEND > config["llm"]["backend"] > "gemini")
+
+    Raises:
+        ValueError: 알 수 없는 백엔드 이름
+    """
+    name = os.getenv(BACKEND_ENV_VAR) or config.get("llm", {}).get("backend") or DEFAULT_BACKEND
+    name = name.strip().lower()
+    if name not in BACKEND_NAMES:
+        raise ValueError(f"알 수 없는 LLM 백엔드: {name} (사용 가능: {', '.join(BACKEND_NAMES)})")
+    return name
+
+
+def create_backend(name):
+    """이름에 해당하는 백엔드 인스턴스 생성"""
+    if name == "local":
+        from api.local_backend import LocalBackend
+        return LocalBackend.from_config()
+    from api.client import GeminiClient
+    return GeminiClient()
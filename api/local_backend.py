@@ -0,0 +1,241 @@
+# api/local_backend.py
+"""
+로컬 대역 LLM 백엔드 모듈
+네트워크와 API 할당량 없이 생성기의 동시성, 요청 제한기, 캐시 동작을 측정하기 위한
+프로세스 내 가짜 백엔드입니다. 지연 분포, 429/5xx 오류 주입, 결정적(재현 가능한) 응답을 지원합니다.
+
+사용: config["llm"]["backend"] = "local" 또는 환경 변수 LLM_BACKEND=local
+"""
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from google.api_core import exceptions as google_exceptions
+
+from api.token_accounting import estimate_tokens
+from utils.config import config
+from utils.logger import logger
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+# 배치 요청(logic/batch_generator.build_batch_input)의 항목 ID 표시
+_BATCH_ITEM_PATTERN = re.compile(r"^## 항목 ID: (.+)$", re.MULTILINE)
+
+# 스트리밍 응답을 나눌 조각 수
+_STREAM_CHUNKS = 4
+
+
+class LocalResponse:
+    """google.generativeai 응답과 같은 모양의 응답 (text, usage_metadata)"""
+
+    def __init__(self, text, prompt_tokens):
+        self.text = text
+        output_tokens = estimate_tokens(text)
+        self.usage_metadata = SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens
+        )
+
+
+class LocalStreamResponse:
+    """stream=True 응답 (text 속성을 가진 조각을 조각 간 지연을 두고 반환)"""
+
+    def __init__(self, text, prompt_tokens, chunk_delay):
+        self._text = text
+        self._chunk_delay = chunk_delay
+        self.usage_metadata = LocalResponse(text, prompt_tokens).usage_metadata
+
+    def __iter__(self):
+        size = max(1, math.ceil(len(self._text) / _STREAM_CHUNKS))
+        for i in range(0, len(self._text), size):
+            if i:
+                time.sleep(self._chunk_delay)
+            yield SimpleNamespace(text=self._text[i:i + size])
+
+
+class LocalBackend:
+    """프로세스 내 대역 백엔드 (LLMBackend 구현, API 키 불필요)"""
+
+    requires_api_key = False
+
+    def __init__(self, seed=0, latency_distribution="lognormal", latency_median=0.8, latency_sigma=0.4,
+                 latency_min=0.05, latency_max=10.0, rate_limit_error_rate=0.0, server_error_rate=0.0,
+                 responses_path="", output_chars=200):
+        """
+        Args:
+            seed: 난수 시드 (같은 시드와 프롬프트면 지연, 오류, 응답이 항상 같음)
+            latency_distribution: "fixed"(항상 중앙값), "uniform"(최소~최대), "lognormal"(중앙값, sigma)
+            latency_median / latency_sigma: 지연 중앙값(초)과 로그정규 분포의 sigma
+            latency_min / latency_max: 지연 하한/상한 (초)
+            rate_limit_error_rate: 429(TooManyRequests)를 주입할 확률
+            server_error_rate: 500/503을 주입할 확률
+            responses_path: 미리 준비한 응답 JSON 파일 ([{"match": 프롬프트 부분 문자열, "response": 응답}, ...])
+            output_chars: 기본 응답의 대략적인 길이 (문자 수)
+        """
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"알 수 없는 지연 분포: {latency_distribution} (사용 가능: {', '.join(LATENCY_DISTRIBUTIONS)})")
+        self.seed = seed
+        self.latency_distribution = latency_distribution
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.latency_min = latency_min
+        self.latency_max = max(latency_min, latency_max)
+        self.rate_limit_error_rate = rate_limit_error_rate
+        self.server_error_rate = server_error_rate
+        self.output_chars = output_chars
+        self.canned_responses = self._load_responses(responses_path)
+
+        self._lock = threading.Lock()
+        self._attempts = {}  # 프롬프트 해시별 시도 횟수 (재시도마다 다른 결과를 재현 가능하게 뽑기 위함)
+        self._stats = {"calls": 0, "throttled": 0, "server_errors": 0, "timeouts": 0}
+
+    @classmethod
+    def from_config(cls):
+        """config["llm"]["local"] 값으로 생성"""
+        local = config.get("llm", {}).get("local", {})
+        return cls(
+            seed=local.get("seed", 0),
+            latency_distribution=local.get("latency_distribution", "lognormal"),
+            latency_median=local.get("latency_median", 0.8),
+            latency_sigma=local.get("latency_sigma", 0.4),
+            latency_min=local.get("latency_min", 0.05),
+            latency_max=local.get("latency_max", 10.0),
+            rate_limit_error_rate=local.get("rate_limit_error_rate", 0.0),
+            server_error_rate=local.get("server_error_rate", 0.0),
+            responses_path=local.get("responses_path", ""),
+            output_chars=local.get("output_chars", 200)
+        )
+
+    @staticmethod
+    def _load_responses(path):
+        if not path:
+            return []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return [entry for entry in json.load(f) if entry.get("match") is not None]
+        except Exception as e:
+            logger.warning(f"로컬 백엔드 응답 파일 로드 실패 ({path}): {e}")
+            return []
+
+    def ensure_configured(self):
+        """설정할 것이 없음 (API 키 불필요)"""
+
+    def probe(self, model_name):
+        """즉시 성공하는 연결 확인"""
+        return SimpleNamespace(name=f"models/{model_name}")
+
+    def reset(self):
+        """시도 횟수와 통계 초기화"""
+        with self._lock:
+            self._attempts.clear()
+            self._stats = {key: 0 for key in self._stats}
+
+    def _plan(self, prompt, model_name):
+        """
+        요청 1회의 결과 결정 (지연, 주입할 오류)
+
+        같은 시드/모델/프롬프트의 n번째 시도는 항상 같은 결과가 나옵니다.
+        """
+        digest = hashlib.sha256(f"{model_name}\n{prompt}".encode("utf-8")).hexdigest()
+        with self._lock:
+            attempt = self._attempts.get(digest, 0)
+            self._attempts[digest] = attempt + 1
+            self._stats["calls"] += 1
+        rng = random.Random(f"{self.seed}:{digest}:{attempt}")
+
+        if self.latency_distribution == "fixed":
+            latency = self.latency_median
+        elif self.latency_distribution == "uniform":
+            latency = rng.uniform(self.latency_min, self.latency_max)
+        else:
+            latency = self.latency_median * math.exp(self.latency_sigma * rng.gauss(0, 1))
+        latency = min(self.latency_max, max(self.latency_min, latency))
+
+        roll = rng.random()
+        error = None
+        if roll < self.rate_limit_error_rate:
+            error = google_exceptions.TooManyRequests("429 로컬 백엔드 주입 오류: Resource has been exhausted")
+            self._count("throttled")
+        elif roll < self.rate_limit_error_rate + self.server_error_rate:
+            error_type = google_exceptions.ServiceUnavailable if rng.random() < 0.5 else google_exceptions.InternalServerError
+            error = error_type("로컬 백엔드 주입 오류")
+            self._count("server_errors")
+        return digest, latency, error
+
+    def _respond(self, prompt, digest):
+        """결정적 응답 텍스트 (준비된 응답 > 배치 JSON 배열 > 기본 응답)"""
+        for entry in self.canned_responses:
+            if entry["match"] in prompt:
+                return entry.get("response", "")
+
+        batch_keys = _BATCH_ITEM_PATTERN.findall(prompt)
+        if batch_keys:
+            return json.dumps([{"id": key.strip(), "remark": self._default_text(digest + key)} for key in batch_keys],
+                              ensure_ascii=False)
+        return self._default_text(digest)
+
+    def _default_text(self, seed_text):
+        digest = hashlib.sha256(seed_text.encode("utf-8")).hexdigest()
+        text = f"[로컬 응답 {digest[:8]}] 요구사항 충족 여부를 확인했습니다."
+        filler = " 관련 시험 결과와 문서 근거를 검토했습니다."
+        while len(text) + len(filler) <= self.output_chars:
+            text += filler
+        return text
+
+    def _timeout(self, kwargs):
+        return (kwargs.get("request_options") or {}).get("timeout")
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _deadline_error(self, timeout):
+        self._count("timeouts")
+        return google_exceptions.DeadlineExceeded(f"504 로컬 백엔드 응답 시간 초과 ({timeout:.1f}초)")
+
+    def generate(self, prompt, model_name, generation_config=None, stream=False, **kwargs):
+        """지연 후 결정적 응답 반환 (주입된 오류나 시간 초과면 google.api_core 예외)"""
+        digest, latency, error = self._plan(prompt, model_name)
+        timeout = self._timeout(kwargs)
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise self._deadline_error(timeout)
+
+        text = self._respond(prompt, digest)
+        prompt_tokens = estimate_tokens(prompt)
+        if stream:
+            # 첫 조각까지 지연의 절반, 나머지는 조각 사이에 나눠서
+            time.sleep(latency / 2)
+            if error is not None:
+                raise error
+            return LocalStreamResponse(text, prompt_tokens, latency / 2 / _STREAM_CHUNKS)
+
+        time.sleep(latency)
+        if error is not None:
+            raise error
+        return LocalResponse(text, prompt_tokens)
+
+    async def generate_async(self, prompt, model_name, generation_config=None, **kwargs):
+        """generate의 비동기 버전 (스트리밍 미지원)"""
+        digest, latency, error = self._plan(prompt, model_name)
+        timeout = self._timeout(kwargs)
+        if timeout is not None and latency > timeout:
+            await asyncio.sleep(timeout)
+            raise self._deadline_error(timeout)
+
+        await asyncio.sleep(latency)
+        if error is not None:
+            raise error
+        return LocalResponse(self._respond(prompt, digest), estimate_tokens(prompt))
+
+    def get_stats(self):
+        """호출 수와 주입한 오류 수 반환"""
+        with self._lock:
+            return dict(self._stats)
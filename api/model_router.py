@@ -0,0 +1,127 @@
+# api/model_router.py
+"""
+모델 라우팅 모듈
+행마다 복잡도 점수(컨텍스트 길이, 채워진 열 수, 요구사항 본문 유무, 프롬프트 타입)를 계산해
+단순한 행은 빠른 모델로, 나머지는 고성능 모델로 보냅니다.
+"""
+import threading
+
+import pandas as pd
+
+from utils.config import config
+
+# 요구사항 본문으로 간주하는 열 이름 키워드
+REQUIREMENT_KEYWORDS = ('requirement', 'description', '요구사항', '내용')
+
+# 짧은 판정 값 (이 값만 있는 행은 단순 확인 항목으로 취급)
+SIMPLE_VERDICTS = {'n/a', 'na', '-', '해당없음', '해당 없음', '적합', '부적합', 'compliant', 'pass', 'fail', 'p', 'f', 'ok'}
+
+
+class ModelRouter:
+    """행 복잡도 기반 모델 선택기 (실행 단위로 생성해 분배 통계를 집계)"""
+
+    def __init__(self, fast_model="gemini-1.5-flash", heavy_model="gemini-1.5-pro", enabled=True,
+                 complexity_threshold=2.0, chars_per_point=400, requirement_min_chars=60,
+                 simple_column_count=4):
+        """
+        Args:
+            fast_model: 단순한 행에 사용할 모델
+            heavy_model: 복잡한 행(및 라우팅 비활성 시 전체)에 사용할 모델
+            enabled: False이면 모든 행을 heavy_model로 보냄
+            complexity_threshold: 이 점수 이상이면 heavy_model 사용
+            chars_per_point: 컨텍스트 길이 점수 1점당 문자 수
+            requirement_min_chars: 요구사항 본문으로 인정하는 최소 문자 수
+            simple_column_count: 이 개수를 넘는 채워진 열 1개당 0.5점
+        """
+        self.fast_model = fast_model
+        self.heavy_model = heavy_model
+        self.enabled = enabled
+        self.complexity_threshold = complexity_threshold
+        self.chars_per_point = max(1, chars_per_point)
+        self.requirement_min_chars = requirement_min_chars
+        self.simple_column_count = simple_column_count
+
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._score_total = 0.0
+
+    @classmethod
+    def from_config(cls):
+        """config["routing"] 값으로 라우터 생성"""
+        routing = config.get("routing", {})
+        return cls(
+            fast_model=routing.get("fast_model", "gemini-1.5-flash"),
+            heavy_model=routing.get("heavy_model", "gemini-1.5-pro"),
+            enabled=routing.get("enabled", True),
+            complexity_threshold=routing.get("complexity_threshold", 2.0),
+            chars_per_point=routing.get("chars_per_point", 400),
+            requirement_min_chars=routing.get("requirement_min_chars", 60),
+            simple_column_count=routing.get("simple_column_count", 4)
+        )
+
+    def score(self, row, context_text="", prompt_type="remark"):
+        """
+        행 복잡도 점수 계산
+
+        Args:
+            row: 검토 시트의 한 행 (Series 또는 dict)
+            context_text: 모델에 보낼 행 컨텍스트
+            prompt_type: 프롬프트 타입 (채팅은 항상 고성능 모델 대상)
+        """
+        if prompt_type == "chat":
+            return float("inf")
+
+        # 채워진 열만 추출 (빈 값/NaN 제외)
+        values = {}
+        for col, value in row.items():
+            if value is None or (isinstance(value, float) and pd.isna(value)):
+                continue
+            text = str(value).strip()
+            if text:
+                values[str(col)] = text
+
+        score = len(context_text) / self.chars_per_point
+        score += max(0, len(values) - self.simple_column_count) * 0.5
+
+        has_requirement = any(
+            len(value) >= self.requirement_min_chars
+            for col, value in values.items()
+            if any(keyword in col.lower() for keyword in REQUIREMENT_KEYWORDS)
+        )
+        if has_requirement:
+            score += 2.0
+
+        # 판정 값만 있는 짧은 확인 항목은 감점
+        if not has_requirement and any(value.lower() in SIMPLE_VERDICTS for value in values.values()):
+            score -= 1.0
+        return score
+
+    def route(self, row, context_text="", prompt_type="remark"):
+        """행에 사용할 모델 이름 반환 (분배 통계에 기록)"""
+        if not self.enabled:
+            model, score = self.heavy_model, 0.0
+        else:
+            score = self.score(row, context_text, prompt_type)
+            model = self.fast_model if score < self.complexity_threshold else self.heavy_model
+
+        with self._lock:
+            self._counts[model] = self._counts.get(model, 0) + 1
+            if score != float("inf"):
+                self._score_total += score
+        return model
+
+    def get_stats(self):
+        """모델별 행 수 반환"""
+        with self._lock:
+            return dict(self._counts)
+
+    def format_report(self):
+        """이번 실행의 모델 분배 요약 문자열"""
+        counts = self.get_stats()
+        total = sum(counts.values())
+        if not total:
+            return "모델 라우팅: 처리한 행 없음"
+        split = ", ".join(f"{model} {count}개 ({count * 100 // total}%)" for model, count in counts.items())
+        if not self.enabled:
+            return f"모델 라우팅: 비활성 - {split}"
+        return f"모델 라우팅: {split}, 평균 복잡도 {self._score_total / total:.2f} (기준 {self.complexity_threshold})"
@@ -0,0 +1,117 @@
+# api/prompt_compiler.py
+"""
+프롬프트 사전 컴파일 모듈
+실행(run) 단위로 변하지 않는 프롬프트 지침과 규격 정보 블록을 한 번만 조립해 두고,
+행마다 {clause}/{title} 자리만 채워 최종 프롬프트를 만듭니다.
+"""
+import hashlib
+import re
+
+from api.request_context import PromptType, current_prompt_type
+from utils.prompt_loader import load_prompts_by_type
+from utils.logger import logger
+
+# 프롬프트 템플릿에서 행마다 채우는 자리 표시자
+_SLOT_PATTERN = re.compile(r"\{(clause|title)\}")
+
+
+class CompiledPromptSet:
+    """고정 접두부(지침 + 규격 정보)와 자리 표시자 위치를 미리 계산한 프롬프트 묶음"""
+
+    def __init__(self, prompt_names, prompt_type, prefix):
+        """
+        Args:
+            prompt_names: 실제 적용된 프롬프트 이름 (우선순위 순)
+            prompt_type: 프롬프트 타입 문자열
+            prefix: 결합된 고정 접두부 (자리 표시자 포함)
+        """
+        self.prompt_names = tuple(prompt_names)
+        self.prompt_type = prompt_type
+        self.prefix = prefix
+        self.prefix_hash = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+
+        # 접두부를 [문자열, 자리 이름, 문자열, ...] 형태로 미리 분할 (홀수 위치가 자리 이름)
+        self._segments = _SLOT_PATTERN.split(prefix)
+        self.slots = frozenset(self._segments[1::2])
+
+    def render_prefix(self, slot_values=None):
+        """자리 표시자를 채운 접두부 반환 (값이 없는 자리는 원래 표시 유지)"""
+        if not self.slots or not slot_values:
+            return self.prefix
+        segments = self._segments[:]
+        for i in range(1, len(segments), 2):
+            value = slot_values.get(segments[i])
+            segments[i] = "{" + segments[i] + "}" if value is None else str(value)
+        return "".join(segments)
+
+    def render(self, user_input, slot_values=None, extra_sections=()):
+        """
+        행 단위 최종 프롬프트 조립
+
+        Args:
+            user_input: 사용자 입력 텍스트
+            slot_values: {"clause": ..., "title": ...} 자리 표시자 값
+            extra_sections: 접두부와 사용자 입력 사이에 넣을 동적 섹션 (채팅 컨텍스트 등)
+        """
+        parts = [self.render_prefix(slot_values)]
+        parts.extend(section for section in extra_sections if section)
+        parts.append(f"# 사용자 입력\n{user_input}")
+        return "\n\n".join(parts)
+
+
+def compile_prompt_set(prompt_names, standard_info=None, prompt_type=None):
+    """
+    선택된 프롬프트와 규격 정보로 CompiledPromptSet 생성 (실행당 1회 호출)
+
+    Args:
+        prompt_names: 적용할 프롬프트 이름 목록 (문자열 하나도 허용)
+        standard_info: 규격 정보 (선택적)
+        prompt_type: 프롬프트 타입 (None이면 현재 prompt_context 범위의 타입)
+
+    Returns:
+        CompiledPromptSet 또는 None (적용할 프롬프트가 없는 경우)
+    """
+    if isinstance(prompt_names, str):
+        prompt_names = [prompt_names]
+    if not prompt_names:
+        return None
+
+    prompt_type = PromptType(prompt_type if prompt_type is not None else current_prompt_type()).value
+
+    # 해당 유형의 프롬프트만 가져오기
+    try:
+        prompts_data = load_prompts_by_type(prompt_type, as_dict=True, include_metadata=True)
+    except Exception as e:
+        logger.error(f"프롬프트 로드 오류: {e}")
+        prompts_data = {}
+
+    selected_prompts = {name: data for name, data in prompts_data.items() if name in prompt_names}
+    if not selected_prompts:
+        logger.warning(f"선택된 '{prompt_type}' 유형의 프롬프트가 없습니다.")
+        return None
+
+    # 우선순위에 따라 정렬
+    sorted_prompts = sorted(selected_prompts.items(), key=lambda x: x[1].get('priority', 999))
+
+    system_instructions = []
+    for i, (name, data) in enumerate(sorted_prompts):
+        instruction = data.get('template', '')
+        if instruction:
+            # 적용 순서를 포함하여 명시적으로 표시
+            system_instructions.append(f"# {name} 지침 (우선순위: {data.get('priority', 999)}, {i+1}번째 적용)\n{instruction}")
+            logger.info(f"프롬프트 적용: {name} (우선순위: {data.get('priority', 999)}, {i+1}번째)")
+
+    # 규격 정보가 있으면 추가
+    if standard_info and isinstance(standard_info, dict) and standard_info.get('title', '') != '미확인 규격':
+        std_info_text = f"""
+# 규격 정보
+- 규격명: {standard_info.get('title', '미확인 규격')}
+- 설명: {standard_info.get('description', '')}
+- 적용 범위: {standard_info.get('scope', '')}
+- 주요 섹션: {', '.join(standard_info.get('key_sections', []))}
+
+위 규격에 맞춰서 검토 의견을 작성해주세요. 규격의 요구사항을 기반으로 의견을 작성하세요.
+"""
+        system_instructions.append(std_info_text)
+
+    return CompiledPromptSet([name for name, _ in sorted_prompts], prompt_type, "\n\n".join(system_instructions))
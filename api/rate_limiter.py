@@ -0,0 +1,319 @@
+# api/rate_limiter.py
+"""
+적응형 요청 제한 모듈
+분당 요청 수(RPM)/분당 토큰 수(TPM) 토큰 버킷과,
+429/503 응답에 반응하는 AIMD(가산 증가/승산 감소) 동시성 제어를 제공합니다.
+요청은 대화형(interactive)/일괄(batch) 우선순위 차선으로 나뉘며, 대화형 요청용 예약 동시성과
+차선별 가중치 공정 대기열로 보고서 생성 중에도 채팅 요청이 오래 기다리지 않도록 합니다.
+"""
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+
+from api.retry import message_status_codes
+from utils.logger import logger
+
+
+class TokenBucket:
+    """분당 용량 기반 토큰 버킷 (잠금은 호출자가 관리)"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def wait_time(self, amount, now):
+        """amount만큼 소비하려면 기다려야 하는 시간 (초)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, amount):
+        """실제 사용량과 추정치의 차이를 반영 (음수면 환급)"""
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+# 우선순위 차선 (api.request_context.RequestPriority 값과 동일)
+LANE_INTERACTIVE = "interactive"
+LANE_BATCH = "batch"
+LANES = (LANE_INTERACTIVE, LANE_BATCH)
+
+DEFAULT_LANE_WEIGHTS = {LANE_INTERACTIVE: 4, LANE_BATCH: 1}
+
+# 용량 초과로 보는 HTTP 상태 코드 (429 할당량 초과, 503 서비스 과부하)
+THROTTLE_STATUS_CODES = frozenset({429, 503})
+
+
+class AdaptiveRateLimiter:
+    """
+    RPM/TPM 토큰 버킷 + AIMD 동시성 제한기 (스레드/이벤트 루프 공용)
+
+    - 성공할 때마다 동시성 한도를 1/한도 만큼 늘려 한도 1회분의 성공마다 약 1씩 증가
+    - 429/503 응답이 오면 한도를 절반으로 줄임 (쿨다운 동안은 한 번만 감소)
+    - 일괄 요청은 동시성 한도에서 대화형 예약분을 뺀 만큼만 사용하고, 대화형 요청은 예약분을 항상 사용 가능
+    - 두 차선에 대기 요청이 있으면 가중치 공정 대기열(차선별 가상 시간)로 다음 차례를 결정
+    """
+
+    def __init__(self, requests_per_minute=60, tokens_per_minute=1000000, initial_concurrency=5,
+                 min_concurrency=1, max_concurrency=20, decrease_factor=0.5, decrease_cooldown=2.0,
+                 interactive_reserved=1, lane_weights=None):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.concurrency_limit = float(min(max(initial_concurrency, self.min_concurrency), self.max_concurrency))
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.interactive_reserved = max(0, int(interactive_reserved))
+        weights = dict(DEFAULT_LANE_WEIGHTS, **(lane_weights or {}))
+        self.lane_weights = {lane: max(0.01, float(weights[lane])) for lane in LANES}
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._stats = {"acquired": 0, "throttled": 0, "decreases": 0, "wait_seconds": 0.0}
+
+        # 차선별 진행 중 요청 수, 대기열(순번), 가상 시간
+        self._lane_in_flight = {lane: 0 for lane in LANES}
+        self._waiting = {lane: deque() for lane in LANES}
+        self._lane_vtime = {lane: 0.0 for lane in LANES}
+        self._virtual_time = 0.0
+        self._tickets = itertools.count()
+        self._lane_stats = {lane: {"acquired": 0, "wait_seconds": 0.0} for lane in LANES}
+
+    @staticmethod
+    def _check_lane(lane):
+        if lane not in LANES:
+            raise ValueError(f"알 수 없는 우선순위 차선: {lane} (사용 가능: {', '.join(LANES)})")
+        return LANES[LANES.index(lane)]
+
+    def _has_capacity(self, lane):
+        """차선의 동시성 여유 확인 (일괄 요청은 대화형 예약분을 남겨 둠)"""
+        limit = int(self.concurrency_limit)
+        if lane == LANE_INTERACTIVE:
+            return self._in_flight < limit or self._lane_in_flight[lane] < self.interactive_reserved
+        return self._in_flight < max(1, limit - self.interactive_reserved)
+
+    def _enqueue(self, lane):
+        """대기열에 순번 등록 (쉬던 차선은 현재 가상 시간부터 시작해 쌓인 몫을 몰아 쓰지 않게 함)"""
+        if not self._waiting[lane]:
+            self._lane_vtime[lane] = max(self._lane_vtime[lane], self._virtual_time)
+        ticket = next(self._tickets)
+        self._waiting[lane].append(ticket)
+        return ticket
+
+    def _dequeue(self, lane, ticket):
+        try:
+            self._waiting[lane].remove(ticket)
+        except ValueError:
+            pass
+        # 선두가 바뀌었으므로 다른 대기자가 차례를 다시 확인하도록 깨움
+        self._cond.notify_all()
+
+    def _is_turn(self, lane, ticket):
+        """차선의 선두이고, 지금 보낼 수 있는 차선 중 가상 시간이 가장 앞서는지 확인"""
+        if self._waiting[lane][0] != ticket:
+            return False
+        my_key = (self._lane_vtime[lane], LANES.index(lane))
+        for other in LANES:
+            if other == lane or not self._waiting[other] or not self._has_capacity(other):
+                continue
+            if (self._lane_vtime[other], LANES.index(other)) < my_key:
+                return False
+        return True
+
+    def _try_acquire(self, tokens, lane=LANE_BATCH, over_limit=False):
+        """
+        슬롯 획득 시도 (잠금 보유 상태에서 호출)
+
+        Args:
+            over_limit: True이면 동시성 한도는 무시하고 RPM/TPM만 확인
+
+        Returns:
+            float: 0이면 획득 성공, 아니면 다시 시도하기까지 기다릴 시간 (초)
+        """
+        if not over_limit and not self._has_capacity(lane):
+            # 다른 요청이 끝나면 notify로 깨어나므로 짧게 대기
+            return 0.05
+
+        now = time.monotonic()
+        wait = max(self.request_bucket.wait_time(1, now), self.token_bucket.wait_time(tokens, now))
+        if wait > 0:
+            return wait
+
+        self.request_bucket.consume(1)
+        self.token_bucket.consume(tokens)
+        self._in_flight += 1
+        self._lane_in_flight[lane] += 1
+        self._stats["acquired"] += 1
+        self._lane_stats[lane]["acquired"] += 1
+        return 0.0
+
+    def _try_acquire_in_turn(self, tokens, lane, ticket, started):
+        """차례가 된 대기자만 슬롯 획득 시도 (잠금 보유 상태에서 호출, 반환값은 _try_acquire와 같음)"""
+        if not self._is_turn(lane, ticket):
+            return 0.05
+        wait = self._try_acquire(tokens, lane)
+        if wait == 0:
+            # 가상 시간을 차선 가중치의 역수만큼 진행 (가중치가 클수록 자주 차례가 옴)
+            self._virtual_time = self._lane_vtime[lane]
+            self._lane_vtime[lane] += 1.0 / self.lane_weights[lane]
+            waited = time.monotonic() - started
+            self._stats["wait_seconds"] += waited
+            self._lane_stats[lane]["wait_seconds"] += waited
+        return wait
+
+    def try_acquire(self, tokens=0, over_limit=False, lane=LANE_BATCH):
+        """
+        기다리지 않고 슬롯 획득 시도 (헤징 요청처럼 여유가 있을 때만 보내는 요청용)
+
+        대기열 순서를 건너뛰지 않도록 같은 차선이나 앞선 차선에 대기자가 있으면 획득하지 않습니다.
+        (over_limit이면 새 슬롯을 차지하지 않으므로 앞선 차선의 대기자만 확인)
+
+        Args:
+            over_limit: True이면 동시성 한도를 넘어도 RPM/TPM 여유가 있으면 획득
+                        (느린 요청이 점유한 슬롯을 대신하는 헤징 요청용)
+            lane: 우선순위 차선
+
+        Returns:
+            bool: 획득 여부 (획득했으면 같은 차선으로 release 필요)
+        """
+        lane = self._check_lane(lane)
+        with self._cond:
+            ahead = LANES[:LANES.index(lane) + (0 if over_limit else 1)]
+            if any(self._waiting[other] for other in ahead):
+                return False
+            return self._try_acquire(tokens, lane, over_limit) == 0
+
+    def acquire(self, tokens=0, timeout=None, lane=LANE_BATCH):
+        """
+        요청 슬롯을 얻을 때까지 대기 (동기)
+
+        Args:
+            tokens: 요청의 예상 토큰 수
+            timeout: 최대 대기 시간 (초, None이면 무제한)
+            lane: 우선순위 차선 (LANE_INTERACTIVE / LANE_BATCH)
+
+        Raises:
+            TimeoutError: timeout 내에 슬롯을 얻지 못한 경우
+        """
+        lane = self._check_lane(lane)
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        with self._cond:
+            ticket = self._enqueue(lane)
+            try:
+                while True:
+                    wait = self._try_acquire_in_turn(tokens, lane, ticket, started)
+                    if wait == 0:
+                        return
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError("요청 제한기 대기 시간 초과")
+                        wait = min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._dequeue(lane, ticket)
+
+    async def acquire_async(self, tokens=0, timeout=None, lane=LANE_BATCH):
+        """acquire의 비동기 버전 (이벤트 루프를 막지 않도록 sleep으로 대기)"""
+        lane = self._check_lane(lane)
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        with self._cond:
+            ticket = self._enqueue(lane)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_acquire_in_turn(tokens, lane, ticket, started)
+                    if wait == 0:
+                        return
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("요청 제한기 대기 시간 초과")
+                    wait = min(wait, remaining)
+                await asyncio.sleep(min(wait, 0.05))
+        finally:
+            with self._cond:
+                self._dequeue(lane, ticket)
+
+    def release(self, success=True, throttled=False, actual_tokens=None, estimated_tokens=0, lane=LANE_BATCH):
+        """
+        요청 완료 보고
+
+        Args:
+            success: 요청 성공 여부
+            throttled: 429/503 등 용량 초과 응답이었는지 여부
+            actual_tokens: 실제 사용 토큰 수 (알 수 있는 경우)
+            estimated_tokens: acquire 시 사용한 예상 토큰 수
+            lane: acquire 시 사용한 우선순위 차선
+        """
+        lane = self._check_lane(lane)
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._lane_in_flight[lane] = max(0, self._lane_in_flight[lane] - 1)
+
+            if actual_tokens is not None:
+                self.token_bucket.adjust(actual_tokens - estimated_tokens)
+
+            if throttled:
+                self._stats["throttled"] += 1
+                now = time.monotonic()
+                if now - self._last_decrease >= self.decrease_cooldown:
+                    old_limit = self.concurrency_limit
+                    self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit * self.decrease_factor)
+                    self._last_decrease = now
+                    self._stats["decreases"] += 1
+                    logger.warning(
+                        f"API 용량 초과 응답 - 동시 요청 한도 {old_limit:.1f} → {self.concurrency_limit:.1f}"
+                    )
+            elif success:
+                self.concurrency_limit = min(
+                    self.max_concurrency, self.concurrency_limit + 1.0 / self.concurrency_limit
+                )
+
+            self._cond.notify_all()
+
+    def get_stats(self):
+        """현재 한도와 누적 통계 반환"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["concurrency_limit"] = round(self.concurrency_limit, 2)
+            stats["in_flight"] = self._in_flight
+            stats["lanes"] = {
+                lane: dict(self._lane_stats[lane], in_flight=self._lane_in_flight[lane],
+                           waiting=len(self._waiting[lane]))
+                for lane in LANES
+            }
+            return stats
+
+
+def is_throttle_error(error):
+    """429(할당량 초과)/503(서비스 과부하) 계열 오류인지 확인"""
+    try:
+        from google.api_core import exceptions as google_exceptions
+        if isinstance(error, (google_exceptions.ResourceExhausted,
+                              google_exceptions.TooManyRequests,
+                              google_exceptions.ServiceUnavailable)):
+            return True
+    except ImportError:
+        pass
+
+    # SDK가 감싸지 않은 오류는 재시도 분류(classify_error)와 같은 상태 코드 규칙으로 판단
+    return bool(message_status_codes(error) & THROTTLE_STATUS_CODES) or "Resource has been exhausted" in str(error)
@@ -0,0 +1,92 @@
+# api/request_context.py
+"""
+요청 컨텍스트 모듈
+호출 스택을 검사하지 않고 프롬프트 타입을 결정할 수 있도록,
+contextvars 기반의 프롬프트 타입 범위(prompt_context)와 요청 우선순위 범위(priority_context)를 제공합니다.
+"""
+import contextvars
+from contextlib import contextmanager
+from enum import Enum
+
+
+class PromptType(str, Enum):
+    """프롬프트 타입 (prompts/*.json의 type 값과 동일)"""
+    REMARK = "remark"
+    CHAT = "chat"
+
+
+class RequestPriority(str, Enum):
+    """요청 우선순위 차선 (api.rate_limiter의 LANE_* 값과 동일)"""
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
+# 범위가 선언되지 않은 호출은 기존 기본값과 같이 보고서 생성으로 처리
+_current_prompt_type = contextvars.ContextVar("prompt_type", default=PromptType.REMARK)
+
+# 명시한 우선순위 (None이면 프롬프트 타입으로 결정)
+_current_priority = contextvars.ContextVar("request_priority", default=None)
+
+
+@contextmanager
+def prompt_context(prompt_type):
+    """
+    프롬프트 타입 범위 선언 (with 문 또는 함수 데코레이터로 사용)
+
+    예:
+        with prompt_context("chat"):
+            ...
+
+        @prompt_context(PromptType.REMARK)
+        def generate_remarks(...):
+            ...
+    """
+    token = _current_prompt_type.set(PromptType(prompt_type))
+    try:
+        yield
+    finally:
+        _current_prompt_type.reset(token)
+
+
+def current_prompt_type():
+    """현재 범위의 프롬프트 타입 반환"""
+    return _current_prompt_type.get()
+
+
+@contextmanager
+def priority_context(priority):
+    """
+    요청 우선순위 범위 선언 (with 문 또는 함수 데코레이터로 사용)
+
+    채팅(PromptType.CHAT) 범위는 따로 선언하지 않아도 대화형으로 처리되므로,
+    채팅 외에 사용자가 화면에서 결과를 기다리는 단건 요청에만 필요합니다.
+
+    예:
+        with priority_context(RequestPriority.INTERACTIVE):
+            call_gemini(prompt)
+    """
+    token = _current_priority.set(RequestPriority(priority))
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority():
+    """현재 범위의 요청 우선순위 반환 (명시하지 않았으면 채팅은 대화형, 그 외는 일괄)"""
+    priority = _current_priority.get()
+    if priority is not None:
+        return priority
+    if current_prompt_type() == PromptType.CHAT:
+        return RequestPriority.INTERACTIVE
+    return RequestPriority.BATCH
+
+
+def submit_in_context(executor, func, *args, **kwargs):
+    """
+    현재 컨텍스트(프롬프트 타입 등)를 복사해 스레드 풀에 작업 제출
+
+    스레드 풀 작업자는 제출한 스레드의 contextvars를 물려받지 않으므로,
+    작업마다 컨텍스트 사본을 만들어 그 안에서 실행합니다.
+    """
+    return executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
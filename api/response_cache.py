@@ -0,0 +1,245 @@
+# api/response_cache.py
+"""
+Gemini 응답 캐시 모듈
+모델명 + 최종 프롬프트 + 생성 설정의 해시를 키로 하여 응답을 로컬 SQLite 파일에 저장합니다.
+TTL 만료와 크기 기반 LRU 제거를 지원합니다.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from utils.config import config
+from utils.logger import logger
+
+# 용량 검사 주기 (저장 횟수 기준)
+_EVICTION_CHECK_INTERVAL = 50
+
+
+class ResponseCache:
+    """SQLite 기반 영속 응답 캐시 (스레드 안전)"""
+
+    def __init__(self, path, ttl_seconds=7 * 24 * 3600, max_entries=20000, max_size_mb=200):
+        """
+        Args:
+            path: 캐시 파일 경로
+            ttl_seconds: 항목 유효 기간 (초, 0 이하이면 만료 없음)
+            max_entries: 최대 항목 수
+            max_size_mb: 최대 응답 용량 (MB)
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._writes_since_check = 0
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(model_name, prompt, generation_config=None):
+        """모델명, 프롬프트, 생성 설정으로 캐시 키(SHA-256) 생성"""
+        payload = json.dumps(
+            {"model": model_name, "prompt": prompt, "config": generation_config or {}},
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _connect(self):
+        """캐시 DB 연결 (최초 사용 시 생성)"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key):
+        """
+        캐시 조회
+
+        Returns:
+            str or None: 캐시된 응답 (없거나 만료되면 None)
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+
+                if row and self.ttl_seconds > 0 and now - row[1] > self.ttl_seconds:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    conn.commit()
+                    self._stats["evictions"] += 1
+                    row = None
+
+                if row is None:
+                    self._stats["misses"] += 1
+                    return None
+
+                conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                conn.commit()
+                self._stats["hits"] += 1
+                return row[0]
+            except Exception as e:
+                logger.warning(f"응답 캐시 조회 실패: {e}")
+                self._stats["misses"] += 1
+                return None
+
+    def set(self, key, response, model_name=None):
+        """응답 저장"""
+        if not response:
+            return
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model_name, response, size, now, now)
+                )
+                conn.commit()
+                self._stats["stores"] += 1
+
+                self._writes_since_check += 1
+                if self._writes_since_check >= _EVICTION_CHECK_INTERVAL:
+                    self._writes_since_check = 0
+                    self._evict(conn)
+            except Exception as e:
+                logger.warning(f"응답 캐시 저장 실패: {e}")
+
+    def _evict(self, conn):
+        """만료 항목 제거 후 개수/용량 한도를 넘으면 오래 사용되지 않은 항목부터 제거 (잠금 보유 상태에서 호출)"""
+        removed = 0
+        if self.ttl_seconds > 0:
+            cur = conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            removed += cur.rowcount
+
+        count, total_size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+
+        if count > self.max_entries:
+            cur = conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+            removed += cur.rowcount
+
+        if total_size > self.max_size_bytes:
+            # 가장 오래 전에 사용된 항목부터 누적 크기를 계산하여 초과분만큼 제거
+            excess = total_size - self.max_size_bytes
+            victims = []
+            for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC"):
+                victims.append((key,))
+                excess -= size
+                if excess <= 0:
+                    break
+            conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+            removed += len(victims)
+
+        conn.commit()
+        if removed:
+            self._stats["evictions"] += removed
+            logger.debug(f"응답 캐시 정리: {removed}개 항목 제거")
+
+    def evict(self):
+        """만료/초과 항목 즉시 정리"""
+        with self._lock:
+            try:
+                self._evict(self._connect())
+            except Exception as e:
+                logger.warning(f"응답 캐시 정리 실패: {e}")
+
+    def clear(self):
+        """캐시 전체 삭제"""
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute("DELETE FROM responses")
+                conn.commit()
+            except Exception as e:
+                logger.warning(f"응답 캐시 삭제 실패: {e}")
+
+    def get_stats(self):
+        """적중/미스/저장/제거 카운터 복사본 반환"""
+        with self._lock:
+            return dict(self._stats)
+
+    def close(self):
+        """DB 연결 종료"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_cache_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_response_cache():
+    """설정(config["cache"])에 따라 생성된 공용 캐시 인스턴스 반환 (비활성화 시 None)"""
+    global _cache_instance
+    cache_config = config.get("cache", {})
+    if not cache_config.get("enabled", True):
+        return None
+
+    with _instance_lock:
+        if _cache_instance is None:
+            _cache_instance = ResponseCache(
+                cache_config.get("path", os.path.join("data", "response_cache.sqlite3")),
+                ttl_seconds=cache_config.get("ttl_seconds", 7 * 24 * 3600),
+                max_entries=cache_config.get("max_entries", 20000),
+                max_size_mb=cache_config.get("max_size_mb", 200)
+            )
+        return _cache_instance
+
+
+def snapshot_cache_stats():
+    """실행 시작 시점의 캐시 카운터 스냅샷 (캐시 비활성화 시 None)"""
+    cache = get_response_cache()
+    return cache.get_stats() if cache else None
+
+
+def format_cache_report(before, use_cache=True):
+    """
+    실행 전 스냅샷과 현재 카운터를 비교한 캐시 사용 보고 문자열
+
+    Args:
+        before: 실행 시작 시점의 get_stats() 결과 (캐시 비활성화 시 None)
+        use_cache: 이번 실행에서 캐시를 사용했는지 여부
+    """
+    cache = get_response_cache()
+    if not use_cache:
+        return "응답 캐시: 사용 안 함 (이번 실행에서 우회)"
+    if cache is None or before is None:
+        return "응답 캐시: 비활성화됨"
+
+    after = cache.get_stats()
+    hits = after["hits"] - before.get("hits", 0)
+    misses = after["misses"] - before.get("misses", 0)
+    total = hits + misses
+    ratio = int(hits / total * 100) if total else 0
+    return f"응답 캐시: 적중 {hits}회, 미스 {misses}회 (적중률 {ratio}%)"
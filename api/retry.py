@@ -0,0 +1,176 @@
+# api/retry.py
+"""
+재시도 정책 모듈
+오류를 재시도 가능(시간 초과, 429, 5xx)과 치명적(인증, 잘못된 인자) 오류로 분류하고,
+상한이 있는 지수 백오프 + 전체 지터(full jitter)와 요청별 전체 마감 시간을 적용합니다.
+요청 제한기 슬롯을 기다린 시간은 마감 시간에 포함하지 않습니다(슬롯 대기는 자체 대기 시간 사용).
+"""
+import asyncio
+import random
+import re
+import threading
+import time
+
+from utils.logger import logger
+
+RETRYABLE = "retryable"
+FATAL = "fatal"
+
+# 재시도 가능한 HTTP 상태 코드
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# SDK가 감싸지 않은 오류 메시지의 HTTP 상태 코드 (메시지 맨 앞 또는 HTTP/status/code 뒤에 오는 세 자리 숫자만 인정)
+_STATUS_CODE_PATTERN = re.compile(r"(?:^\s*|\b(?:http|status|status code|code)\s*[:=]?\s*)(\d{3})\b",
+                                  re.IGNORECASE)
+
+
+def message_status_codes(error):
+    """
+    오류 메시지에 상태 코드 형태로 나온 HTTP 상태 코드 집합
+
+    행 번호, 토큰 수, ID처럼 우연히 같은 숫자를 포함한 메시지는 상태 코드로 보지 않습니다.
+    """
+    return {int(code) for code in _STATUS_CODE_PATTERN.findall(str(error))}
+
+
+def classify_error(error):
+    """
+    오류 분류
+
+    Returns:
+        str: RETRYABLE 또는 FATAL
+    """
+    try:
+        from google.api_core import exceptions as google_exceptions
+
+        if isinstance(error, (google_exceptions.Unauthenticated,
+                              google_exceptions.PermissionDenied,
+                              google_exceptions.InvalidArgument,
+                              google_exceptions.NotFound,
+                              google_exceptions.FailedPrecondition)):
+            return FATAL
+        if isinstance(error, (google_exceptions.DeadlineExceeded,
+                              google_exceptions.ResourceExhausted,
+                              google_exceptions.TooManyRequests,
+                              google_exceptions.ServiceUnavailable,
+                              google_exceptions.ServerError,
+                              google_exceptions.Aborted)):
+            return RETRYABLE
+    except ImportError:
+        pass
+
+    if isinstance(error, (TimeoutError, ConnectionError, asyncio.TimeoutError)):
+        return RETRYABLE
+
+    # SDK가 감싸지 않은 오류는 메시지의 상태 코드로만 판단 (행 번호나 "timeout" 설정 이름 등은 무시)
+    if message_status_codes(error) & RETRYABLE_STATUS_CODES:
+        return RETRYABLE
+    return FATAL
+
+
+class RetryPolicy:
+    """상한 지수 백오프 + 전체 지터 재시도 정책 (요청별 전체 마감 시간 포함)"""
+
+    def __init__(self, max_retries=3, base_delay=1.0, max_delay=20.0, deadline=30.0):
+        """
+        Args:
+            max_retries: 최초 시도 이후 최대 재시도 횟수
+            base_delay: 백오프 기본 대기 시간 (초)
+            max_delay: 백오프 대기 시간 상한 (초)
+            deadline: 재시도를 포함한 요청 전체 마감 시간 (초)
+        """
+        self.max_retries = max(0, int(max_retries))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+        self._lock = threading.Lock()
+        self._stats = {"retries": 0, "fatal": 0, "exhausted": 0}
+
+    def backoff(self, attempt):
+        """attempt번째 재시도 전 대기 시간 (0 ~ min(상한, 기본*2^attempt) 균등 분포)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    @staticmethod
+    def _acquire_slot(acquire, started):
+        """시도 전 슬롯 획득 (기다린 시간만큼 마감 시간 시작 시각을 늦춘 값 반환)"""
+        if acquire is None:
+            return started
+        waiting = time.monotonic()
+        acquire()
+        return started + (time.monotonic() - waiting)
+
+    def _next_delay(self, error, attempt, started):
+        """
+        다음 재시도까지 대기할 시간 계산
+
+        Returns:
+            float or None: 대기 시간 (재시도하지 않아야 하면 None)
+        """
+        if classify_error(error) == FATAL:
+            self._count("fatal")
+            return None
+
+        remaining = self.deadline - (time.monotonic() - started)
+        delay = self.backoff(attempt)
+        if attempt >= self.max_retries or delay >= remaining:
+            self._count("exhausted")
+            return None
+
+        self._count("retries")
+        logger.warning(f"재시도 가능한 API 오류 ({attempt + 1}/{self.max_retries}), {delay:.1f}초 후 재시도: {error}")
+        return delay
+
+    def call(self, func, acquire=None):
+        """
+        func(remaining_seconds)를 정책에 따라 실행
+
+        Args:
+            func: 남은 마감 시간(초)을 인자로 받는 호출 함수
+            acquire: 매 시도 전에 호출할 슬롯 획득 함수 (대기 시간은 마감 시간에서 제외,
+                     획득 실패 예외는 재시도하지 않고 그대로 전달)
+
+        Raises:
+            마지막 시도의 원래 예외
+        """
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            started = self._acquire_slot(acquire, started)
+            remaining = max(0.1, self.deadline - (time.monotonic() - started))
+            try:
+                return func(remaining)
+            except Exception as e:
+                delay = self._next_delay(e, attempt, started)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+
+    async def call_async(self, func, acquire=None):
+        """call의 비동기 버전 (func는 남은 시간을 받아 awaitable을 반환, acquire도 awaitable 반환)"""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            if acquire is not None:
+                waiting = time.monotonic()
+                await acquire()
+                started += time.monotonic() - waiting
+            remaining = max(0.1, self.deadline - (time.monotonic() - started))
+            try:
+                return await func(remaining)
+            except Exception as e:
+                delay = self._next_delay(e, attempt, started)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def get_stats(self):
+        """재시도/치명 오류/재시도 소진 횟수 반환"""
+        with self._lock:
+            return dict(self._stats)
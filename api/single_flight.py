@@ -0,0 +1,79 @@
+# api/single_flight.py
+"""
+중복 요청 병합(single-flight) 모듈
+같은 키의 요청이 이미 진행 중이면 새로 호출하지 않고 진행 중인 요청의 결과를 함께 받습니다.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """키별 진행 중 요청 병합기 (스레드와 이벤트 루프에서 공용)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._stats = {"leaders": 0, "coalesced": 0}
+
+    def _join(self, key):
+        """
+        진행 중 요청에 합류하거나 새 요청의 대표가 됨
+
+        Returns:
+            tuple: (Future, 대표 여부)
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            self._stats["leaders"] += 1
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, func):
+        """
+        func()를 실행하되, 같은 key의 요청이 진행 중이면 그 결과를 기다려 반환
+
+        대표 요청이 실패하면 기다리던 호출자도 같은 예외를 받습니다.
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = func()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    async def do_async(self, key, func):
+        """do의 비동기 버전 (func는 awaitable을 반환하는 함수)"""
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await func()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    def get_stats(self):
+        """대표 요청 수와 병합된 요청 수 반환"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._in_flight)
+            return stats
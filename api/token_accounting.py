@@ -0,0 +1,267 @@
+# api/token_accounting.py
+"""
+토큰 사용량 집계 모듈
+응답의 usage_metadata가 있으면 실측값을, 없으면 한글을 고려한 로컬 추정치를 사용해
+토큰 사용량을 집계하고, 실행 단위의 입력/출력 토큰 예산을 적용합니다.
+"""
+import contextvars
+import re
+import threading
+from contextlib import contextmanager
+
+from utils.config import config
+from utils.logger import logger
+
+# 문자 종류별 토큰 비율 (Gemini 토크나이저 실측 기준 근사값)
+HANGUL_TOKENS_PER_CHAR = 0.75
+CJK_TOKENS_PER_CHAR = 1.0
+LATIN_CHARS_PER_TOKEN = 4.0
+
+_HANGUL_RANGES = r"가-힣ᄀ-ᇿ㄰-㆏"  # 완성형 음절, 자모, 호환 자모
+_CJK_RANGES = r"぀-ヿ一-鿿"  # 가나, 한자
+_HANGUL = re.compile(f"[{_HANGUL_RANGES}]")
+_CJK = re.compile(f"[{_CJK_RANGES}]")
+_LATIN_WORD = re.compile(r"[A-Za-z]+")
+_DIGIT = re.compile(r"\d")
+_SYMBOL = re.compile(rf"[^\sA-Za-z\d{_HANGUL_RANGES}{_CJK_RANGES}]")
+
+# 실측 입력 토큰 / 추정 토큰 비율의 지수 이동 평균 (usage_metadata로 보정)
+_CALIBRATION_ALPHA = 0.1
+_CALIBRATION_BOUNDS = (0.5, 2.0)
+_calibration = 1.0
+_calibration_lock = threading.Lock()
+
+
+class TokenBudgetExceeded(ValueError):
+    """실행 단위 토큰 예산을 초과한 경우"""
+
+
+def _raw_estimate(text):
+    """보정 전 토큰 추정치"""
+    if not text:
+        return 0.0
+    latin_tokens = sum(max(1.0, len(word) / LATIN_CHARS_PER_TOKEN) for word in _LATIN_WORD.findall(text))
+    return (len(_HANGUL.findall(text)) * HANGUL_TOKENS_PER_CHAR
+            + len(_CJK.findall(text)) * CJK_TOKENS_PER_CHAR
+            + latin_tokens
+            + len(_DIGIT.findall(text))
+            + len(_SYMBOL.findall(text)))
+
+
+def estimate_tokens(text):
+    """
+    텍스트의 토큰 수 추정 (한글/한자/영문/숫자/기호를 구분하고 실측 비율로 보정)
+
+    Returns:
+        int: 추정 토큰 수 (빈 텍스트는 0)
+    """
+    raw = _raw_estimate(text)
+    if raw == 0:
+        return 0
+    return max(1, int(round(raw * _calibration)))
+
+
+def calibrate(text, actual_input_tokens):
+    """실측 입력 토큰 수로 추정 비율 보정"""
+    global _calibration
+    raw = _raw_estimate(text)
+    if raw < 20 or not actual_input_tokens:
+        return
+    low, high = _CALIBRATION_BOUNDS
+    ratio = min(high, max(low, actual_input_tokens / raw))
+    with _calibration_lock:
+        _calibration += _CALIBRATION_ALPHA * (ratio - _calibration)
+
+
+def usage_from_response(response):
+    """
+    응답의 usage_metadata에서 (입력, 출력) 토큰 수 추출
+
+    Returns:
+        tuple or None: (prompt_token_count, candidates_token_count), 메타데이터가 없으면 None
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return None
+    prompt_tokens = getattr(usage, "prompt_token_count", None)
+    output_tokens = getattr(usage, "candidates_token_count", None)
+    if not prompt_tokens and not output_tokens:
+        return None
+    return int(prompt_tokens or 0), int(output_tokens or 0)
+
+
+class TokenLedger:
+    """실행 단위 토큰 사용량 장부 (선택적 입력/출력 토큰 예산 포함)"""
+
+    def __init__(self, max_input_tokens=None, max_output_tokens=None):
+        """
+        Args:
+            max_input_tokens: 최대 입력 토큰 수 (None 또는 0이면 제한 없음)
+            max_output_tokens: 최대 출력 토큰 수 (None 또는 0이면 제한 없음)
+        """
+        self.max_input_tokens = max_input_tokens or None
+        self.max_output_tokens = max_output_tokens or None
+        self.calls = 0
+        self.measured_calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self._reserved = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, estimated_input):
+        """
+        요청 전 예상 입력 토큰 예약
+
+        Raises:
+            TokenBudgetExceeded: 예약하면 예산을 넘는 경우
+        """
+        with self._lock:
+            if self.max_output_tokens is not None and self.output_tokens >= self.max_output_tokens:
+                raise TokenBudgetExceeded(
+                    f"출력 토큰 예산 초과: {self.output_tokens}/{self.max_output_tokens}"
+                )
+            if (self.max_input_tokens is not None
+                    and self.input_tokens + self._reserved + estimated_input > self.max_input_tokens):
+                raise TokenBudgetExceeded(
+                    f"입력 토큰 예산 초과: 사용 {self.input_tokens} + 진행 중 {self._reserved} + "
+                    f"요청 {estimated_input} > {self.max_input_tokens}"
+                )
+            self._reserved += estimated_input
+
+    def release(self, estimated_input):
+        """실패한 요청의 예약 해제"""
+        with self._lock:
+            self._reserved = max(0, self._reserved - estimated_input)
+
+    def record(self, estimated_input, input_tokens, output_tokens, measured):
+        """완료된 요청의 사용량 기록 (예약분은 실제 값으로 대체)"""
+        with self._lock:
+            self._reserved = max(0, self._reserved - estimated_input)
+            self.calls += 1
+            self.measured_calls += int(measured)
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+
+    @property
+    def total_tokens(self):
+        return self.input_tokens + self.output_tokens
+
+    def format_report(self, skipped=0):
+        """사용량 요약 문자열 (skipped: 예산 소진으로 처리하지 못한 항목 수)"""
+        report = (
+            f"토큰 사용: {self.calls}회 호출, 입력 {self.input_tokens:,} / 출력 {self.output_tokens:,} 토큰 "
+            f"(실측 {self.measured_calls}회, 나머지 추정)"
+        )
+        limits = []
+        if self.max_input_tokens:
+            limits.append(f"입력 {self.max_input_tokens:,}")
+        if self.max_output_tokens:
+            limits.append(f"출력 {self.max_output_tokens:,}")
+        if limits:
+            report += f", 예산 {' / '.join(limits)}"
+        if skipped:
+            report += (f", 예산 소진으로 처리하지 못한 항목 {skipped}개 "
+                       f"(셀은 비워 둠, 예산을 늘려 다시 실행하면 이어서 처리)")
+        return report
+
+
+# 현재 활성화된 장부들 (중첩 범위 모두에 기록)
+_active_ledgers = contextvars.ContextVar("token_ledgers", default=())
+
+
+@contextmanager
+def token_ledger(max_input_tokens=None, max_output_tokens=None):
+    """
+    토큰 사용량 집계 범위 (예산을 주면 초과 시 이후 요청이 TokenBudgetExceeded로 실패)
+
+    스레드 풀 작업은 api.request_context.submit_in_context로 제출해야 같은 장부에 기록됩니다.
+    """
+    ledger = TokenLedger(max_input_tokens, max_output_tokens)
+    token = _active_ledgers.set(_active_ledgers.get() + (ledger,))
+    try:
+        yield ledger
+    finally:
+        _active_ledgers.reset(token)
+
+
+def reserve_tokens(estimated_input):
+    """활성 장부 모두에 예상 입력 토큰 예약 (하나라도 초과하면 이미 예약한 것을 되돌리고 예외)"""
+    reserved = []
+    try:
+        for ledger in _active_ledgers.get():
+            ledger.reserve(estimated_input)
+            reserved.append(ledger)
+    except TokenBudgetExceeded:
+        for ledger in reserved:
+            ledger.release(estimated_input)
+        raise
+
+
+def release_tokens(estimated_input):
+    """실패한 요청의 예약 해제"""
+    for ledger in _active_ledgers.get():
+        ledger.release(estimated_input)
+
+
+def record_usage(prompt, response_text, response=None, estimated_input=None):
+    """
+    요청 1회의 사용량 기록 (usage_metadata 우선, 없으면 추정)
+
+    Returns:
+        tuple: (입력 토큰, 출력 토큰)
+    """
+    if estimated_input is None:
+        estimated_input = estimate_tokens(prompt)
+
+    usage = usage_from_response(response) if response is not None else None
+    if usage is not None:
+        input_tokens, output_tokens = usage
+        calibrate(prompt, input_tokens)
+    else:
+        input_tokens, output_tokens = estimated_input, estimate_tokens(response_text or "")
+
+    for ledger in _active_ledgers.get():
+        ledger.record(estimated_input, input_tokens, output_tokens, usage is not None)
+    return input_tokens, output_tokens
+
+
+def get_run_budget(max_input_tokens=None, max_output_tokens=None):
+    """
+    실행 단위 토큰 예산 결정 (인자가 None이면 config["token_budget"] 값, 0은 제한 없음)
+
+    Returns:
+        tuple: (최대 입력 토큰, 최대 출력 토큰, 항목당 예상 출력 토큰)
+    """
+    budget = config.get("token_budget", {})
+    if max_input_tokens is None:
+        max_input_tokens = budget.get("max_input_tokens", 0)
+    if max_output_tokens is None:
+        max_output_tokens = budget.get("max_output_tokens", 0)
+    return max_input_tokens or None, max_output_tokens or None, budget.get("output_tokens_per_item", 400)
+
+
+def project_run_tokens(prompts, item_count, output_tokens_per_item, max_input_tokens=None, max_output_tokens=None):
+    """
+    실행 전 예상 토큰 총량 계산 및 예산 초과 경고
+
+    Args:
+        prompts: 실행에서 보낼 프롬프트 목록
+        item_count: 결과를 생성할 항목 수 (배치 요청은 여러 항목의 출력을 포함)
+        output_tokens_per_item: 항목당 예상 출력 토큰 수
+        max_input_tokens / max_output_tokens: 적용할 예산 (없으면 경고 생략)
+
+    Returns:
+        tuple: (예상 입력 토큰, 예상 출력 토큰)
+    """
+    projected_input = sum(estimate_tokens(prompt) for prompt in prompts)
+    projected_output = item_count * output_tokens_per_item
+    print(f"예상 토큰: 입력 약 {projected_input:,} / 출력 약 {projected_output:,} ({len(prompts)}개 요청)")
+
+    for label, projected, limit in (("입력", projected_input, max_input_tokens),
+                                    ("출력", projected_output, max_output_tokens)):
+        if limit and projected > limit:
+            message = (f"경고: 예상 {label} 토큰({projected:,})이 예산({limit:,})을 넘어 "
+                       f"일부 항목이 처리되지 않을 수 있습니다.")
+            print(message)
+            logger.warning(message)
+    return projected_input, projected_output
@@ -0,0 +1,225 @@
+# logic/batch_generator.py
+"""
+배치 검토 의견 생성 모듈
+여러 항목을 토큰 예산에 맞춰 하나의 요청으로 묶고, 항목 번호를 키로 하는 JSON 배열로
+응답을 받아 각 행에 다시 분배합니다. 모델이 누락한 항목은 개별 호출로 대체합니다.
+"""
+import json
+import re
+
+from api.gemini import call_gemini_with_prompts
+from api.cassette import CassetteMiss
+from api.circuit_breaker import CircuitOpenError
+from api.generation_profiles import PROFILE_REMARK_BATCH_JSON, get_generation_config
+from api.prompt_compiler import CompiledPromptSet
+from api.token_accounting import TokenBudgetExceeded, estimate_tokens
+
+# 배치 1개의 기본 입력 토큰 예산과 최대 항목 수
+DEFAULT_BATCH_TOKEN_BUDGET = 6000
+DEFAULT_MAX_BATCH_ITEMS = 15
+
+# 배치 요청에서 프롬프트 템플릿의 {clause}/{title} 자리에 넣을 값
+BATCH_SLOT_VALUES = {"clause": "각", "title": "각 항목 제목"}
+
+
+def make_batch_item(ref, clause, title, details, row_input, model=None):
+    """
+    배치 항목 생성
+
+    Args:
+        ref: 호출자가 결과를 되돌려 쓸 때 사용하는 참조값 (예: (소스 인덱스, 대상 인덱스))
+        clause: 항목 번호
+        title: 항목 제목
+        details: 항목 관련 정보 (build_context 결과 등)
+        row_input: 개별 호출로 대체할 때 사용할 행 단위 입력 텍스트
+        model: 이 항목에 사용할 모델 (ModelRouter 결과, None이면 기본 모델)
+    """
+    return {
+        "ref": ref,
+        "key": clause,
+        "clause": clause,
+        "title": title,
+        "details": details,
+        "row_input": row_input,
+        "model": model
+    }
+
+
+def item_slot_values(item):
+    """개별 호출 시 프롬프트 템플릿의 {clause}/{title} 자리에 채울 값"""
+    return {"clause": item["clause"], "title": item["title"]}
+
+
+def render_batch_item(item):
+    """배치 요청 텍스트에 들어가는 항목 부분"""
+    return (
+        f"## 항목 ID: {item['key']}\n"
+        f"항목: {item['clause']}, 제목: {item['title']}\n"
+        f"관련 정보:\n{item['details']}"
+    )
+
+
+def estimate_item_tokens(item):
+    """배치 내 항목이 차지하는 토큰 수 (요청 예산 확인과 같은 api.token_accounting 추정 사용)"""
+    return max(1, estimate_tokens(render_batch_item(item)))
+
+
+def pack_batches(items, token_budget=DEFAULT_BATCH_TOKEN_BUDGET, max_items=DEFAULT_MAX_BATCH_ITEMS):
+    """
+    항목들을 토큰 예산과 최대 항목 수에 맞춰 배치로 나눔
+
+    같은 배치 안에서 항목 번호가 겹치면 "(2)" 같은 접미사를 붙여 키를 구분합니다.
+    항목마다 지정된 모델이 다르면 모델별로 따로 묶습니다.
+
+    Returns:
+        list: 배치(항목 리스트)의 리스트
+    """
+    by_model = {}
+    for item in items:
+        by_model.setdefault(item.get("model"), []).append(item)
+    if len(by_model) > 1:
+        return [batch for group in by_model.values()
+                for batch in pack_batches(group, token_budget, max_items)]
+
+    batches = []
+    current = []
+    current_tokens = 0
+    used_keys = set()
+
+    for item in items:
+        tokens = estimate_item_tokens(item)
+        if current and (current_tokens + tokens > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+            used_keys = set()
+
+        key = item["clause"] or "항목"
+        suffix = 2
+        while key in used_keys:
+            key = f"{item['clause']} ({suffix})"
+            suffix += 1
+        item["key"] = key
+        used_keys.add(key)
+
+        current.append(item)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def build_batch_input(batch, standard_title):
+    """배치 요청 텍스트 구성 (JSON 배열 응답 요청)"""
+    sections = [render_batch_item(item) for item in batch]
+
+    keys = ", ".join(f'"{item["key"]}"' for item in batch)
+    return (
+        f"규격: {standard_title}\n\n"
+        f"다음 {len(batch)}개 항목 각각에 대한 검토 의견을 작성해주세요.\n\n"
+        + "\n\n".join(sections)
+        + "\n\n# 응답 형식\n"
+        "반드시 아래 형식의 JSON 배열만 반환하세요. 다른 설명은 붙이지 마세요.\n"
+        '[{"id": "항목 ID", "remark": "검토 의견"}, ...]\n'
+        f"모든 항목 ID({keys})에 대해 하나씩 작성하세요."
+    )
+
+
+def parse_batch_response(response, keys):
+    """
+    배치 응답(JSON 배열)을 항목 ID별 검토 의견으로 변환
+
+    Args:
+        response: 모델 응답 텍스트
+        keys: 배치에 포함된 항목 ID 목록
+
+    Returns:
+        dict: {항목 ID: 검토 의견} (파싱할 수 없거나 누락된 항목은 포함되지 않음)
+    """
+    if not response:
+        return {}
+
+    # 코드 블록 표시 제거 후 배열 부분만 추출
+    text = re.sub(r"```(?:json)?", "", response)
+    start = text.find('[')
+    end = text.rfind(']') + 1
+    if start < 0 or end <= start:
+        return {}
+
+    try:
+        data = json.loads(text[start:end])
+    except (ValueError, TypeError):
+        return {}
+
+    valid_keys = set(keys)
+    results = {}
+    for entry in data if isinstance(data, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        key = str(entry.get("id", "")).strip()
+        remark = entry.get("remark")
+        if key in valid_keys and isinstance(remark, str) and remark.strip():
+            results[key] = remark.strip()
+    return results
+
+
+def planned_prompts(items, compiled_prompts, standard_title, batches=None):
+    """
+    실행 전 토큰 예측용으로 이번 실행에서 보낼 프롬프트 목록 구성
+
+    Args:
+        items: 전체 항목
+        compiled_prompts: CompiledPromptSet (프롬프트 이름 목록이면 접두부 없이 계산)
+        standard_title: 규격명
+        batches: 배치 모드이면 pack_batches 결과
+    """
+    prefix = compiled_prompts.render_prefix() if isinstance(compiled_prompts, CompiledPromptSet) else ""
+    if batches is not None:
+        return [prefix + build_batch_input(batch, standard_title) for batch in batches]
+    return [prefix + item["row_input"] for item in items]
+
+
+def process_batch(batch, prompt_names, standard_info, fallback, use_cache=True):
+    """
+    배치 1개 처리 - 묶음 요청 후 누락된 항목은 개별 호출로 대체
+
+    Args:
+        batch: pack_batches가 만든 배치
+        prompt_names: 적용할 프롬프트 이름 목록 또는 CompiledPromptSet
+        standard_info: 규격 정보
+        fallback: 항목을 받아 개별 호출 결과를 반환하는 함수
+        use_cache: 응답 캐시 사용 여부
+
+    Returns:
+        list: (항목, 검토 의견 또는 None, 오류 또는 None, 개별 호출 여부) 튜플 리스트
+
+    Raises:
+        CircuitOpenError: 배치 요청이 회로 차단으로 거부된 경우
+    """
+    batch_input = build_batch_input(batch, standard_info.get('title', '미확인 규격'))
+    try:
+        response = call_gemini_with_prompts(batch_input, prompt_names, standard_info=standard_info,
+                                            use_cache=use_cache, slot_values=BATCH_SLOT_VALUES,
+                                            model_name=batch[0].get("model"), raise_errors=True,
+                                            generation_config=get_generation_config(PROFILE_REMARK_BATCH_JSON,
+                                                                                    len(batch)))
+        remarks = parse_batch_response(response, [item["key"] for item in batch])
+    except (CircuitOpenError, CassetteMiss, TokenBudgetExceeded):
+        # 회로 차단 중에는 개별 호출로 대체하지 않고 호출자가 배치를 다시 시도하도록 전달
+        # (카세트 누락은 재생 실행을 중단하도록, 예산 소진은 남은 항목을 비워 두도록 전달)
+        raise
+    except Exception as e:
+        print(f"배치 요청 오류 ({len(batch)}개 항목) - 개별 호출로 대체: {e}")
+        remarks = {}
+
+    results = []
+    for item in batch:
+        if item["key"] in remarks:
+            results.append((item, remarks[item["key"]], None, False))
+            continue
+        try:
+            results.append((item, fallback(item), None, True))
+        except Exception as e:
+            results.append((item, None, e, True))
+    return results
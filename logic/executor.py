@@ -0,0 +1,116 @@
+# logic/executor.py
+"""
+항목 병렬 실행 모듈
+보고서 생성기들이 공유하는 동시 실행 엔진입니다. 동시에 진행하는 작업 수를 작업자 수로 제한하고,
+결과는 끝나는 대로 호출 스레드에서 기록 함수에 전달하며(데이터프레임 쓰기는 한 스레드에서만,
+느린 앞 항목이 뒤 항목의 저널/중간 결과 기록을 막지 않음),
+취소되면 새 작업 제출을 멈추고 대기 중인 작업을 취소합니다.
+실제 API 동시 요청 수는 공용 요청 제한기가 조절하므로, 작업자 수는 그 상한 역할만 합니다.
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from api.gemini import get_rate_limiter
+from api.request_context import submit_in_context
+from utils.config import config
+
+
+def create_engine(task_count, cancelled=None):
+    """config["execution"] 값으로 작업 수에 맞춘 ExecutionEngine 생성"""
+    ordered = config.get("execution", {}).get("ordered_write_back", False)
+    return ExecutionEngine(get_max_workers(task_count), cancelled=cancelled, ordered=ordered)
+
+
+def get_max_workers(task_count):
+    """
+    실행할 작업자 수 (config["execution"]["max_workers"], 0이면 요청 제한기의 현재 동시 요청 한도)
+
+    한도보다 많은 작업자는 요청 제한기 대기열에서 기다리기만 하므로, 기본값은 실행 시작 시점의
+    한도(이전 실행에서 늘거나 줄어든 값 포함)를 따릅니다.
+
+    Args:
+        task_count: 작업 수 (작업자 수는 작업 수를 넘지 않음)
+    """
+    workers = config.get("execution", {}).get("max_workers", 0)
+    if not workers:
+        workers = get_rate_limiter().get_stats()["concurrency_limit"]
+    return max(1, min(int(workers), task_count))
+
+
+class ExecutionEngine:
+    """작업자 수 제한 + 순서 보장 기록 + 취소를 지원하는 스레드 풀 실행기"""
+
+    def __init__(self, max_workers, cancelled=None, ordered=False, poll_interval=0.5):
+        """
+        Args:
+            max_workers: 동시에 실행하는 작업 수
+            cancelled: 취소 여부를 반환하는 함수 (None이면 취소 없음)
+            ordered: True이면 입력 순서대로 결과 전달 (앞 작업이 끝날 때까지 뒤 결과를 보류),
+                     False이면 끝나는 대로 전달
+            poll_interval: 취소 여부를 다시 확인하는 간격 (초)
+        """
+        self.max_workers = max(1, max_workers)
+        self.cancelled = cancelled or (lambda: False)
+        self.ordered = ordered
+        self.poll_interval = poll_interval
+
+    def run(self, tasks, func, on_result):
+        """
+        모든 작업을 func로 실행하고 결과를 on_result(작업, 결과, 오류)로 전달
+
+        제출한 작업의 컨텍스트(프롬프트 타입, 토큰 장부 등)는 작업자 스레드에 그대로 전달됩니다.
+        on_result는 항상 이 메서드를 호출한 스레드에서 실행됩니다.
+
+        Returns:
+            dict: {"completed": 결과를 전달한 작업 수, "cancelled": 취소로 실행하지 않은 작업 수}
+        """
+        tasks = list(tasks)
+        pending = {}  # future -> 작업 번호
+        finished = {}  # 작업 번호 -> (결과, 오류), 순서 보장 시 앞 작업을 기다리는 결과
+        next_submit = 0
+        next_deliver = 0
+        completed = 0
+        cancelled = False
+
+        def deliver(index, outcome):
+            nonlocal completed
+            on_result(tasks[index], *outcome)
+            completed += 1
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="remark") as executor:
+            while next_submit < len(tasks) or pending:
+                if not cancelled and self.cancelled():
+                    cancelled = True
+                    for future in pending:
+                        future.cancel()
+
+                # 작업자 수만큼만 제출 (취소되면 새로 제출하지 않음)
+                while not cancelled and next_submit < len(tasks) and len(pending) < self.max_workers:
+                    future = submit_in_context(executor, func, tasks[next_submit])
+                    pending[future] = next_submit
+                    next_submit += 1
+                if cancelled:
+                    pending = {future: index for future, index in pending.items() if not future.cancelled()}
+                    if not pending:
+                        break
+
+                done, _ = wait(pending, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        outcome = (future.result(), None)
+                    except Exception as e:
+                        outcome = (None, e)
+                    if self.ordered:
+                        finished[index] = outcome
+                    else:
+                        deliver(index, outcome)
+
+                # 앞 작업이 모두 끝난 결과부터 순서대로 전달
+                while next_deliver in finished:
+                    deliver(next_deliver, finished.pop(next_deliver))
+                    next_deliver += 1
+
+        # 취소로 중간이 빈 경우에도 끝난 작업의 결과는 버리지 않음
+        for index in sorted(finished):
+            deliver(index, finished[index])
+        return {"completed": completed, "cancelled": len(tasks) - completed}
@@ -1,15 +1,34 @@
 import os
+import asyncio
 import pandas as pd
 from datetime import datetime
 from parsers import get_parser_for_file
 from matcher import create_matcher
-from api.gemini import call_gemini_with_prompts
+from api.gemini import (call_gemini_with_prompts, call_gemini_with_prompts_async, format_api_report,
+                        snapshot_api_stats)
+from api.request_context import PromptType, prompt_context
+from api.prompt_compiler import compile_prompt_set
+from api.model_router import ModelRouter
+from api.health import check_run_health
+from api.cassette import CassetteMiss
+from api.circuit_breaker import CircuitOpenError, CircuitPause
+from api.token_accounting import TokenBudgetExceeded, token_ledger, get_run_budget, project_run_tokens
+from api.response_cache import snapshot_cache_stats, format_cache_report
+from logic.batch_generator import (make_batch_item, item_slot_values, pack_batches, process_batch, planned_prompts,
+                                   DEFAULT_BATCH_TOKEN_BUDGET)
+from logic.executor import create_engine
+from logic.run_journal import RunJournal, GENERATOR_DOCUMENTS, prompt_set_key
+from logic.run_manifest import RunManifest, manifest_key
+from logic.result_writer import ResultWriter
 from utils.prompt_loader import load_prompts_by_type
 from utils.standard_detector import detect_standard_from_file, get_standard_info
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
+@prompt_context(PromptType.REMARK)
 def generate_from_documents(source_path, target_path, source_config, target_config, prompt_names,
-                          matching_mode="basic", standard_id=None, cancel_var=None, chat_history=None):
+                          matching_mode="basic", standard_id=None, cancel_var=None, chat_history=None,
+                          use_cache=True, use_async=False, batch_mode=False,
+                          batch_token_budget=DEFAULT_BATCH_TOKEN_BUDGET, max_input_tokens=None,
+                          max_output_tokens=None, run_id=None, incremental=False):
     """
     다양한 형식의 문서를 처리하여 확장 보고서 생성
     
@@ -23,6 +42,16 @@ def generate_from_documents(source_path, target_path, source_config, target_conf
         standard_id: 규격 ID (None이면 자동 감지)
         cancel_var: 취소 상태를 추적하는 딕셔너리 {'cancelled': bool}
         chat_history: AI 채팅 히스토리
+        use_cache: 응답 캐시 사용 여부 (False이면 이번 실행은 캐시를 우회)
+        use_async: True이면 스레드 풀 대신 asyncio 이벤트 루프로 처리
+                   (동시 요청 수는 config["api"]["async_concurrency"]로 제한)
+        batch_mode: True이면 여러 항목을 JSON 배열 응답 요청 하나로 묶어 처리 (use_async보다 우선)
+        batch_token_budget: 배치 1개에 담을 항목 정보의 토큰 예산
+        max_input_tokens: 이번 실행의 최대 입력 토큰 (None이면 config["token_budget"], 0은 제한 없음)
+        max_output_tokens: 이번 실행의 최대 출력 토큰 (None이면 config["token_budget"], 0은 제한 없음)
+        run_id: 이어서 처리할 실행 ID (None이면 새 실행, 보통 resume_run에서 지정)
+        incremental: True이면 같은 문서/설정으로 마지막에 생성한 결과와 입력이 같은 항목은 이전 검토 의견을 쓰고
+                     바뀌었거나 새로 생긴 항목만 생성
     
     Returns:
         결과 파일 경로
@@ -140,100 +169,215 @@ def generate_from_documents(source_path, target_path, source_config, target_conf
     if not selected_prompts:
         raise ValueError("선택한 프롬프트가 없거나 모두 유효하지 않습니다")
     
-    # 매핑된 항목 처리
+    # 실행 중 변하지 않는 프롬프트 지침과 규격 정보는 한 번만 조립
+    compiled_prompts = compile_prompt_set(selected_prompts, standard_info, PromptType.REMARK) or selected_prompts
+    
+    # 매핑된 항목 처리 (행 복잡도에 따라 모델 선택)
+    router = ModelRouter.from_config()
+    cache_before = snapshot_cache_stats()
+    api_before = snapshot_api_stats()
     processed = 0
     successful = 0
-    api_calls = 0
-    estimated_tokens = 0
     
-    def process_item(source_idx, target_idx, confidence, df_source, df_target, source_clause_col, source_title_col, target_output_col, standard_id, selected_prompts, chat_context):
-        """개별 항목 처리 함수"""
-        nonlocal api_calls, estimated_tokens
-        
+    # API 장애로 회로가 열리면 남은 대기열을 멈췄다가 회복 후 이어서 처리 (취소 시 중단)
+    def is_cancelled():
+        return bool(cancel_var and cancel_var.get('cancelled', False))
+    
+    pause = CircuitPause.from_config(cancelled=is_cancelled)
+    skipped = 0
+    budget_skipped = 0
+    
+    def build_item(source_idx, target_idx):
+        """개별 항목의 배치 항목 구성 (개별 호출용 요청 텍스트 포함)"""
         clause = str(df_source.loc[source_idx, source_clause_col]).strip()
         title = str(df_source.loc[source_idx, source_title_col]).strip()
         
         # 항목 관련 컨텍스트 구성
-        item_context = build_context(df_source.loc[source_idx], df_source.columns, standard_id)
-        
-        input_text = (
-            f"항목: {clause}, 제목: {title}\n\n"
-            f"규격: {standard_info['title']}\n\n"
-            f"관련 정보:\n{item_context}\n\n"
-        )
+        details = build_context(df_source.loc[source_idx], df_source.columns, standard_id)
         
         # 채팅 내용 컨텍스트 추가
         if chat_context:
             # 항목 번호와 관련된 대화만 필터링
             relevant_chat = find_relevant_chat(chat_context, clause, title)
             if relevant_chat:
-                input_text += f"\n\n채팅 내용에서 참조할 정보:\n{relevant_chat}\n\n"
+                details += f"\n\n채팅 내용에서 참조할 정보:\n{relevant_chat}"
         
-        input_text += "위 항목에 대한 검토 의견을 작성해주세요."
-        
-        # Gemini 호출
-        reply = call_gemini_with_prompts(input_text, selected_prompts, standard_info=standard_info)
-        
-        # API 호출 카운팅
-        api_calls += 1
-        estimated_tokens += len(input_text.split()) + len(reply.split()) * 1.5
+        input_text = (
+            f"항목: {clause}, 제목: {title}\n\n"
+            f"규격: {standard_info['title']}\n\n"
+            f"관련 정보:\n{details}\n\n"
+            "위 항목에 대한 검토 의견을 작성해주세요."
+        )
+        model = router.route(df_source.loc[source_idx], details, PromptType.REMARK)
+        return make_batch_item((source_idx, target_idx), clause, title, details, input_text, model)
+    
+    def process_item(item):
+        """개별 항목 Gemini 호출 (사용량은 토큰 장부에 기록됨, 회로 차단 중이면 재개될 때까지 대기)"""
+        return pause.call(lambda: call_gemini_with_prompts(
+            item["row_input"], compiled_prompts, standard_info=standard_info, use_cache=use_cache,
+            slot_values=item_slot_values(item), model_name=item["model"], raise_errors=True
+        ))
+    
+    def process_batch_items(batch):
+        """배치 1개 처리 (누락 항목은 개별 호출)"""
+        try:
+            return pause.call(lambda: process_batch(batch, compiled_prompts, standard_info, process_item,
+                                                    use_cache=use_cache))
+        except CircuitOpenError as e:
+            return [(item, None, e, False) for item in batch]
+    
+    def write_result(source_idx, target_idx, result=None, error=None, reused=False):
+        """완료된 항목 결과를 대상 데이터프레임에 기록하고 진행 상황 출력 (회로 차단/예산 소진으로 처리하지 못한 항목은 비워 둠)"""
+        nonlocal processed, successful, skipped, budget_skipped
+        if isinstance(error, CassetteMiss):
+            # 카세트 재생은 기록된 실행을 그대로 재현해야 하므로 결과로 남기지 않고 중단
+            raise error
+        if isinstance(error, CircuitOpenError):
+            skipped += 1
+            return
+        if isinstance(error, TokenBudgetExceeded):
+            # 예산 소진은 의도한 중단이므로 오류로 기록하지 않음 (예산을 늘려 다시 실행하면 이어서 처리)
+            budget_skipped += 1
+            return
+        if error is None:
+            writer.write(target_idx, result)
+            successful += 1
+            if journal and not reused:
+                journal.record((source_idx, target_idx), result)
+            if manifest:
+                manifest.add((source_idx, target_idx), result)
+        else:
+            clause_val = df_source.loc[source_idx, source_clause_col]
+            print(f"항목 {clause_val} 처리 중 오류: {str(error)}")
+            writer.write(target_idx, f"[오류] {str(error)}")
+            
+        processed += 1
+        if processed % 5 == 0 or processed == len(mappings):
+            percent_done = int(processed/len(mappings)*100)
+            print(f"처리 중: {processed}/{len(mappings)} ({percent_done}%)")
+    
+    async def process_all_async(items):
+        """이벤트 루프에서 모든 항목을 처리 (동시 요청 수는 API 계층의 세마포어가 제한)"""
+        async def run_item(item):
+            try:
+                reply = await pause.call_async(lambda: call_gemini_with_prompts_async(
+                    item["row_input"], compiled_prompts, standard_info=standard_info, use_cache=use_cache,
+                    slot_values=item_slot_values(item), model_name=item["model"], raise_errors=True
+                ))
+                return (*item["ref"], reply, None)
+            except Exception as e:
+                return (*item["ref"], None, e)
         
-        return reply
-    
-    # 병렬 처리 설정
-    max_workers = min(10, len(mappings))  # 최대 10개 항목을 동시에 처리
-    if max_workers == 0:
+        tasks = [asyncio.ensure_future(run_item(item)) for item in items]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                if cancel_var and cancel_var.get('cancelled', False):
+                    print("사용자에 의해 작업 취소됨 - 남은 작업 건너뜀")
+                    break
+                write_result(*(await next_done))
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    if not mappings:
         return save_result_file(df_target, target_path)  # 매칭 결과가 없으면 바로 저장
     
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {}
-        submitted_count = 0
-        
-        # 작업 제출
-        for source_idx, target_idx, confidence in mappings:
-            # 취소 확인
-            if cancel_var and cancel_var.get('cancelled', False):
-                print("사용자에 의해 작업 취소됨")
-                break
-                
-            # 각 항목을 병렬로 처리
-            future = executor.submit(
-                process_item, 
-                source_idx, target_idx, confidence, 
-                df_source, df_target, source_clause_col, source_title_col, target_output_col,
-                standard_id, selected_prompts, chat_context
+    items = [build_item(source_idx, target_idx) for source_idx, target_idx, _ in mappings]
+    
+    # 결과는 완료되는 대로 중간 결과 파일에 주기적으로 기록하고, 마지막에 결과 파일로 통합
+    writer = ResultWriter(df_target, target_output_col, target_path, template_path=target_path,
+                          sheet_name=target_sheet)
+    
+    # 프롬프트 해시 키: 프롬프트 파일 내용이 바뀌면 저널/매니페스트의 이전 결과를 재사용하지 않음
+    prompt_key = prompt_set_key(compiled_prompts)
+
+    # 실행 저널: 완료 항목을 바로 기록하고, 재개한 실행이면 이미 완료된 항목은 저널의 결과 사용
+    journal = RunJournal.start(run_id, GENERATOR_DOCUMENTS, {
+        "source_path": source_path, "target_path": target_path, "source_config": source_config,
+        "target_config": target_config, "prompt_names": list(prompt_names), "matching_mode": matching_mode,
+        "standard_id": standard_id, "chat_history": chat_history, "use_cache": use_cache, "use_async": use_async,
+        "batch_mode": batch_mode, "batch_token_budget": batch_token_budget,
+        "max_input_tokens": max_input_tokens, "max_output_tokens": max_output_tokens, "incremental": incremental
+    }, prompt_key, standard_id)
+    
+    # 실행 매니페스트: 증분 모드면 마지막 실행과 입력이 같은 항목은 이전 검토 의견 사용
+    manifest = RunManifest.load(manifest_key(GENERATOR_DOCUMENTS, source_path, target_path, source_config,
+                                             target_config), prompt_key, standard_id)
+    if manifest:
+        manifest.track(items)
+        if incremental:
+            items, carried = manifest.split(items)
+            for item, reply in carried:
+                write_result(*item["ref"], result=reply, reused=True)
+            print(f"증분 생성: {len(carried)}개 항목은 이전 결과 사용, 변경/신규 {len(items)}개 항목 생성")
+    elif incremental:
+        print("경고: 실행 매니페스트가 비활성화되어 있어 모든 항목을 생성합니다")
+    
+    replayed = []
+    if journal:
+        items, replayed = journal.split(items)
+        for item, reply in replayed:
+            write_result(*item["ref"], result=reply, reused=True)
+        if replayed:
+            print(f"실행 {journal.run_id} 재개: {len(replayed)}개 항목은 저널의 결과 사용, {len(items)}개 항목 처리")
+    batches = pack_batches(items, token_budget=batch_token_budget) if batch_mode else None
+    
+    # 캐시된 API 상태 확인 (연결 오류/지연 상태면 경고)
+    check_run_health()
+
+    # 실행 전 예상 토큰 총량 보고 (예산을 넘으면 경고)
+    max_input_tokens, max_output_tokens, output_per_item = get_run_budget(max_input_tokens, max_output_tokens)
+    project_run_tokens(planned_prompts(items, compiled_prompts, standard_info['title'], batches), len(items),
+                       output_per_item, max_input_tokens, max_output_tokens)
+    
+    with token_ledger(max_input_tokens, max_output_tokens) as ledger:
+        # 스레드 처리는 공용 실행 엔진 사용 (실제 동시 요청 수는 공용 요청 제한기가 조절)
+        if batch_mode:
+            # 여러 항목을 JSON 배열 응답 요청 하나로 묶어 처리
+            print(f"배치 생성 모드: {len(items)}개 항목 → {len(batches)}개 요청")
+            fallback_count = 0
+            
+            def write_batch(batch, results, error):
+                nonlocal fallback_count
+                if error is not None:
+                    results = [(item, None, error, False) for item in batch]
+                for item, reply, item_error, fallback in results:
+                    fallback_count += int(fallback)
+                    write_result(*item["ref"], result=reply, error=item_error)
+            
+            summary = create_engine(len(batches), cancelled=is_cancelled).run(
+                batches, process_batch_items, write_batch
             )
-            futures[future] = (source_idx, target_idx)
-            submitted_count += 1
-        
-        # 완료된 작업 결과 처리
-        for i, future in enumerate(as_completed(futures)):
-            # 주기적으로 취소 여부 확인
-            if cancel_var and cancel_var.get('cancelled', False) and i % 5 == 0:
-                print("사용자에 의해 작업 취소됨 - 남은 작업 건너뜀")
-                break
-                
-            source_idx, target_idx = futures[future]
-            try:
-                result = future.result()
-                df_target.loc[target_idx, target_output_col] = result
-                successful += 1
-            except Exception as e:
-                clause_val = df_source.loc[source_idx, source_clause_col]
-                print(f"항목 {clause_val} 처리 중 오류: {str(e)}")
-                df_target.loc[target_idx, target_output_col] = f"[오류] {str(e)}"
-                
-            processed += 1
-            if processed % 5 == 0 or processed == len(mappings):
-                percent_done = int(processed/len(mappings)*100)
-                print(f"처리 중: {processed}/{len(mappings)} ({percent_done}%)")
+            print(f"배치 응답에서 누락되어 개별 호출한 항목: {fallback_count}개")
+        elif use_async:
+            asyncio.run(process_all_async(items))
+            summary = None
+        else:
+            summary = create_engine(len(items), cancelled=is_cancelled).run(
+                items, process_item, lambda item, reply, error: write_result(*item["ref"], result=reply, error=error)
+            )
+        if summary and summary["cancelled"]:
+            print(f"사용자에 의해 작업 취소됨 - 처리하지 않은 {'배치' if batch_mode else '항목'} "
+                  f"{summary['cancelled']}개 건너뜀")
     
     # 결과 저장 및 경로 반환
-    result_path = save_result_file(df_target, target_path)
+    result_path = writer.finalize()
+    if manifest:
+        manifest.save()
+    if journal:
+        journal.finish(result_path)
+        journal.close()
     
     # 사용량 보고
-    print(f"API 사용: {api_calls}번 호출, 약 {estimated_tokens}개 토큰")
+    print(ledger.format_report(budget_skipped))
+    print(router.format_report())
     print(f"처리 완료: {successful}/{processed} 항목 성공")
+    print(pause.format_report(skipped))
+    print(format_cache_report(cache_before, use_cache))
+    print(format_api_report(api_before))
+    if journal:
+        print(journal.format_report(len(replayed)))
     
     return result_path
 
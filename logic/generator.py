@@ -2,13 +2,29 @@ import os
 import pandas as pd
 import re
 from datetime import datetime
-from api.gemini import call_gemini_with_prompts
+from api.gemini import call_gemini_with_prompts, format_api_report, snapshot_api_stats
+from api.request_context import PromptType, prompt_context
+from api.prompt_compiler import compile_prompt_set
+from api.model_router import ModelRouter
+from api.health import check_run_health
+from api.cassette import CassetteMiss
+from api.circuit_breaker import CircuitOpenError, CircuitPause
+from api.token_accounting import TokenBudgetExceeded, token_ledger, get_run_budget, project_run_tokens
+from api.response_cache import snapshot_cache_stats, format_cache_report
 from utils.prompt_loader import load_prompts_by_type
 from utils.standard_detector import detect_standard_from_file, get_standard_info
-from utils.common_utils import save_result_file
+from logic.batch_generator import (make_batch_item, item_slot_values, pack_batches, process_batch, planned_prompts,
+                                   DEFAULT_BATCH_TOKEN_BUDGET)
+from logic.executor import create_engine
+from logic.run_journal import RunJournal, GENERATOR_REMARKS, prompt_set_key
+from logic.run_manifest import RunManifest, manifest_key
+from logic.result_writer import ResultWriter
 
+@prompt_context(PromptType.REMARK)
 def generate_remarks(base_path, review_path, sheet_name, clause_col, title_col, remark_col, prompt_names,
-                   matching_mode="ai", standard_id=None):  # standard_id 매개변수 추가
+                   matching_mode="ai", standard_id=None, use_cache=True, batch_mode=False,
+                   batch_token_budget=DEFAULT_BATCH_TOKEN_BUDGET, max_input_tokens=None,
+                   max_output_tokens=None, cancel_var=None, run_id=None, incremental=False):  # standard_id 매개변수 추가
     """
     두 엑셀 파일을 비교하여 선택된 프롬프트로 의견을 생성
     
@@ -22,6 +38,15 @@ def generate_remarks(base_path, review_path, sheet_name, clause_col, title_col,
         prompt_names: 사용할 프롬프트 이름 목록
         matching_mode: 항목 매칭 모드 ("ai" 또는 "basic")
         standard_id: 규격 ID (None이면 자동 감지)
+        use_cache: 응답 캐시 사용 여부 (False이면 이번 실행은 캐시를 우회)
+        batch_mode: True이면 여러 항목을 JSON 배열 응답 요청 하나로 묶어 처리
+        batch_token_budget: 배치 1개에 담을 항목 정보의 토큰 예산
+        max_input_tokens: 이번 실행의 최대 입력 토큰 (None이면 config["token_budget"], 0은 제한 없음)
+        max_output_tokens: 이번 실행의 최대 출력 토큰 (None이면 config["token_budget"], 0은 제한 없음)
+        cancel_var: 취소 상태를 추적하는 딕셔너리 {'cancelled': bool} (취소되면 남은 항목은 비워 둔 채 저장)
+        run_id: 이어서 처리할 실행 ID (None이면 새 실행, 보통 resume_run에서 지정)
+        incremental: True이면 같은 파일/열로 마지막에 생성한 결과와 입력이 같은 항목은 이전 검토 의견을 쓰고
+                     바뀌었거나 새로 생긴 항목만 생성
     
     Returns:
         결과 파일 경로
@@ -61,6 +86,9 @@ def generate_remarks(base_path, review_path, sheet_name, clause_col, title_col,
     # 프롬프트 검증 및 필터링
     selected_prompts = validate_and_filter_prompts(prompt_names)
     
+    # 실행 중 변하지 않는 프롬프트 지침과 규격 정보는 한 번만 조립
+    compiled_prompts = compile_prompt_set(prompt_names, standard_info, PromptType.REMARK) or prompt_names
+    
     # 매처 생성 (AI 또는 기본)
     from matcher import create_matcher
     matcher = create_matcher(matching_mode)
@@ -82,11 +110,15 @@ def generate_remarks(base_path, review_path, sheet_name, clause_col, title_col,
         print(f"매칭 API 사용: {usage['calls']}번 호출, 약 {usage['tokens']}개 토큰")
     
     # 각 행 처리
+    cache_before = snapshot_cache_stats()
+    api_before = snapshot_api_stats()
     processed = 0
     matched = 0
     total_rows = len(df_review)
     
-    # 매핑된 항목들을 기반으로 처리
+    # 매핑된 항목들을 요청 항목으로 변환 (행 복잡도에 따라 모델 선택)
+    router = ModelRouter.from_config()
+    items = []
     for review_idx, base_idx, confidence in mappings:
         clause = str(df_review.loc[review_idx, clause_col]).strip()
         title = str(df_review.loc[review_idx, title_col]).strip()
@@ -106,23 +138,145 @@ def generate_remarks(base_path, review_path, sheet_name, clause_col, title_col,
             f"관련 정보:\n{context}\n\n"
             f"위 항목에 대한 검토 의견을 작성해주세요."
         )
+        model = router.route(df_review.loc[review_idx], context, PromptType.REMARK)
+        items.append(make_batch_item(base_idx, clause, title, context, input_text, model))
+    
+    # API 장애로 회로가 열리면 남은 항목은 멈췄다가 회복 후 이어서 처리 (취소 시 중단)
+    def is_cancelled():
+        return bool(cancel_var and cancel_var.get('cancelled', False))
+    
+    pause = CircuitPause.from_config(cancelled=is_cancelled)
+    skipped = 0
+    budget_skipped = 0
+    
+    def write_result(item, reply=None, error=None, reused=False):
+        """결과를 템플릿 파일에 저장하고 진행 상황 출력 (회로 차단/예산 소진으로 처리하지 못한 항목은 셀을 비워 둠)"""
+        nonlocal processed, skipped, budget_skipped
+        if isinstance(error, CassetteMiss):
+            # 카세트 재생은 기록된 실행을 그대로 재현해야 하므로 검토 의견으로 남기지 않고 중단
+            raise error
+        if isinstance(error, CircuitOpenError):
+            skipped += 1
+            return
+        if isinstance(error, TokenBudgetExceeded):
+            # 예산 소진은 의도한 중단이므로 오류로 기록하지 않음 (예산을 늘려 다시 실행하면 이어서 처리)
+            budget_skipped += 1
+            return
+        if error is None:
+            writer.write(item["ref"], reply)
+            if journal and not reused:
+                journal.record(item["ref"], reply)
+            if manifest:
+                manifest.add(item["ref"], reply)
+        else:
+            print(f"항목 {item['clause']} 처리 중 오류: {error}")
+            writer.write(item["ref"], f"[오류] {str(error)}")
         
+        processed += 1
+        if processed % 5 == 0 or processed == total_items:
+            print(f"처리 중: {processed}/{total_items} ({int(processed/total_items*100)}%)")
+    
+    def call_single(item):
+        """Gemini API 개별 호출 (규격 정보 포함, 회로 차단 중이면 재개될 때까지 대기)"""
+        return pause.call(lambda: call_gemini_with_prompts(
+            item["row_input"], compiled_prompts, standard_info=standard_info, use_cache=use_cache,
+            slot_values=item_slot_values(item), model_name=item["model"], raise_errors=True
+        ))
+    
+    # 결과는 완료되는 대로 중간 결과 파일에 주기적으로 기록하고, 마지막에 결과 파일로 통합
+    writer = ResultWriter(df_base, remark_col, template_path=base_path)
+    
+    # 프롬프트 해시 키: 프롬프트 파일 내용이 바뀌면 저널/매니페스트의 이전 결과를 재사용하지 않음
+    prompt_key = prompt_set_key(compiled_prompts)
+
+    # 실행 저널: 완료 항목을 바로 기록하고, 재개한 실행이면 이미 완료된 항목은 저널의 결과 사용
+    total_items = len(items)
+    journal = RunJournal.start(run_id, GENERATOR_REMARKS, {
+        "base_path": base_path, "review_path": review_path, "sheet_name": sheet_name, "clause_col": clause_col,
+        "title_col": title_col, "remark_col": remark_col, "prompt_names": list(prompt_names),
+        "matching_mode": matching_mode, "standard_id": standard_id, "use_cache": use_cache,
+        "batch_mode": batch_mode, "batch_token_budget": batch_token_budget,
+        "max_input_tokens": max_input_tokens, "max_output_tokens": max_output_tokens, "incremental": incremental
+    }, prompt_key, standard_id)
+    
+    # 실행 매니페스트: 증분 모드면 마지막 실행과 입력이 같은 항목은 이전 검토 의견 사용
+    manifest = RunManifest.load(manifest_key(GENERATOR_REMARKS, base_path, review_path, sheet_name, clause_col,
+                                             title_col, remark_col), prompt_key, standard_id)
+    if manifest:
+        manifest.track(items)
+        if incremental:
+            items, carried = manifest.split(items)
+            for item, reply in carried:
+                write_result(item, reply, reused=True)
+            print(f"증분 생성: {len(carried)}개 항목은 이전 결과 사용, 변경/신규 {len(items)}개 항목 생성")
+    elif incremental:
+        print("경고: 실행 매니페스트가 비활성화되어 있어 모든 항목을 생성합니다")
+    
+    replayed = []
+    if journal:
+        items, replayed = journal.split(items)
+        for item, reply in replayed:
+            write_result(item, reply, reused=True)
+        if replayed:
+            print(f"실행 {journal.run_id} 재개: {len(replayed)}개 항목은 저널의 결과 사용, {len(items)}개 항목 처리")
+    batches = pack_batches(items, token_budget=batch_token_budget) if batch_mode else None
+    
+    # 캐시된 API 상태 확인 (연결 오류/지연 상태면 경고)
+    check_run_health()
+
+    # 실행 전 예상 토큰 총량 보고 (예산을 넘으면 경고)
+    max_input_tokens, max_output_tokens, output_per_item = get_run_budget(max_input_tokens, max_output_tokens)
+    project_run_tokens(planned_prompts(items, compiled_prompts, standard_info['title'], batches), len(items),
+                       output_per_item, max_input_tokens, max_output_tokens)
+    
+    def call_batch(batch):
+        """배치 1개 처리 (누락 항목은 개별 호출)"""
         try:
-            # Gemini API 호출 (규격 정보 포함)
-            reply = call_gemini_with_prompts(input_text, prompt_names, standard_info=standard_info)
+            return pause.call(lambda: process_batch(batch, compiled_prompts, standard_info, call_single,
+                                                    use_cache=use_cache))
+        except CircuitOpenError as e:
+            return [(item, None, e, False) for item in batch]
+    
+    with token_ledger(max_input_tokens, max_output_tokens) as ledger:
+        # 공용 실행 엔진으로 병렬 처리 (결과는 끝나는 대로 이 스레드에서 기록)
+        if batch_mode:
+            # 여러 항목을 하나의 요청으로 묶어 처리 (누락 항목은 개별 호출)
+            print(f"배치 생성 모드: {len(items)}개 항목 → {len(batches)}개 요청")
+            fallback_count = 0
             
-            # 결과를 템플릿 파일에 저장
-            df_base.loc[base_idx, remark_col] = reply
-        except Exception as e:
-            print(f"항목 {clause} 처리 중 오류: {e}")
-            df_base.loc[base_idx, remark_col] = f"[오류] {str(e)}"
-        
-        processed += 1
-        if processed % 5 == 0 or processed == len(mappings):
-            print(f"처리 중: {processed}/{len(mappings)} ({int(processed/len(mappings)*100)}%)")
+            def write_batch(batch, results, error):
+                nonlocal fallback_count
+                if error is not None:
+                    results = [(item, None, error, False) for item in batch]
+                for item, reply, item_error, fallback in results:
+                    fallback_count += int(fallback)
+                    write_result(item, reply, item_error)
+            
+            summary = create_engine(len(batches), cancelled=is_cancelled).run(batches, call_batch, write_batch)
+            print(f"배치 응답에서 누락되어 개별 호출한 항목: {fallback_count}개")
+        else:
+            summary = create_engine(len(items), cancelled=is_cancelled).run(
+                items, call_single, lambda item, reply, error: write_result(item, reply, error)
+            )
+        if summary["cancelled"]:
+            print(f"사용자에 의해 작업 취소됨 - 처리하지 않은 {'배치' if batch_mode else '항목'} "
+                  f"{summary['cancelled']}개는 비워 둠")
+    
+    print(ledger.format_report(budget_skipped))
+    print(router.format_report())
+    print(pause.format_report(skipped))
+    print(format_cache_report(cache_before, use_cache))
+    print(format_api_report(api_before))
     
     # 결과 저장 및 경로 반환
-    return save_result_file(df_base)
+    result_path = writer.finalize()
+    if manifest:
+        manifest.save()
+    if journal:
+        journal.finish(result_path)
+        journal.close()
+        print(journal.format_report(len(replayed)))
+    return result_path
 
 def find_matching_clause_idx(df, clause_col, clause_id):
     """
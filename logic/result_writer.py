@@ -0,0 +1,129 @@
+# logic/result_writer.py
+"""
+결과 기록 모듈
+생성된 검토 의견을 데이터프레임 셀에 하나씩 쓰지 않고 모아 두었다가, 일정 개수/시간마다
+결과 파일 옆의 보조 파일(<결과 파일 이름>.partial.jsonl)에 이어 써서 실행 중에도 완료된 결과를 볼 수 있게 합니다.
+실행이 끝나면 모은 결과를 출력 열에 한 번에 반영해 최종 결과 파일(.xlsx)로 저장하고 보조 파일을 지웁니다.
+템플릿이 .xlsx이면 데이터프레임 전체를 다시 쓰지 않고 템플릿의 출력 셀만 패치해 저장합니다(다른 시트/서식 유지).
+결과 기록은 실행 엔진의 결과 전달 스레드(또는 이벤트 루프) 한 곳에서만 호출합니다.
+"""
+import json
+import os
+import time
+
+import pandas as pd
+
+from utils.common_utils import result_output_path, save_result_file
+from utils.config import config
+from utils.excel_patcher import can_patch, patch_template_cells
+from utils.logger import logger
+
+PARTIAL_SUFFIX = ".partial.jsonl"
+
+
+def get_output_settings():
+    """config["output"] 값 (보조 파일 기록 주기, 완료 후 보조 파일 유지 여부, 템플릿 셀 패치 여부)"""
+    output = config.get("output", {})
+    return {
+        "flush_every": output.get("flush_every", 50),
+        "flush_interval": output.get("flush_interval_seconds", 5.0),
+        "keep_partial": output.get("keep_partial", False),
+        "patch_template": output.get("patch_template", True)
+    }
+
+
+def _plain(value):
+    return value.item() if hasattr(value, "item") else value
+
+
+class ResultWriter:
+    """출력 열 결과 스트리밍 기록기"""
+
+    def __init__(self, df, output_col, original_path=None, flush_every=None, flush_interval=None,
+                 template_path=None, sheet_name=0):
+        """
+        Args:
+            df: 결과를 반영할 대상 데이터프레임
+            output_col: 결과를 기록할 열 이름
+            original_path: 원본 파일 경로 (결과 파일 이름에 사용)
+            template_path: df를 읽은 템플릿 파일 (지정하면 최종 저장 시 출력 셀만 패치)
+            sheet_name: df를 읽은 템플릿 시트 (이름 또는 번호)
+            flush_every / flush_interval: 보조 파일에 기록하는 결과 개수/간격(초) (None이면 config["output"])
+        """
+        settings = get_output_settings()
+        self.df = df
+        self.output_col = output_col
+        self.original_path = original_path
+        self.output_path = result_output_path(original_path)
+        self.partial_path = os.path.splitext(self.output_path)[0] + PARTIAL_SUFFIX
+        self.flush_every = max(1, flush_every or settings["flush_every"])
+        self.flush_interval = settings["flush_interval"] if flush_interval is None else flush_interval
+        self.keep_partial = settings["keep_partial"]
+        self.template_path = template_path if settings["patch_template"] else None
+        self.sheet_name = sheet_name
+        self.values = {}  # 행 인덱스 -> 결과
+        self._unflushed = []
+        self._last_flush = time.monotonic()
+
+    def write(self, index, value):
+        """행 결과 기록 (주기가 되면 보조 파일에 이어 씀)"""
+        self.values[index] = value
+        self._unflushed.append((index, value))
+        if len(self._unflushed) >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """아직 보조 파일에 쓰지 않은 결과를 이어 씀 (실패해도 실행은 계속)"""
+        self._last_flush = time.monotonic()
+        if not self._unflushed:
+            return
+        records, self._unflushed = self._unflushed, []
+        try:
+            os.makedirs(os.path.dirname(self.partial_path) or ".", exist_ok=True)
+            with open(self.partial_path, "a", encoding="utf-8") as f:
+                for index, value in records:
+                    f.write(json.dumps({"row": _plain(index), "value": value}, ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            logger.warning(f"중간 결과 파일 기록 실패 ({self.partial_path}): {e}")
+
+    def apply(self):
+        """모은 결과를 출력 열에 한 번에 반영하고 데이터프레임 반환"""
+        column = self.df[self.output_col].astype(object)
+        if self.values:
+            updates = pd.Series(list(self.values.values()), index=list(self.values.keys()), dtype=object)
+            column.loc[updates.index] = updates
+        self.df[self.output_col] = column
+        return self.df
+
+    def finalize(self):
+        """
+        최종 결과 파일 저장 (저장에 성공하면 보조 파일 삭제)
+
+        Returns:
+            결과 파일 경로
+        """
+        self.flush()
+        result_path = self._patch_template() or save_result_file(self.apply(), self.original_path, self.output_path)
+        if result_path and not self.keep_partial and os.path.exists(self.partial_path):
+            os.remove(self.partial_path)
+        return result_path
+
+    def _patch_template(self):
+        """템플릿의 출력 셀만 패치해 저장 (패치할 수 없으면 None, 데이터프레임 저장으로 대체)"""
+        if not can_patch(self.template_path):
+            return None
+        try:
+            positions = {}
+            for index, value in self.values.items():
+                position = self.df.index.get_loc(index)
+                if not isinstance(position, int):
+                    raise ValueError(f"행 인덱스가 고유하지 않습니다: {index}")
+                positions[position] = value
+            count = patch_template_cells(self.template_path, self.sheet_name, self.df.columns, self.output_col,
+                                         positions, self.output_path)
+        except Exception as e:
+            logger.warning(f"템플릿 셀 패치 실패, 데이터프레임으로 저장: {e}")
+            return None
+        self.apply()
+        logger.info(f"결과 파일 저장 완료 (템플릿 셀 {count}개 패치): {self.output_path}")
+        return self.output_path
@@ -0,0 +1,270 @@
+# logic/run_journal.py
+"""
+실행 저널 모듈
+보고서 생성 중 완료된 항목(행 인덱스, 프롬프트 해시, 검토 의견)을 도착하는 대로
+추가 전용 JSONL 파일(data/runs/<실행 ID>.jsonl)에 기록합니다. fsync는 일정 개수/시간마다 묶어서 합니다.
+앱이 종료되거나 API 한도로 실행이 멈춰도 resume_run(실행 ID)으로 완료된 항목은 다시 호출하지 않고
+나머지만 처리해 결과 파일을 다시 만듭니다.
+"""
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from api.gemini import EMPTY_RESPONSE_MESSAGE
+from utils.config import config
+from utils.logger import logger
+
+# 저널을 기록하는 생성기 (resume_run이 다시 호출할 함수)
+GENERATOR_DOCUMENTS = "documents"
+GENERATOR_REMARKS = "remarks"
+
+# 결과 셀에 기록되는 오류 응답 (완료 항목으로 기록/재사용하지 않음)
+ERROR_REPLY_PREFIXES = ("[오류]", "오류가 발생했습니다")
+
+
+def get_journal_settings():
+    """config["journal"] 값 (저널 디렉터리, fsync 묶음 크기/간격)"""
+    journal = config.get("journal", {})
+    return {
+        "enabled": journal.get("enabled", True),
+        "directory": journal.get("directory", os.path.join("data", "runs")),
+        "fsync_every": journal.get("fsync_every", 20),
+        "fsync_interval": journal.get("fsync_interval_seconds", 2.0)
+    }
+
+
+def new_run_id():
+    """새 실행 ID (시각 + 임의 문자열, 파일 이름으로 사용 가능)"""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+
+def prompt_set_key(compiled_prompts):
+    """
+    프롬프트 묶음의 해시 키
+
+    CompiledPromptSet이면 조립된 지침/규격 접두부의 해시(prefix_hash)를 사용하므로 프롬프트 파일 내용이
+    바뀌면 키도 바뀝니다. 컴파일할 프롬프트가 없어 이름 목록을 그대로 쓰는 경우에만 이름을 사용합니다.
+    """
+    prefix_hash = getattr(compiled_prompts, "prefix_hash", None)
+    if prefix_hash is not None:
+        return prefix_hash
+    return sorted(compiled_prompts) if isinstance(compiled_prompts, (list, tuple)) else compiled_prompts
+
+
+def item_prompt_hash(item, prompt_key, standard_id):
+    """
+    항목 요청의 해시 (프롬프트 내용, 규격, 모델, 행 입력이 같으면 같은 값)
+
+    재개할 때 해시가 달라진 항목(프롬프트 파일이나 행 내용이 바뀐 경우)은 다시 생성합니다.
+
+    Args:
+        item: 배치 항목 (row_input, model)
+        prompt_key: prompt_set_key(컴파일된 프롬프트 묶음)
+        standard_id: 규격 ID
+    """
+    payload = json.dumps([prompt_key, standard_id, item.get("model"), item["row_input"]],
+                         ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_error_reply(reply):
+    """결과로 재사용하면 안 되는 오류 응답인지 확인 (빈 응답 안내 문구 포함)"""
+    return not isinstance(reply, str) or reply.startswith(ERROR_REPLY_PREFIXES) or reply == EMPTY_RESPONSE_MESSAGE
+
+
+def _plain(value):
+    """numpy 정수 등 인덱스 값을 JSON으로 기록할 수 있는 값으로 변환"""
+    return value.item() if hasattr(value, "item") else value
+
+
+def journal_key(ref):
+    """
+    저널 항목 키 (항목의 ref를 JSON 값의 튜플로 변환)
+
+    ref는 (소스 인덱스, 대상 인덱스) 튜플 또는 대상 인덱스 하나입니다.
+    """
+    refs = ref if isinstance(ref, (tuple, list)) else (ref,)
+    return tuple(_plain(value) for value in refs)
+
+
+class RunJournal:
+    """
+    추가 전용 실행 저널 (스레드 안전, fsync 묶음 처리)
+
+    예외로 실행이 중단되어도 atexit에서 남은 기록을 디스크에 씁니다.
+    """
+
+    def __init__(self, path, run_id=None, prompt_key=None, standard_id=None, completed=None,
+                 fsync_every=20, fsync_interval=2.0):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.run_id = run_id
+        self.prompt_key = prompt_key
+        self.standard_id = standard_id
+        self.completed = completed or {}
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self._hashes = {}
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self.records = 0
+        atexit.register(self.close)
+
+    @classmethod
+    def start(cls, run_id, generator, params, prompt_key, standard_id):
+        """
+        실행 저널 열기 (새 실행이면 실행 정보 헤더를 기록, 기존 실행이면 완료 항목을 읽음)
+
+        Args:
+            run_id: 실행 ID (None이면 새 실행 ID 생성)
+            generator: GENERATOR_DOCUMENTS 또는 GENERATOR_REMARKS
+            params: 생성기를 다시 호출할 때 사용할 인자 (JSON으로 기록 가능한 값)
+            prompt_key: prompt_set_key(컴파일된 프롬프트 묶음) (프롬프트 해시에 포함)
+            standard_id: 규격 ID (프롬프트 해시에 포함)
+
+        Returns:
+            RunJournal 또는 None (config["journal"]["enabled"]가 False인 경우)
+        """
+        settings = get_journal_settings()
+        if not settings["enabled"]:
+            return None
+        run_id = run_id or new_run_id()
+        path = journal_path(run_id)
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        completed = {} if is_new else load_journal(run_id)[1]
+        journal = cls(path, run_id, prompt_key, standard_id, completed,
+                      settings["fsync_every"], settings["fsync_interval"])
+        if is_new:
+            journal._append({"type": "run", "run_id": run_id, "generator": generator, "params": params,
+                             "created": datetime.now().isoformat(timespec="seconds")}, sync=True)
+        return journal
+
+    def split(self, items):
+        """
+        항목을 처리할 항목과 저널의 결과를 사용할 항목으로 분리
+
+        프롬프트 해시가 저널 기록과 다른 항목(프롬프트, 규격, 모델, 행 입력이 바뀐 경우)은 다시 처리합니다.
+
+        Returns:
+            tuple: (처리할 항목 목록, [(항목, 저널의 검토 의견)])
+        """
+        pending, replayed = [], []
+        for item in items:
+            key = journal_key(item["ref"])
+            prompt_hash = item_prompt_hash(item, self.prompt_key, self.standard_id)
+            self._hashes[key] = prompt_hash
+            done = self.completed.get(key)
+            if done is not None and done[0] == prompt_hash and not is_error_reply(done[1]):
+                replayed.append((item, done[1]))
+            else:
+                pending.append(item)
+        return pending, replayed
+
+    def _append(self, record, sync=False):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._unsynced += 1
+            if sync or self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+
+    def _sync(self):
+        """버퍼를 비우고 디스크에 기록 (잠금 보유 상태에서 호출)"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def record(self, ref, reply):
+        """완료된 항목 기록 (오류 항목은 기록하지 않아 재개 시 다시 처리됨)"""
+        if is_error_reply(reply):
+            return
+        key = journal_key(ref)
+        self._append({"type": "row", "ref": list(key), "prompt_hash": self._hashes.get(key), "reply": reply})
+        self.records += 1
+
+    def finish(self, output_path):
+        """결과 파일 저장 완료 기록"""
+        self._append({"type": "done", "output_path": output_path,
+                      "finished": datetime.now().isoformat(timespec="seconds")}, sync=True)
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                if self._unsynced:
+                    self._sync()
+                self._file.close()
+        # 닫은 저널이 종료 처리 목록에 남아 계속 참조되지 않도록 해제
+        atexit.unregister(self.close)
+
+    def format_report(self, replayed_count):
+        return (f"실행 ID: {self.run_id} (저널 결과 사용 {replayed_count}개, 새로 기록 {self.records}개, "
+                f"중단되면 resume_run('{self.run_id}')로 이어서 처리)")
+
+
+def journal_path(run_id):
+    return os.path.join(get_journal_settings()["directory"], f"{run_id}.jsonl")
+
+
+def load_journal(run_id):
+    """
+    저널 읽기 (중간에 끊긴 마지막 줄은 무시)
+
+    Returns:
+        tuple: (실행 정보 헤더, {항목 키: (프롬프트 해시, 검토 의견)})
+
+    Raises:
+        FileNotFoundError: 저널이 없는 경우
+        ValueError: 실행 정보 헤더가 없는 경우
+    """
+    header = None
+    completed = {}
+    with open(journal_path(run_id), "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"실행 저널의 손상된 줄을 건너뜀 ({run_id})")
+                continue
+            if record.get("type") == "run":
+                header = record
+            elif record.get("type") == "row":
+                completed[tuple(record["ref"])] = (record["prompt_hash"], record["reply"])
+    if header is None:
+        raise ValueError(f"실행 정보가 없는 저널입니다: {run_id}")
+    return header, completed
+
+
+def resume_run(run_id, cancel_var=None):
+    """
+    중단된 실행 이어서 처리
+
+    저널에 기록된 인자로 같은 생성기를 다시 호출하며, 프롬프트 해시가 같은 완료 항목은
+    API를 호출하지 않고 저널의 검토 의견을 그대로 사용해 결과 파일을 다시 만듭니다.
+
+    Args:
+        run_id: 중단된 실행의 ID
+        cancel_var: 취소 상태를 추적하는 딕셔너리 {'cancelled': bool}
+
+    Returns:
+        결과 파일 경로
+    """
+    header, _ = load_journal(run_id)
+    params = dict(header["params"])
+
+    if header["generator"] == GENERATOR_DOCUMENTS:
+        from logic.extended_generator import generate_from_documents
+        return generate_from_documents(**params, cancel_var=cancel_var, run_id=run_id)
+    if header["generator"] == GENERATOR_REMARKS:
+        from logic.generator import generate_remarks
+        return generate_remarks(**params, cancel_var=cancel_var, run_id=run_id)
+    raise ValueError(f"알 수 없는 생성기: {header['generator']}")
@@ -0,0 +1,131 @@
+# logic/run_manifest.py
+"""
+실행 매니페스트 모듈
+같은 문서 쌍(소스/대상 파일, 시트, 열)으로 마지막에 생성한 항목의 내용 해시와 검토 의견을
+data/manifests/<문서 쌍 키>.json에 저장합니다. 해시는 build_context에 쓰이는 행 값(요청 텍스트),
+선택한 프롬프트의 내용(조립된 접두부 해시), 규격 ID, 모델을 포함합니다(run_journal.item_prompt_hash).
+오류 응답은 저장하지 않으므로 다음 증분 실행에서 다시 생성됩니다.
+증분 모드(incremental=True)에서는 마지막 매니페스트와 해시가 같은 항목은 이전 검토 의견을 그대로 쓰고,
+내용이 바뀌었거나 새로 생긴 항목만 API로 다시 생성합니다.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from logic.run_journal import is_error_reply, item_prompt_hash, journal_key
+from utils.config import config
+from utils.logger import logger
+
+
+def get_manifest_settings():
+    """config["manifest"] 값 (저장 여부, 디렉터리)"""
+    manifest = config.get("manifest", {})
+    return {
+        "enabled": manifest.get("enabled", True),
+        "directory": manifest.get("directory", os.path.join("data", "manifests"))
+    }
+
+
+def manifest_key(*parts):
+    """문서 쌍 키 (파일은 절대 경로로 비교, 시트/열 설정 포함)"""
+    normalized = [os.path.abspath(part) if isinstance(part, str) and os.path.exists(part) else part
+                  for part in parts]
+    payload = json.dumps(normalized, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class RunManifest:
+    """문서 쌍의 항목 해시 → 검토 의견 매니페스트"""
+
+    def __init__(self, path, prompt_key, standard_id, entries=None):
+        self.path = path
+        self.prompt_key = prompt_key
+        self.standard_id = standard_id
+        # 이전 버전에서 저장된 오류 응답은 재사용하지 않음
+        self.previous = {key: reply for key, reply in (entries or {}).items() if not is_error_reply(reply)}
+        self._current = []  # 이번 실행 항목의 해시 (입력 순서)
+        self._hashes = {}  # 항목 키 -> 해시
+        self._replies = {}
+
+    @classmethod
+    def load(cls, key, prompt_key, standard_id):
+        """
+        문서 쌍의 마지막 매니페스트 읽기 (없거나 손상되었으면 빈 매니페스트)
+
+        Args:
+            key: manifest_key로 만든 문서 쌍 키
+            prompt_key: prompt_set_key(컴파일된 프롬프트 묶음)
+            standard_id: 규격 ID
+
+        Returns:
+            RunManifest 또는 None (config["manifest"]["enabled"]가 False인 경우)
+        """
+        settings = get_manifest_settings()
+        if not settings["enabled"]:
+            return None
+        path = os.path.join(settings["directory"], f"{key}.json")
+        entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entries = json.load(f).get("entries", {})
+            except (OSError, ValueError) as e:
+                logger.warning(f"실행 매니페스트를 읽지 못해 무시함 ({path}): {e}")
+        return cls(path, prompt_key, standard_id, entries)
+
+    def track(self, items):
+        """이번 실행 항목 등록 (증분 모드가 아니어도 다음 실행의 비교 기준으로 저장)"""
+        for item in items:
+            prompt_hash = item_prompt_hash(item, self.prompt_key, self.standard_id)
+            self._hashes[journal_key(item["ref"])] = prompt_hash
+            self._current.append(prompt_hash)
+
+    def split(self, items):
+        """
+        항목을 다시 생성할 항목과 이전 검토 의견을 그대로 쓸 항목으로 분리
+
+        Returns:
+            tuple: (다시 생성할 항목 목록, [(항목, 이전 검토 의견)])
+        """
+        self.track(item for item in items if journal_key(item["ref"]) not in self._hashes)
+        changed, unchanged = [], []
+        for item in items:
+            previous = self.previous.get(self._hashes[journal_key(item["ref"])])
+            if previous is None:
+                changed.append(item)
+            else:
+                unchanged.append((item, previous))
+        return changed, unchanged
+
+    def add(self, ref, reply):
+        """이번 실행에서 결과를 기록한 항목 추가 (track으로 등록한 항목만, 오류 응답은 제외)"""
+        if is_error_reply(reply):
+            return
+        prompt_hash = self._hashes.get(journal_key(ref))
+        if prompt_hash is not None:
+            self._replies[prompt_hash] = reply
+
+    def save(self):
+        """
+        매니페스트 저장 (이번 실행 항목만 유지, 처리하지 못한 항목은 이전 검토 의견 유지)
+
+        임시 파일에 쓴 뒤 교체하므로 저장 중 중단되어도 이전 매니페스트가 손상되지 않습니다.
+        """
+        entries = {}
+        for prompt_hash in self._current:
+            reply = self._replies.get(prompt_hash, self.previous.get(prompt_hash))
+            if reply is not None:
+                entries[prompt_hash] = reply
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"updated": datetime.now().isoformat(timespec="seconds"), "entries": entries},
+                          f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning(f"실행 매니페스트 저장 실패 ({self.path}): {e}")
+        return len(entries)
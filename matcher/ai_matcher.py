@@ -43,6 +43,8 @@ class AIMatcher(DocumentMatcher):
 
         # Batch processing for source items
         from api.gemini import call_gemini
+        from api.generation_profiles import PROFILE_MATCHING_JSON
+        from api.token_accounting import token_ledger
 
         for source_batch in self._batch_process(source_items):
             source_context = [f"{i+1}. {item}" for i, item in enumerate(source_batch) if item.strip()]
@@ -66,10 +68,11 @@ class AIMatcher(DocumentMatcher):
             """
 
             try:
-                # Call Gemini API
-                response = call_gemini(prompt)
+                # Call Gemini API (token usage comes from the shared accounting service)
+                with token_ledger() as usage:
+                    response = call_gemini(prompt, profile=PROFILE_MATCHING_JSON)
                 self.api_usage["calls"] += 1
-                self.api_usage["tokens"] += len(prompt.split()) + len(response.split()) * 1.5
+                self.api_usage["tokens"] += usage.total_tokens
 
                 # Parse JSON response
                 json_start = response.find('[')
@@ -123,6 +126,8 @@ class AIMatcher(DocumentMatcher):
         
         # Gemini API 호출
         from api.gemini import call_gemini
+        from api.generation_profiles import PROFILE_MATCHING_JSON
+        from api.token_accounting import token_ledger
         
         prompt = f"""
 다음 항목과 가장 잘 매칭되는 항목을 목록에서 찾아주세요:
@@ -141,9 +146,10 @@ class AIMatcher(DocumentMatcher):
         
         try:
             # AI 응답 받기
-            response = call_gemini(prompt)
+            with token_ledger() as usage:
+                response = call_gemini(prompt, profile=PROFILE_MATCHING_JSON)
             self.api_usage["calls"] += 1
-            self.api_usage["tokens"] += len(prompt.split()) + len(response.split()) * 1.5
+            self.api_usage["tokens"] += usage.total_tokens
             
             # JSON 파싱
             # 응답에서 JSON 부분만 추출
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from api.token_accounting import estimate_tokens
 
 class DocumentParser(ABC):
     """문서 파서의 기본 추상 클래스"""
@@ -26,21 +27,8 @@ class DocumentParser(ABC):
         pass
     
     def estimate_tokens(self):
-        """추출된 텍스트의 토큰 수 추정"""
-        text = self.get_text_content()
-        if not text:
-            return 0
-            
-        # 영어 텍스트의 경우 단어 수 * 1.3으로 토큰 추정
-        # 한글 텍스트의 경우 문자 수 * 0.5으로 토큰 추정
-        english_ratio = sum(1 for c in text if ord('a') <= ord(c.lower()) <= ord('z')) / len(text)
-        
-        if english_ratio > 0.5:  # 영어 위주 텍스트
-            words = len(text.split())
-            self.tokens_estimate = int(words * 1.3)
-        else:  # 한글 위주 텍스트
-            self.tokens_estimate = int(len(text) * 0.5)
-            
+        """추출된 텍스트의 토큰 수 추정 (공용 토큰 추정기 사용)"""
+        self.tokens_estimate = estimate_tokens(self.get_text_content())
         return self.tokens_estimate
     
     def get_metadata(self):
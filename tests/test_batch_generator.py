@@ -0,0 +1,58 @@
+import unittest
+from unittest.mock import patch
+
+from api.token_accounting import TokenBudgetExceeded, estimate_tokens
+from logic import batch_generator
+from logic.batch_generator import (make_batch_item, pack_batches, parse_batch_response, build_batch_input,
+                                   estimate_item_tokens, render_batch_item)
+
+class TestBatchGenerator(unittest.TestCase):
+
+    def make_items(self, clauses, details="정보"):
+        return [make_batch_item(i, clause, "제목", details, f"항목: {clause}") for i, clause in enumerate(clauses)]
+
+    def test_pack_respects_item_limit_and_budget(self):
+        """Batches are split by item count and token budget."""
+        items = self.make_items([f"8.{i}" for i in range(10)])
+        self.assertEqual([len(b) for b in pack_batches(items, token_budget=10000, max_items=4)], [4, 4, 2])
+
+        items = self.make_items(["1", "2", "3"], details="가" * 200)
+        self.assertEqual(len(pack_batches(items, token_budget=150, max_items=10)), 3)
+
+    def test_packing_uses_shared_token_estimate(self):
+        """Packing sizes items with the same estimator the request budget uses, on the rendered item text."""
+        items = self.make_items(["1", "2", "3"], details="Gemini 규격 검토 " * 20)
+        for item in items:
+            self.assertEqual(estimate_item_tokens(item), estimate_tokens(render_batch_item(item)))
+        batch = pack_batches(items, token_budget=estimate_item_tokens(items[0]) * 2)[0]
+        self.assertEqual(len(batch), 2)
+        self.assertLessEqual(sum(estimate_item_tokens(item) for item in batch),
+                             estimate_tokens(build_batch_input(batch, "IEC 60204-1")))
+
+    def test_exhausted_budget_is_not_retried_per_item(self):
+        """A budget stop on the batch request propagates instead of falling back to individual calls."""
+        fallback_calls = []
+        with patch.object(batch_generator, "call_gemini_with_prompts", side_effect=TokenBudgetExceeded("예산")):
+            with self.assertRaises(TokenBudgetExceeded):
+                batch_generator.process_batch(pack_batches(self.make_items(["1", "2"]))[0], [], {},
+                                              fallback_calls.append)
+        self.assertEqual(fallback_calls, [])
+
+    def test_duplicate_clause_ids_get_unique_keys(self):
+        """Repeated clause IDs within one batch receive distinct keys."""
+        batch = pack_batches(self.make_items(["8.1", "8.1", "8.2"]))[0]
+        self.assertEqual([item["key"] for item in batch], ["8.1", "8.1 (2)", "8.2"])
+        self.assertIn('"8.1 (2)"', build_batch_input(batch, "IEC 60204-1"))
+
+    def test_parse_fenced_array_and_skip_unknown_ids(self):
+        """JSON arrays inside code fences parse; unknown or empty entries are dropped."""
+        response = '```json\n[{"id": "8.1", "remark": "적합"}, {"id": "9.9", "remark": "x"}, {"id": "8.2", "remark": ""}]\n```'
+        self.assertEqual(parse_batch_response(response, ["8.1", "8.2"]), {"8.1": "적합"})
+
+    def test_parse_invalid_response(self):
+        """Non-JSON responses yield no results so every row falls back."""
+        self.assertEqual(parse_batch_response("오류가 발생했습니다: timeout", ["8.1"]), {})
+        self.assertEqual(parse_batch_response(None, ["8.1"]), {})
+
+if __name__ == '__main__':
+    unittest.main()
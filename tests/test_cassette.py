@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from google.api_core import exceptions as google_exceptions
+
+from api import gemini
+from api.cassette import CassetteMiss, RecordingBackend, ReplayBackend
+from api.local_backend import LocalBackend
+
+class TestCassette(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = os.path.join(self.temp_dir.name, "run.jsonl.gz")
+
+    def make_local(self, **kwargs):
+        return LocalBackend(latency_distribution="fixed", latency_median=0.0, latency_min=0.0, **kwargs)
+
+    def record(self, calls, **kwargs):
+        recorder = RecordingBackend(self.make_local(**kwargs), self.path)
+        results = []
+        for prompt, stream in calls:
+            try:
+                response = recorder.generate(prompt, "gemini-1.5-flash", stream=stream)
+                results.append("".join(chunk.text for chunk in response) if stream else response.text)
+            except Exception as e:
+                results.append(type(e))
+        recorder.writer.close()
+        return results
+
+    def test_replay_reproduces_responses(self):
+        """Replayed responses and usage match what was recorded."""
+        recorded = self.record([("항목 1.1", False), ("항목 1.2", False), ("스트림", True)])
+
+        replay = ReplayBackend(self.path)
+        self.assertEqual(replay.generate("항목 1.1", "gemini-1.5-flash").text, recorded[0])
+        self.assertEqual(replay.generate("항목 1.2", "gemini-1.5-flash").usage_metadata.prompt_token_count,
+                         self.make_local().generate("항목 1.2", "gemini-1.5-flash").usage_metadata.prompt_token_count)
+        chunks = [chunk.text for chunk in replay.generate("스트림", "gemini-1.5-flash", stream=True)]
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), recorded[2])
+
+    def test_recorded_errors_are_replayed(self):
+        """A recorded API error is raised again with the same exception type."""
+        self.record([("요청", False)], rate_limit_error_rate=1.0)
+        with self.assertRaises(google_exceptions.TooManyRequests):
+            ReplayBackend(self.path).generate("요청", "gemini-1.5-flash")
+
+    def test_unknown_request_is_a_miss(self):
+        """Requests missing from the cassette fail instead of reaching the network."""
+        self.record([("요청", False)])
+        replay = ReplayBackend(self.path)
+        with self.assertRaises(CassetteMiss):
+            replay.generate("다른 요청", "gemini-1.5-flash")
+        self.assertEqual(replay.get_stats()["misses"], 1)
+
+    def test_replay_bypasses_cache_and_propagates_miss(self):
+        """With a cassette active the response cache is skipped, and a replay miss aborts instead of becoming a remark."""
+        def run(mode, backend, prompt, call=gemini.call_gemini):
+            with patch.object(gemini, "get_cassette_settings", return_value=(mode, self.path, False)), \
+                    patch.object(gemini, "get_client", return_value=backend), \
+                    patch.object(gemini, "has_api_key", return_value=True), \
+                    patch.object(gemini, "get_response_cache") as get_cache:
+                try:
+                    return call(prompt, model_name="gemini-1.5-flash")
+                finally:
+                    get_cache.assert_not_called()
+
+        recorder = RecordingBackend(self.make_local(), self.path)
+        recorded = run("record", recorder, "요청")
+        recorder.writer.close()
+
+        replay = ReplayBackend(self.path)
+        self.assertEqual(run("replay", replay, "요청"), recorded)
+        with self.assertRaises(CassetteMiss):
+            run("replay", replay, "다른 요청", call=lambda prompt, **kwargs: gemini.call_gemini_with_prompts(
+                prompt, [], prompt_type="remark", **kwargs))
+
+    def test_close_unregisters_exit_handler(self):
+        """A closed cassette writer drops its atexit registration instead of accumulating them."""
+        with patch("api.cassette.atexit") as atexit_module:
+            recorder = RecordingBackend(self.make_local(), self.path)
+            recorder.writer.close()
+        atexit_module.register.assert_called_once_with(recorder.writer.close)
+        atexit_module.unregister.assert_called_once_with(recorder.writer.close)
+
+    def test_unclosed_cassette_is_readable(self):
+        """Records flushed before an abnormal exit can still be replayed."""
+        recorder = RecordingBackend(self.make_local(), self.path)
+        text = recorder.generate("요청", "gemini-1.5-flash").text
+
+        self.assertEqual(ReplayBackend(self.path).generate("요청", "gemini-1.5-flash").text, text)
+        recorder.writer.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import time
+import unittest
+
+from api.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, CircuitPause
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_on_error_rate_and_fails_fast(self):
+        """The circuit opens once the rolling error rate crosses the threshold."""
+        breaker = CircuitBreaker(failure_rate_threshold=0.5, window_size=10, min_calls=4, open_seconds=60)
+        for _ in range(2):
+            breaker.before_call()
+            breaker.record_success()
+        for _ in range(2):
+            breaker.before_call()
+            breaker.record_failure(ValueError("500"))
+
+        self.assertEqual(breaker.state, OPEN)
+        with self.assertRaises(CircuitOpenError) as ctx:
+            breaker.before_call()
+        self.assertGreater(ctx.exception.retry_after, 0)
+        self.assertEqual(breaker.get_stats()["rejected"], 1)
+
+    def test_half_open_allows_one_trial(self):
+        """After the open period one trial call decides whether the circuit closes."""
+        breaker = CircuitBreaker(min_calls=1, open_seconds=0.05)
+        breaker.before_call()
+        breaker.record_failure()
+        time.sleep(0.06)
+
+        self.assertEqual(breaker.state, HALF_OPEN)
+        breaker.before_call()
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+
+        time.sleep(0.06)
+        breaker.before_call()
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+
+class TestCircuitPause(unittest.TestCase):
+
+    def test_pause_resumes_after_rejection(self):
+        """A rejected call waits for the circuit and is retried."""
+        pause = CircuitPause(max_pause=5)
+        attempts = []
+
+        def call():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise CircuitOpenError("open", retry_after=0.01)
+            return "결과"
+
+        self.assertEqual(pause.call(call), "결과")
+        self.assertEqual(len(attempts), 2)
+        self.assertFalse(pause.halted)
+
+    def test_halts_after_max_pause(self):
+        """Once the pause budget is spent remaining calls fail without running."""
+        pause = CircuitPause(max_pause=0.5)
+        calls = []
+
+        def call():
+            calls.append(1)
+            raise CircuitOpenError("open", retry_after=10)
+
+        with self.assertRaises(CircuitOpenError):
+            pause.call(call)
+        self.assertTrue(pause.halted)
+        with self.assertRaises(CircuitOpenError):
+            pause.call(call)
+        self.assertEqual(len(calls), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font
+
+from utils.excel_patcher import TemplatePatchError, patch_template_cells
+
+class TestExcelPatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.template = os.path.join(self.temp_dir.name, "template.xlsx")
+        self.output = os.path.join(self.temp_dir.name, "result.xlsx")
+
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.title = "검토"
+        sheet.append(["clause", "title", "remark"])
+        sheet.append(["1.1", "범위", None])
+        sheet.append([None, None, None])
+        sheet.append(["1.2", "정의", None])
+        sheet["A1"].font = Font(bold=True)
+        sheet.merge_cells("D1:E1")
+        cover = workbook.create_sheet("표지")
+        cover["A1"] = "=1+1"
+        workbook.save(self.template)
+
+    def test_patches_only_output_cells(self):
+        """Only the output cells change; styles, merges and other sheets are preserved."""
+        df = pd.read_excel(self.template)
+        count = patch_template_cells(self.template, 0, df.columns, "remark", {0: "의견 A", 2: "=적합"}, self.output)
+        self.assertEqual(count, 2)
+
+        workbook = load_workbook(self.output)
+        sheet = workbook["검토"]
+        self.assertEqual((sheet["C2"].value, sheet["C3"].value, sheet["C4"].value), ("의견 A", None, "=적합"))
+        self.assertEqual(sheet["C4"].data_type, "s")
+        self.assertTrue(sheet["A1"].font.bold)
+        self.assertIn("D1:E1", [str(r) for r in sheet.merged_cells.ranges])
+        self.assertEqual(workbook["표지"]["A1"].value, "=1+1")
+        self.assertEqual(pd.read_excel(self.output)["remark"].tolist()[:1], ["의견 A"])
+
+    def test_new_output_column_gets_header(self):
+        """An output column added by the generator goes after the last template column; helper columns are skipped."""
+        workbook = Workbook()
+        workbook.active.append(["clause"])
+        workbook.active.append(["1.1"])
+        workbook.save(self.template)
+
+        patch_template_cells(self.template, 0, ["clause", "의견", "_normalized"], "의견", {0: "의견 A"}, self.output)
+        sheet = load_workbook(self.output).active
+        self.assertEqual((sheet["B1"].value, sheet["B2"].value, sheet["C1"].value), ("의견", "의견 A", None))
+
+    def test_header_mismatch_is_rejected(self):
+        """A sheet whose header differs from the DataFrame columns is not patched."""
+        with self.assertRaises(TemplatePatchError):
+            patch_template_cells(self.template, "검토", ["항목", "title", "remark"], "remark", {0: "x"}, self.output)
+        self.assertFalse(os.path.exists(self.output))
+
+if __name__ == "__main__":
+    unittest.main()
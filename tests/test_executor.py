@@ -0,0 +1,89 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from api.rate_limiter import AdaptiveRateLimiter
+from api.request_context import PromptType, current_prompt_type, prompt_context
+from logic import executor
+from logic.executor import ExecutionEngine, get_max_workers
+
+class TestExecutionEngine(unittest.TestCase):
+
+    def test_results_written_in_input_order(self):
+        """Results are delivered in task order even when later tasks finish first."""
+        delivered = []
+        engine = ExecutionEngine(max_workers=4, ordered=True, poll_interval=0.05)
+        summary = engine.run([0.2, 0.05, 0.1, 0.0], lambda delay: time.sleep(delay) or delay,
+                             lambda task, result, error: delivered.append(result))
+        self.assertEqual(delivered, [0.2, 0.05, 0.1, 0.0])
+        self.assertEqual(summary, {"completed": 4, "cancelled": 0})
+
+    def test_results_delivered_on_completion_by_default(self):
+        """By default a slow head task does not hold back results that already finished."""
+        delivered = []
+        engine = ExecutionEngine(max_workers=4, poll_interval=0.05)
+        engine.run([0.3, 0.0, 0.05], lambda delay: time.sleep(delay) or delay,
+                   lambda task, result, error: delivered.append(result))
+        self.assertEqual(delivered, [0.0, 0.05, 0.3])
+
+    def test_worker_bound_and_errors(self):
+        """No more than max_workers tasks run at once; exceptions reach the writer."""
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def work(task):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.02)
+            with lock:
+                state["running"] -= 1
+            if task == 3:
+                raise ValueError("실패")
+            return task
+
+        errors = []
+        ExecutionEngine(max_workers=2, poll_interval=0.05).run(
+            range(8), work, lambda task, result, error: error and errors.append(task))
+        self.assertLessEqual(state["peak"], 2)
+        self.assertEqual(errors, [3])
+
+    def test_default_workers_follow_limiter(self):
+        """With max_workers=0 the worker count follows the limiter's current concurrency limit."""
+        limiter = AdaptiveRateLimiter(initial_concurrency=5, max_concurrency=50)
+        with patch.object(executor, "get_rate_limiter", return_value=limiter), \
+                patch.dict(executor.config, {"execution": {"max_workers": 0}}):
+            self.assertEqual((get_max_workers(300), get_max_workers(3)), (5, 3))
+        with patch.dict(executor.config, {"execution": {"max_workers": 8}}):
+            self.assertEqual(get_max_workers(300), 8)
+
+    def test_cancel_stops_new_work(self):
+        """After cancellation no new tasks start and finished results are kept."""
+        cancel = {"cancelled": False}
+        started = []
+
+        def work(task):
+            started.append(task)
+            if task == 1:
+                cancel["cancelled"] = True
+            time.sleep(0.02)
+            return task
+
+        delivered = []
+        summary = ExecutionEngine(max_workers=1, cancelled=lambda: cancel["cancelled"], poll_interval=0.01).run(
+            range(10), work, lambda task, result, error: delivered.append(result))
+        self.assertLess(len(started), 10)
+        self.assertEqual(delivered, started)
+        self.assertEqual(summary["cancelled"], 10 - len(started))
+
+    def test_context_reaches_workers(self):
+        """Workers see the submitting thread's prompt context."""
+        seen = []
+        with prompt_context(PromptType.CHAT):
+            ExecutionEngine(max_workers=2).run(range(3), lambda task: current_prompt_type(),
+                                               lambda task, result, error: seen.append(result))
+        self.assertEqual(seen, [PromptType.CHAT] * 3)
+
+if __name__ == "__main__":
+    unittest.main()
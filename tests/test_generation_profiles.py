@@ -0,0 +1,46 @@
+import unittest
+from unittest import mock
+
+from api.generation_profiles import (PROFILE_CHAT, PROFILE_MATCHING_JSON, PROFILE_REMARK_BATCH_JSON,
+                                     PROFILE_REMARK_SHORT, get_generation_config, profile_for_prompt_type)
+from api.request_context import PromptType
+
+class TestGenerationProfiles(unittest.TestCase):
+
+    def test_profile_overrides_ai_settings(self):
+        """Profiles start from ai_settings and override only their own keys."""
+        chat = get_generation_config(PROFILE_CHAT)
+        self.assertEqual(chat["max_output_tokens"], 2048)
+        self.assertNotIn("response_mime_type", chat)
+
+        remark = get_generation_config(PROFILE_REMARK_SHORT)
+        self.assertEqual(remark["max_output_tokens"], 512)
+        self.assertEqual(remark["temperature"], chat["temperature"])
+
+        matching = get_generation_config(PROFILE_MATCHING_JSON)
+        self.assertEqual(matching["response_mime_type"], "application/json")
+        self.assertEqual(matching["temperature"], 0.0)
+
+    def test_batch_cap_scales_with_items(self):
+        """The batch profile allows one short remark per item, up to the model maximum."""
+        self.assertEqual(get_generation_config(PROFILE_REMARK_BATCH_JSON, 3)["max_output_tokens"], 3 * 512)
+        self.assertEqual(get_generation_config(PROFILE_REMARK_BATCH_JSON, 100)["max_output_tokens"], 8192)
+
+    def test_prompt_type_defaults_and_unknown_profile(self):
+        self.assertEqual(profile_for_prompt_type(PromptType.CHAT), PROFILE_CHAT)
+        self.assertEqual(profile_for_prompt_type("remark"), PROFILE_REMARK_SHORT)
+        with self.assertRaises(ValueError):
+            get_generation_config("unknown")
+
+    def test_call_gemini_sends_profile_config(self):
+        """call_gemini passes the resolved profile to the client."""
+        from api import gemini
+        client = mock.Mock(requires_api_key=False)
+        client.generate.return_value = mock.Mock(text="ok", usage_metadata=None)
+        with mock.patch.object(gemini, "get_client", return_value=client), \
+                mock.patch.object(gemini, "has_api_key", return_value=True):
+            gemini.call_gemini("프로필 확인 요청", use_cache=False, profile=PROFILE_MATCHING_JSON)
+        self.assertEqual(client.generate.call_args.args[2], get_generation_config(PROFILE_MATCHING_JSON))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import unittest
+from unittest import mock
+
+from api.health import HealthMonitor, STATUS_DEGRADED, STATUS_DOWN, STATUS_HEALTHY, STATUS_UNKNOWN
+
+class TestHealthMonitor(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, {"GEMINI_API_KEY": "test-key"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_percentiles_from_passive_samples(self):
+        """Latencies recorded from real calls produce rolling p50/p95."""
+        monitor = HealthMonitor()
+        for latency in range(1, 101):
+            monitor.record(latency / 100, True)
+
+        snapshot = monitor.snapshot()
+        self.assertEqual(snapshot["status"], STATUS_HEALTHY)
+        self.assertAlmostEqual(snapshot["p50"], 0.51)
+        self.assertAlmostEqual(snapshot["p95"], 0.95)
+        self.assertFalse(snapshot["stale"])
+
+    def test_error_rate_drives_status(self):
+        """Failures move the status to degraded and then down."""
+        monitor = HealthMonitor(degraded_error_rate=0.2, down_error_rate=0.6)
+        self.assertEqual(monitor.snapshot()["status"], STATUS_UNKNOWN)
+
+        for _ in range(7):
+            monitor.record(0.2, True)
+        for _ in range(3):
+            monitor.record(0.2, False, ValueError("503"))
+        self.assertEqual(monitor.snapshot()["status"], STATUS_DEGRADED)
+
+        for _ in range(10):
+            monitor.record(0.2, False, ValueError("503"))
+        snapshot = monitor.snapshot()
+        self.assertEqual(snapshot["status"], STATUS_DOWN)
+        self.assertEqual(snapshot["last_error"], "503")
+
+    def test_probe_only_when_idle(self):
+        """The probe is skipped while real traffic keeps the status fresh."""
+        probes = []
+        monitor = HealthMonitor(ttl=60, probe_func=lambda: probes.append(1))
+
+        self.assertTrue(monitor.probe_if_idle())
+        self.assertFalse(monitor.probe_if_idle())
+        monitor.record(0.3, True)
+        self.assertFalse(monitor.probe_if_idle())
+        self.assertEqual(len(probes), 1)
+
+        monitor.ttl = 0
+        self.assertTrue(monitor.probe_if_idle())
+        self.assertEqual(monitor.snapshot()["probes"], 2)
+
+    def test_status_change_is_published(self):
+        """Status changes are published as AppContext events."""
+        from utils.app_context import AppContext
+        from api.health import HEALTH_EVENT
+
+        received = []
+        listener = received.append
+        context = AppContext.get_instance()
+        context.add_event_listener(HEALTH_EVENT, listener)
+        self.addCleanup(context.remove_event_listener, HEALTH_EVENT, listener)
+
+        monitor = HealthMonitor()
+        monitor.record(0.5, True)
+        monitor.record(0.5, True)
+
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0]["status"], STATUS_HEALTHY)
+
+    def test_record_skips_snapshot_within_publish_interval(self):
+        """Recording calls inside the publish interval does not build a snapshot per call."""
+        monitor = HealthMonitor()
+        with mock.patch.object(monitor, "snapshot", wraps=monitor.snapshot) as snapshot:
+            for _ in range(50):
+                monitor.record(0.5, True)
+        self.assertEqual(snapshot.call_count, 1)
+
+if __name__ == "__main__":
+    unittest.main()
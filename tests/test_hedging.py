@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from api.hedging import HedgePolicy, LatencyHistogram
+from api.request_context import RequestPriority, current_priority, priority_context
+
+class TestHedging(unittest.TestCase):
+
+    def make_policy(self, **kwargs):
+        options = dict(enabled=True, min_samples=5, min_delay=0.02, max_extra_ratio=1.0, max_workers=4)
+        options.update(kwargs)
+        policy = HedgePolicy(**options)
+        for _ in range(200):
+            policy.record_latency("m", 0.01)
+        return policy
+
+    def test_histogram_percentile(self):
+        """Percentiles come from the upper bound of the matching bucket."""
+        histogram = LatencyHistogram(window_size=100)
+        for _ in range(95):
+            histogram.record(0.1)
+        for _ in range(5):
+            histogram.record(5.0)
+        self.assertLess(histogram.percentile(0.5), 0.2)
+        self.assertGreaterEqual(histogram.percentile(0.99), 5.0)
+
+    def test_no_hedge_before_min_samples(self):
+        """Without enough samples no hedge delay is reported."""
+        policy = HedgePolicy(enabled=True, min_samples=5)
+        policy.record_latency("m", 0.1)
+        self.assertIsNone(policy.hedge_delay("m"))
+        self.assertIsNone(HedgePolicy(enabled=False).hedge_delay("m"))
+
+    def test_slow_primary_is_hedged(self):
+        """A primary slower than p95 is raced by a hedge and the faster answer wins."""
+        policy = self.make_policy()
+        calls = []
+        lock = threading.Lock()
+
+        def func(elapsed):
+            with lock:
+                calls.append(elapsed)
+                first = len(calls) == 1
+            time.sleep(0.5 if first else 0.01)
+            return "primary" if first else "hedge"
+
+        released = []
+        result = policy.call(func, "m", acquire_extra=lambda: True, release_extra=released.append)
+        self.assertEqual(result, "hedge")
+        self.assertEqual(len(calls), 2)
+        self.assertGreater(calls[1], 0)
+        stats = policy.get_stats()
+        self.assertEqual((stats["hedged"], stats["hedge_wins"]), (1, 1))
+        time.sleep(0.05)
+        self.assertEqual(released, [None])
+
+    def test_extra_ratio_cap(self):
+        """Hedges stop once the extra-request ratio would be exceeded."""
+        policy = self.make_policy(max_extra_ratio=0.5)
+        for _ in range(4):
+            policy.call(lambda elapsed: time.sleep(0.1), "m")
+        self.assertEqual(policy.get_stats()["hedged"], 2)
+
+    def test_hedge_skipped_without_capacity(self):
+        """A refused acquire_extra leaves the primary alone."""
+        policy = self.make_policy()
+        result = policy.call(lambda elapsed: time.sleep(0.1) or "primary", "m", acquire_extra=lambda: False)
+        self.assertEqual(result, "primary")
+        self.assertEqual(policy.get_stats()["hedged"], 0)
+
+    def test_priority_lane_survives_hedged_call(self):
+        """Primary and hedge requests both see the caller's priority lane."""
+        policy = self.make_policy()
+        seen = []
+        lock = threading.Lock()
+
+        def func(elapsed):
+            with lock:
+                seen.append(current_priority())
+                first = len(seen) == 1
+            time.sleep(0.5 if first else 0.01)
+            return "done"
+
+        with priority_context(RequestPriority.INTERACTIVE):
+            policy.call(func, "m", acquire_extra=lambda: True)
+        self.assertEqual(seen, [RequestPriority.INTERACTIVE] * 2)
+
+    def test_primary_runs_inline_without_hedge_room(self):
+        """When the extra-request ratio leaves no room, the primary runs on the caller thread."""
+        policy = self.make_policy(max_extra_ratio=0.0)
+        threads = []
+        policy.call(lambda elapsed: threads.append(threading.current_thread()), "m")
+        self.assertEqual(threads, [threading.current_thread()])
+
+    def test_async_loser_is_cancelled(self):
+        """In async mode the slower request is cancelled."""
+        policy = self.make_policy()
+        cancelled = []
+        calls = []
+
+        async def func(elapsed):
+            calls.append(elapsed)
+            try:
+                await asyncio.sleep(1.0 if len(calls) == 1 else 0.01)
+            except asyncio.CancelledError:
+                cancelled.append(len(calls))
+                raise
+            return "done"
+
+        async def acquire():
+            return True
+
+        async def run():
+            result = await policy.call_async(func, "m", acquire_extra=acquire)
+            await asyncio.sleep(0)
+            return result
+
+        self.assertEqual(asyncio.run(run()), "done")
+        self.assertEqual(len(cancelled), 1)
+        self.assertEqual(policy.get_stats()["hedge_wins"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import os
+import unittest
+from unittest import mock
+
+from google.api_core import exceptions as google_exceptions
+
+from api.llm_backend import LLMBackend, get_backend_name
+from api.local_backend import LocalBackend
+
+class TestLocalBackend(unittest.TestCase):
+
+    def make_backend(self, **kwargs):
+        options = dict(latency_distribution="fixed", latency_median=0.0, latency_min=0.0)
+        options.update(kwargs)
+        return LocalBackend(**options)
+
+    def test_implements_backend_protocol(self):
+        """The stand-in satisfies the LLMBackend protocol and needs no API key."""
+        backend = self.make_backend()
+        self.assertIsInstance(backend, LLMBackend)
+        self.assertFalse(backend.requires_api_key)
+
+    def test_responses_are_deterministic(self):
+        """The same seed and prompt always produce the same response and usage."""
+        first = self.make_backend(seed=7).generate("항목 1.1 검토", "gemini-1.5-flash")
+        second = self.make_backend(seed=7).generate("항목 1.1 검토", "gemini-1.5-flash")
+        self.assertEqual(first.text, second.text)
+        self.assertGreater(first.usage_metadata.prompt_token_count, 0)
+
+    def test_error_injection_uses_api_core_exceptions(self):
+        """Injected 429/5xx errors are raised as google.api_core exceptions."""
+        throttled = self.make_backend(rate_limit_error_rate=1.0)
+        with self.assertRaises(google_exceptions.TooManyRequests):
+            throttled.generate("요청", "gemini-1.5-flash")
+
+        failing = self.make_backend(server_error_rate=1.0)
+        with self.assertRaises((google_exceptions.ServiceUnavailable, google_exceptions.InternalServerError)):
+            failing.generate("요청", "gemini-1.5-flash")
+        self.assertEqual(failing.get_stats()["server_errors"], 1)
+
+    def test_timeout_raises_deadline_exceeded(self):
+        """A latency above the request timeout fails with DeadlineExceeded."""
+        backend = self.make_backend(latency_median=0.2)
+        with self.assertRaises(google_exceptions.DeadlineExceeded):
+            backend.generate("요청", "gemini-1.5-flash", request_options={"timeout": 0.01})
+
+    def test_batch_prompt_gets_json_array(self):
+        """Batch prompts are answered with one remark per item ID."""
+        prompt = "## 항목 ID: 1.1\n항목: 1.1\n\n## 항목 ID: 1.2\n항목: 1.2"
+        remarks = json.loads(self.make_backend().generate(prompt, "gemini-1.5-flash").text)
+        self.assertEqual([entry["id"] for entry in remarks], ["1.1", "1.2"])
+
+    def test_stream_yields_chunks(self):
+        """Streaming responses yield chunks that join to the full text."""
+        backend = self.make_backend()
+        expected = backend.generate("스트림", "gemini-1.5-flash").text
+        backend.reset()
+        chunks = [chunk.text for chunk in backend.generate("스트림", "gemini-1.5-flash", stream=True)]
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), expected)
+
+    def test_backend_selected_by_environment(self):
+        """LLM_BACKEND overrides the configured backend."""
+        with mock.patch.dict(os.environ, {"LLM_BACKEND": "local"}):
+            self.assertEqual(get_backend_name(), "local")
+        with mock.patch.dict(os.environ, {"LLM_BACKEND": "unknown"}):
+            with self.assertRaises(ValueError):
+                get_backend_name()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+
+from api.model_router import ModelRouter
+
+class TestModelRouter(unittest.TestCase):
+
+    def setUp(self):
+        self.router = ModelRouter(fast_model="fast", heavy_model="heavy", complexity_threshold=2.0)
+
+    def test_short_verdict_rows_use_fast_model(self):
+        """Rows with only a clause, a title and a short verdict go to the fast model."""
+        row = {"항목": "8.2", "제목": "보호 접지", "검토의견": "N/A"}
+        self.assertEqual(self.router.route(row, "항목: 8.2\n제목: 보호 접지"), "fast")
+
+    def test_requirement_text_and_long_context_use_heavy_model(self):
+        """Long requirement text pushes a row over the threshold."""
+        requirement = "보호 본딩 회로는 모든 노출 도전부가 연결되도록 구성되어야 하며 " * 5
+        row = {"항목": "8.2.1", "제목": "보호 본딩", "요구사항": requirement}
+        self.assertEqual(self.router.route(row, requirement * 2), "heavy")
+
+    def test_chat_and_disabled_router_use_heavy_model(self):
+        """Chat prompts and a disabled router always use the heavy model."""
+        row = {"항목": "1"}
+        self.assertEqual(self.router.route(row, "", prompt_type="chat"), "heavy")
+        self.router.enabled = False
+        self.assertEqual(self.router.route(row, ""), "heavy")
+        self.assertEqual(self.router.get_stats(), {"heavy": 2})
+
+if __name__ == '__main__':
+    unittest.main()
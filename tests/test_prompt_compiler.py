@@ -0,0 +1,33 @@
+import unittest
+
+from api.prompt_compiler import CompiledPromptSet
+
+class TestCompiledPromptSet(unittest.TestCase):
+
+    def setUp(self):
+        self.compiled = CompiledPromptSet(["a"], "remark", "# a 지침\n{clause} 항목 '{title}' 검토, JSON {\"id\": 1}")
+
+    def test_slots_filled_per_row(self):
+        """Clause and title slots are filled while other braces stay intact."""
+        prompt = self.compiled.render("입력", {"clause": "8.2", "title": "보호"})
+        self.assertIn("8.2 항목 '보호' 검토", prompt)
+        self.assertIn('{"id": 1}', prompt)
+        self.assertTrue(prompt.endswith("# 사용자 입력\n입력"))
+
+    def test_missing_values_keep_placeholders(self):
+        """Without slot values the prefix is used unchanged."""
+        self.assertEqual(self.compiled.render_prefix(), self.compiled.prefix)
+        self.assertIn("{title}", self.compiled.render_prefix({"clause": "1"}))
+
+    def test_extra_sections_between_prefix_and_input(self):
+        """Dynamic sections are placed after the prefix and before the user input."""
+        prompt = self.compiled.render("입력", extra_sections=["# 컨텍스트\n내용", ""])
+        self.assertLess(prompt.index("# 컨텍스트"), prompt.index("# 사용자 입력"))
+
+    def test_prefix_hash_is_stable(self):
+        """The prefix hash depends only on the prefix text."""
+        same = CompiledPromptSet(["b"], "chat", self.compiled.prefix)
+        self.assertEqual(same.prefix_hash, self.compiled.prefix_hash)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from utils.prompt_loader import PromptRegistry
+
+class TestPromptRegistry(unittest.TestCase):
+
+    def setUp(self):
+        """Create a registry over a temporary prompt directory."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.registry = PromptRegistry(self.tmpdir, check_interval=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def write(self, name, data):
+        with open(os.path.join(self.tmpdir, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def test_index_by_type_sorted_by_priority(self):
+        """Prompts are grouped by type and ordered by priority."""
+        self.write("b", {"type": ["remark"], "template": "B", "priority": 2})
+        self.write("a", {"type": "remark", "template": "A", "priority": 1})
+        self.write("c", {"type": ["chat"], "template": "C"})
+
+        self.assertEqual([p["template"] for p in self.registry.get_prompts("remark")], ["A", "B"])
+        self.assertEqual([p["prompt_name"] for p in self.registry.get_prompts("chat")], ["c"])
+
+    def test_in_place_edit_and_removal_detected(self):
+        """Editing a file in place or deleting it is picked up on the next lookup."""
+        self.write("a", {"type": ["remark"], "template": "old"})
+        self.assertEqual(self.registry.get_prompts("remark")[0]["template"], "old")
+
+        self.write("a", {"type": ["remark"], "template": "new template"})
+        self.assertEqual(self.registry.get_prompts("remark")[0]["template"], "new template")
+
+        os.remove(os.path.join(self.tmpdir, "a.json"))
+        self.assertEqual(self.registry.get_prompts("remark"), [])
+
+    def test_pushed_updates_visible_without_rescan(self):
+        """update_file/remove_file apply immediately even inside the check interval."""
+        self.registry.check_interval = 3600
+        self.assertEqual(self.registry.get_prompts("remark"), [])
+
+        data = {"prompt_name": "x", "type": ["remark"], "template": "X"}
+        self.write("x", data)
+        self.registry.update_file("x.json", data)
+        self.assertEqual(self.registry.get_prompts("remark")[0]["template"], "X")
+
+        self.registry.remove_file("x.json")
+        self.assertEqual(self.registry.get_prompts("remark"), [])
+
+if __name__ == '__main__':
+    unittest.main()
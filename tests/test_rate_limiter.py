@@ -0,0 +1,115 @@
+import threading
+import time
+import unittest
+
+from api.rate_limiter import AdaptiveRateLimiter, LANE_BATCH, LANE_INTERACTIVE, is_throttle_error
+from api.request_context import PromptType, RequestPriority, current_priority, priority_context, prompt_context
+
+class TestAdaptiveRateLimiter(unittest.TestCase):
+
+    def test_multiplicative_decrease_on_throttle(self):
+        """A 429/503 response halves the concurrency limit once per cooldown."""
+        limiter = AdaptiveRateLimiter(initial_concurrency=8, max_concurrency=20, decrease_cooldown=60)
+        limiter.acquire()
+        limiter.release(success=False, throttled=True)
+        self.assertEqual(limiter.get_stats()["concurrency_limit"], 4)
+
+        # 같은 쿨다운 안의 추가 429는 한도를 더 줄이지 않음
+        limiter.acquire()
+        limiter.release(success=False, throttled=True)
+        self.assertEqual(limiter.get_stats()["concurrency_limit"], 4)
+
+    def test_additive_increase_on_success(self):
+        """Successes grow the limit by roughly one per window of limit successes."""
+        limiter = AdaptiveRateLimiter(initial_concurrency=2, max_concurrency=3, requests_per_minute=6000)
+        for _ in range(2):
+            limiter.acquire()
+            limiter.release(success=True)
+        self.assertGreaterEqual(limiter.get_stats()["concurrency_limit"], 2.9)
+
+        for _ in range(10):
+            limiter.acquire()
+            limiter.release(success=True)
+        self.assertEqual(limiter.get_stats()["concurrency_limit"], 3)
+
+    def test_concurrency_limit_blocks(self):
+        """No new slot is granted while the in-flight count is at the limit."""
+        limiter = AdaptiveRateLimiter(initial_concurrency=1, max_concurrency=1)
+        limiter.acquire()
+        with self.assertRaises(TimeoutError):
+            limiter.acquire(timeout=0.1)
+        limiter.release()
+        limiter.acquire(timeout=0.1)
+
+    def test_requests_per_minute_bucket(self):
+        """The request bucket refuses bursts beyond the per-minute capacity."""
+        limiter = AdaptiveRateLimiter(requests_per_minute=2, initial_concurrency=5)
+        for _ in range(2):
+            limiter.acquire()
+            limiter.release()
+        with self.assertRaises(TimeoutError):
+            limiter.acquire(timeout=0.1)
+
+    def test_interactive_reserved_slot(self):
+        """Batch requests leave the reserved slot free for interactive requests."""
+        limiter = AdaptiveRateLimiter(initial_concurrency=3, max_concurrency=3, interactive_reserved=1)
+        for _ in range(2):
+            limiter.acquire(lane=LANE_BATCH)
+        with self.assertRaises(TimeoutError):
+            limiter.acquire(timeout=0.1, lane=LANE_BATCH)
+        limiter.acquire(timeout=0.1, lane=LANE_INTERACTIVE)
+        self.assertEqual(limiter.get_stats()["lanes"][LANE_INTERACTIVE]["in_flight"], 1)
+
+    def test_weighted_fair_order(self):
+        """With both lanes queued, interactive waiters are served ahead of batch by weight."""
+        limiter = AdaptiveRateLimiter(initial_concurrency=1, max_concurrency=1, interactive_reserved=0,
+                                      lane_weights={LANE_INTERACTIVE: 2, LANE_BATCH: 1}, requests_per_minute=6000)
+        limiter.acquire(lane=LANE_BATCH)
+        order = []
+        lock = threading.Lock()
+
+        def worker(lane):
+            limiter.acquire(lane=lane)
+            with lock:
+                order.append(lane)
+            time.sleep(0.01)
+            limiter.release(lane=lane)
+
+        threads = []
+        for lane in [LANE_BATCH] * 3 + [LANE_INTERACTIVE] * 3:
+            thread = threading.Thread(target=worker, args=(lane,))
+            thread.start()
+            threads.append(thread)
+            time.sleep(0.02)
+        limiter.release(lane=LANE_BATCH)
+        for thread in threads:
+            thread.join(5)
+
+        # 먼저 기다린 일괄 요청보다 대화형 요청이 앞서되, 일괄 차선도 굶지 않음
+        self.assertEqual(order[:2], [LANE_INTERACTIVE, LANE_INTERACTIVE])
+        self.assertIn(LANE_BATCH, order[:4])
+        self.assertEqual(sorted(order), sorted([LANE_BATCH] * 3 + [LANE_INTERACTIVE] * 3))
+
+    def test_priority_follows_chat_scope(self):
+        """Chat requests default to the interactive lane; an explicit priority wins."""
+        self.assertEqual(current_priority(), RequestPriority.BATCH)
+        with prompt_context(PromptType.CHAT):
+            self.assertEqual(current_priority(), RequestPriority.INTERACTIVE)
+            with priority_context(RequestPriority.BATCH):
+                self.assertEqual(current_priority(), RequestPriority.BATCH)
+
+    def test_throttle_error_classification(self):
+        from google.api_core import exceptions as google_exceptions
+        self.assertTrue(is_throttle_error(google_exceptions.ResourceExhausted("quota")))
+        self.assertTrue(is_throttle_error(google_exceptions.ServiceUnavailable("busy")))
+        self.assertFalse(is_throttle_error(google_exceptions.InvalidArgument("bad")))
+
+    def test_throttle_message_fallback_matches_status_codes_only(self):
+        """Unwrapped errors count as throttling only for a 429/503 status code, not for stray digits."""
+        self.assertTrue(is_throttle_error(Exception("429 Too Many Requests")))
+        self.assertTrue(is_throttle_error(Exception("HTTP 503 Service Unavailable")))
+        self.assertFalse(is_throttle_error(Exception("row 4290 failed")))
+        self.assertFalse(is_throttle_error(ValueError("프롬프트 토큰 503개 초과")))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from api.gemini import determine_prompt_type
+from api.request_context import PromptType, prompt_context, current_prompt_type, submit_in_context
+
+class TestRequestContext(unittest.TestCase):
+
+    def test_default_and_explicit_type(self):
+        """Without a scope the type is remark; an explicit argument wins over the scope."""
+        self.assertEqual(determine_prompt_type(), "remark")
+        with prompt_context("chat"):
+            self.assertEqual(determine_prompt_type(), "chat")
+            self.assertEqual(determine_prompt_type(PromptType.REMARK), "remark")
+        self.assertEqual(current_prompt_type(), PromptType.REMARK)
+
+    def test_scope_propagates_to_thread_pool(self):
+        """Work submitted with submit_in_context sees the submitter's scope."""
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            with prompt_context(PromptType.CHAT):
+                futures = [submit_in_context(executor, determine_prompt_type) for _ in range(4)]
+                plain = executor.submit(determine_prompt_type)
+            self.assertEqual([f.result() for f in futures], ["chat"] * 4)
+            self.assertEqual(plain.result(), "remark")
+
+    def test_decorator_form(self):
+        """prompt_context can decorate a function and restores the outer scope afterwards."""
+        @prompt_context(PromptType.CHAT)
+        def inner():
+            return determine_prompt_type()
+
+        self.assertEqual(inner(), "chat")
+        self.assertEqual(determine_prompt_type(), "remark")
+
+if __name__ == '__main__':
+    unittest.main()
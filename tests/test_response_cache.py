@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from api.response_cache import ResponseCache
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        """Create a cache backed by a temporary SQLite file."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache = ResponseCache(os.path.join(self.tmpdir, "cache.sqlite3"), ttl_seconds=60)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_key_depends_on_model_prompt_and_config(self):
+        """Keys differ when any of model, prompt or generation settings differ."""
+        base = ResponseCache.make_key("gemini-1.5-pro", "prompt", {"temperature": 0.3})
+        self.assertEqual(base, ResponseCache.make_key("gemini-1.5-pro", "prompt", {"temperature": 0.3}))
+        self.assertNotEqual(base, ResponseCache.make_key("gemini-1.5-flash", "prompt", {"temperature": 0.3}))
+        self.assertNotEqual(base, ResponseCache.make_key("gemini-1.5-pro", "prompt2", {"temperature": 0.3}))
+        self.assertNotEqual(base, ResponseCache.make_key("gemini-1.5-pro", "prompt", {"temperature": 0.5}))
+
+    def test_hit_and_miss_counters(self):
+        """A stored response is returned and counted as a hit."""
+        key = ResponseCache.make_key("m", "p")
+        self.assertIsNone(self.cache.get(key))
+        self.cache.set(key, "응답", "m")
+        self.assertEqual(self.cache.get(key), "응답")
+
+        stats = self.cache.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_ttl_expiry(self):
+        """Entries older than the TTL are treated as misses."""
+        self.cache.ttl_seconds = 0.01
+        key = ResponseCache.make_key("m", "p")
+        self.cache.set(key, "old", "m")
+        time.sleep(0.05)
+        self.assertIsNone(self.cache.get(key))
+
+    def test_lru_eviction_by_entry_count(self):
+        """Least recently used entries are evicted first when over the limit."""
+        self.cache.max_entries = 2
+        keys = [ResponseCache.make_key("m", str(i)) for i in range(3)]
+        for key in keys:
+            self.cache.set(key, "value", "m")
+            time.sleep(0.01)
+        self.cache.get(keys[0])  # keys[0]을 최근 사용으로 갱신
+        self.cache.evict()
+
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNotNone(self.cache.get(keys[2]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from logic import executor, result_writer
+from logic.executor import create_engine
+from logic.result_writer import ResultWriter
+
+class TestResultWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.temp_dir.name, "template_result.xlsx")
+        patcher = patch.object(result_writer, "result_output_path", return_value=self.output_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def make_writer(self, **kwargs):
+        df = pd.DataFrame({"clause": ["1.1", "1.2", "1.3"], "remark": [np.nan, np.nan, np.nan]})
+        return df, ResultWriter(df, "remark", "template.xlsx", **kwargs)
+
+    def test_partial_results_flushed_periodically(self):
+        """Completed rows reach the sidecar file every flush_every writes, before the run ends."""
+        _, writer = self.make_writer(flush_every=2, flush_interval=60)
+        writer.write(np.int64(0), "의견 A")
+        self.assertFalse(os.path.exists(writer.partial_path))
+        writer.write(2, "의견 C")
+        with open(writer.partial_path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records, [{"row": 0, "value": "의견 A"}, {"row": 2, "value": "의견 C"}])
+
+    def test_finalize_writes_workbook_and_removes_sidecar(self):
+        """The final workbook holds every result (float-typed empty column included) and the sidecar is removed."""
+        df, writer = self.make_writer(flush_every=1, flush_interval=60)
+        writer.write(1, "의견 B")
+        writer.write(0, "[오류] 실패")
+        path = writer.finalize()
+
+        self.assertEqual(path, self.output_path)
+        self.assertFalse(os.path.exists(writer.partial_path))
+        saved = pd.read_excel(path)
+        self.assertEqual(saved["remark"].tolist()[:2], ["[오류] 실패", "의견 B"])
+        self.assertTrue(pd.isna(saved["remark"][2]))
+        self.assertEqual(df.loc[1, "remark"], "의견 B")
+
+    def test_slow_head_row_does_not_delay_sidecar(self):
+        """Rows finishing after a slow first row reach the sidecar before the first row completes."""
+        _, writer = self.make_writer(flush_every=1, flush_interval=60)
+
+        def sidecar_rows():
+            if not os.path.exists(writer.partial_path):
+                return set()
+            with open(writer.partial_path, encoding="utf-8") as f:
+                return {json.loads(line)["row"] for line in f}
+
+        def work(row):
+            if row != 0:
+                return f"의견 {row}"
+            deadline = time.monotonic() + 2
+            while sidecar_rows() != {1, 2} and time.monotonic() < deadline:
+                time.sleep(0.01)
+            return sorted(sidecar_rows())
+
+        with patch.dict(executor.config, {"execution": {"max_workers": 3}}):
+            create_engine(3).run([0, 1, 2], work, lambda row, result, error: writer.write(row, result))
+        self.assertEqual(writer.values[0], [1, 2])
+
+if __name__ == "__main__":
+    unittest.main()
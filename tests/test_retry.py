@@ -0,0 +1,99 @@
+import asyncio
+import time
+import unittest
+
+from google.api_core import exceptions as google_exceptions
+
+from api.retry import RetryPolicy, classify_error, RETRYABLE, FATAL
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = RetryPolicy(max_retries=3, base_delay=0.001, max_delay=0.01, deadline=5)
+
+    def test_classify_error(self):
+        """Timeouts, 429 and 5xx are retryable; auth and argument errors are fatal."""
+        self.assertEqual(classify_error(google_exceptions.DeadlineExceeded("slow")), RETRYABLE)
+        self.assertEqual(classify_error(google_exceptions.ResourceExhausted("quota")), RETRYABLE)
+        self.assertEqual(classify_error(google_exceptions.InternalServerError("boom")), RETRYABLE)
+        self.assertEqual(classify_error(TimeoutError()), RETRYABLE)
+        self.assertEqual(classify_error(google_exceptions.PermissionDenied("key")), FATAL)
+        self.assertEqual(classify_error(google_exceptions.InvalidArgument("bad")), FATAL)
+
+    def test_message_fallback_matches_status_codes_only(self):
+        """Unwrapped errors are retryable only when the message carries an HTTP 429/5xx status code."""
+        self.assertEqual(classify_error(Exception("503 Service Unavailable")), RETRYABLE)
+        self.assertEqual(classify_error(Exception("HTTP 429 Too Many Requests")), RETRYABLE)
+        self.assertEqual(classify_error(Exception("status code: 502")), RETRYABLE)
+        self.assertEqual(classify_error(ValueError("행 500의 제목이 비어 있습니다")), FATAL)
+        self.assertEqual(classify_error(ValueError("invalid timeout value")), FATAL)
+        self.assertEqual(classify_error(LookupError("카세트에 없는 요청입니다 (키 a5003c429e1b)")), FATAL)
+
+    def test_retries_transient_errors(self):
+        """Retryable errors are retried until the call succeeds."""
+        calls = []
+
+        def flaky(remaining):
+            calls.append(remaining)
+            if len(calls) < 3:
+                raise google_exceptions.ServiceUnavailable("busy")
+            return "ok"
+
+        self.assertEqual(self.policy.call(flaky), "ok")
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(self.policy.get_stats()["retries"], 2)
+
+    def test_fatal_error_is_not_retried(self):
+        calls = []
+
+        def unauthorized(remaining):
+            calls.append(remaining)
+            raise google_exceptions.Unauthenticated("bad key")
+
+        with self.assertRaises(google_exceptions.Unauthenticated):
+            self.policy.call(unauthorized)
+        self.assertEqual(len(calls), 1)
+
+    def test_gives_up_after_max_retries(self):
+        calls = []
+
+        def always_busy(remaining):
+            calls.append(remaining)
+            raise google_exceptions.ResourceExhausted("quota")
+
+        with self.assertRaises(google_exceptions.ResourceExhausted):
+            self.policy.call(always_busy)
+        self.assertEqual(len(calls), 4)
+
+    def test_slot_wait_is_excluded_from_deadline(self):
+        """Time spent waiting for a limiter slot does not shrink the request deadline; slot timeouts are not retried."""
+        policy = RetryPolicy(max_retries=3, base_delay=0.001, max_delay=0.01, deadline=0.2)
+        calls = []
+        self.assertEqual(policy.call(lambda remaining: calls.append(remaining) or "ok",
+                                     acquire=lambda: time.sleep(0.3)), "ok")
+        self.assertGreater(calls[0], 0.15)
+
+        waits = []
+
+        def queue_timeout():
+            waits.append(1)
+            raise TimeoutError("요청 제한기 대기 시간 초과")
+
+        with self.assertRaises(TimeoutError):
+            policy.call(lambda remaining: "ok", acquire=queue_timeout)
+        self.assertEqual(len(waits), 1)
+
+    def test_async_call(self):
+        attempts = []
+
+        async def flaky(remaining):
+            attempts.append(remaining)
+            if len(attempts) < 2:
+                raise google_exceptions.DeadlineExceeded("slow")
+            return "ok"
+
+        self.assertEqual(asyncio.run(self.policy.call_async(flaky)), "ok")
+        self.assertEqual(len(attempts), 2)
+
+if __name__ == '__main__':
+    unittest.main()
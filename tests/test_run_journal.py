@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from api import gemini
+from logic import run_journal
+from logic.run_journal import GENERATOR_REMARKS, RunJournal, load_journal
+
+def make_item(ref, row_input="항목: 1", model="gemini-1.5-flash"):
+    return {"ref": ref, "row_input": row_input, "model": model}
+
+class TestRunJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        settings = {"enabled": True, "directory": self.temp_dir.name, "fsync_every": 2, "fsync_interval": 60}
+        self.patcher = patch.object(run_journal, "get_journal_settings", return_value=settings)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.temp_dir.cleanup()
+
+    def start(self, run_id=None):
+        return RunJournal.start(run_id, GENERATOR_REMARKS, {"base_path": "a.xlsx"}, ["검토"], "IEC_62304")
+
+    def test_resume_replays_matching_items(self):
+        """Journaled replies are reused on resume; unfinished items stay pending."""
+        journal = self.start()
+        items = [make_item((np.int64(0), np.int64(3))), make_item((1, 4)), make_item((2, 5))]
+        pending, replayed = journal.split(items)
+        self.assertEqual((len(pending), replayed), (3, []))
+        journal.record(items[0]["ref"], "의견 A")
+        journal.record(items[1]["ref"], "의견 B")
+        journal.close()
+
+        header, completed = load_journal(journal.run_id)
+        self.assertEqual(header["params"], {"base_path": "a.xlsx"})
+        self.assertEqual(set(completed), {(0, 3), (1, 4)})
+
+        resumed = self.start(journal.run_id)
+        pending, replayed = resumed.split(items)
+        resumed.close()
+        self.assertEqual([item["ref"] for item in pending], [(2, 5)])
+        self.assertEqual([reply for _, reply in replayed], ["의견 A", "의견 B"])
+
+    def test_changed_input_is_regenerated(self):
+        """An item whose prompt hash changed since it was journaled is processed again."""
+        journal = self.start()
+        journal.split([make_item(7)])
+        journal.record(7, "이전 의견")
+        journal.close()
+
+        resumed = self.start(journal.run_id)
+        pending, replayed = resumed.split([make_item(7, row_input="항목: 1 (수정됨)")])
+        resumed.close()
+        self.assertEqual((len(pending), replayed), (1, []))
+
+    def test_truncated_last_line_is_ignored(self):
+        """A partially written final record (crash mid-write) does not break loading."""
+        journal = self.start()
+        journal.split([make_item(1)])
+        journal.record(1, "의견")
+        journal.close()
+        with open(journal.path, "a", encoding="utf-8") as f:
+            f.write('{"type": "row", "ref": [2], "prom')
+
+        _, completed = load_journal(journal.run_id)
+        self.assertEqual(list(completed), [(1,)])
+
+    def test_error_replies_are_not_journaled(self):
+        """An error reply is never recorded as a completed row."""
+        journal = self.start()
+        journal.split([make_item(1)])
+        journal.record(1, "오류가 발생했습니다: 시간 초과")
+        journal.close()
+        _, completed = load_journal(journal.run_id)
+        self.assertEqual(completed, {})
+
+    def test_empty_reply_is_requested_again_on_resume(self):
+        """An empty-response placeholder is not journaled (or reused from an older journal); the row is re-requested."""
+        journal = self.start()
+        items = [make_item(1), make_item(2)]
+        journal.split(items)
+        journal.record(1, gemini.EMPTY_RESPONSE_MESSAGE)
+        # 이전 버전이 기록한 빈 응답 항목
+        journal._append({"type": "row", "ref": [2], "prompt_hash": journal._hashes[(2,)],
+                         "reply": gemini.EMPTY_RESPONSE_MESSAGE})
+        journal.close()
+
+        resumed = self.start(journal.run_id)
+        pending, replayed = resumed.split(items)
+        resumed.close()
+        self.assertEqual(([item["ref"] for item in pending], replayed), ([1, 2], []))
+
+    def test_close_unregisters_exit_handler(self):
+        """Closing a journal drops its atexit registration so repeated runs do not accumulate handlers."""
+        with patch.object(run_journal, "atexit") as atexit_module:
+            journal = self.start()
+            journal.close()
+        atexit_module.register.assert_called_once_with(journal.close)
+        atexit_module.unregister.assert_called_once_with(journal.close)
+
+    def test_generator_call_path_raises_failures(self):
+        """With raise_errors the prompt helpers raise instead of returning an error string to be journaled."""
+        with patch.object(gemini, "call_gemini", side_effect=ValueError("요청 제한기 대기 시간 초과")):
+            self.assertTrue(gemini.call_gemini_with_prompts("항목", []).startswith("오류가 발생했습니다"))
+            with self.assertRaises(ValueError):
+                gemini.call_gemini_with_prompts("항목", [], raise_errors=True)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from api.prompt_compiler import CompiledPromptSet
+from logic import run_manifest
+from logic.run_journal import prompt_set_key
+from logic.run_manifest import RunManifest, manifest_key
+
+def make_item(ref, row_input, model="gemini-1.5-flash"):
+    return {"ref": ref, "row_input": row_input, "model": model}
+
+class TestRunManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        settings = {"enabled": True, "directory": self.temp_dir.name}
+        self.patcher = patch.object(run_manifest, "get_manifest_settings", return_value=settings)
+        self.patcher.start()
+        self.key = manifest_key("remarks", "base.xlsx", "review.xlsx", "remark")
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.temp_dir.cleanup()
+
+    def run_once(self, items, replies, prompts=("검토",)):
+        manifest = RunManifest.load(self.key, prompt_set_key(prompts), "IEC_62304")
+        changed, unchanged = manifest.split(items)
+        for item in changed:
+            if item["ref"] in replies:
+                manifest.add(item["ref"], replies[item["ref"]])
+        for item, reply in unchanged:
+            manifest.add(item["ref"], reply)
+        manifest.save()
+        return changed, unchanged
+
+    def test_only_changed_and_new_rows_regenerate(self):
+        """Unchanged rows carry over even if their position moved; edited and new rows are regenerated."""
+        first = [make_item(0, "항목 A"), make_item(1, "항목 B"), make_item(2, "항목 C")]
+        self.run_once(first, {0: "의견 A", 1: "의견 B", 2: "의견 C"})
+
+        second = [make_item(0, "항목 B"), make_item(1, "항목 C (수정)"), make_item(2, "항목 A"), make_item(3, "항목 D")]
+        changed, unchanged = self.run_once(second, {1: "의견 C2", 3: "의견 D"})
+        self.assertEqual([item["ref"] for item in changed], [1, 3])
+        self.assertEqual([(item["ref"], reply) for item, reply in unchanged], [(0, "의견 B"), (2, "의견 A")])
+
+    def test_prompt_change_invalidates_manifest(self):
+        """Changing the selected prompts changes every row hash."""
+        items = [make_item(0, "항목 A")]
+        self.run_once(items, {0: "의견 A"})
+        changed, unchanged = self.run_once(items, {}, prompts=("검토", "요약"))
+        self.assertEqual((len(changed), unchanged), (1, []))
+
+    def test_prompt_template_edit_invalidates_manifest(self):
+        """Editing a prompt file's contents (same prompt name) changes every row hash."""
+        items = [make_item(0, "항목 A")]
+        self.run_once(items, {0: "의견 A"}, prompts=CompiledPromptSet(["검토"], "remark", "지침 v1: {context}"))
+        changed, _ = self.run_once(items, {}, prompts=CompiledPromptSet(["검토"], "remark", "지침 v2: {context}"))
+        self.assertEqual(len(changed), 1)
+
+    def test_error_replies_are_not_reused(self):
+        """Error replies are never stored, so the row is regenerated on the next incremental run."""
+        items = [make_item(0, "항목 A"), make_item(1, "항목 B")]
+        self.run_once(items, {0: "오류가 발생했습니다: 요청 제한기 대기 시간 초과", 1: "[오류] 실패"})
+        changed, unchanged = self.run_once(items, {})
+        self.assertEqual(([item["ref"] for item in changed], unchanged), ([0, 1], []))
+
+    def test_failed_rows_keep_previous_reply(self):
+        """A row that was not regenerated this run keeps its last manifest entry."""
+        items = [make_item(0, "항목 A"), make_item(1, "항목 B")]
+        self.run_once(items, {0: "의견 A"})
+        changed, _ = self.run_once(items, {})
+        self.assertEqual([item["ref"] for item in changed], [1])
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, f"{self.key}.json")))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from api import gemini
+from api.single_flight import SingleFlight
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_identical_concurrent_calls_coalesce(self):
+        """Concurrent calls with the same key run the function once."""
+        flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+
+        def work():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return "결과"
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            leader = executor.submit(flight.do, "k", work)
+            started.wait(1)
+            followers = [executor.submit(flight.do, "k", work) for _ in range(4)]
+            results = [leader.result()] + [f.result() for f in followers]
+
+        self.assertEqual(results, ["결과"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.get_stats()["coalesced"], 4)
+        self.assertEqual(flight.get_stats()["in_flight"], 0)
+
+    def test_errors_propagate_to_waiters_and_key_is_released(self):
+        """Waiters receive the leader's exception and the next call runs again."""
+        flight = SingleFlight()
+        with self.assertRaises(ValueError):
+            flight.do("k", lambda: (_ for _ in ()).throw(ValueError("실패")))
+        self.assertEqual(flight.do("k", lambda: "재시도"), "재시도")
+
+    def test_async_calls_coalesce(self):
+        """Tasks in one event loop share a single in-flight call."""
+        flight = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "비동기"
+
+        async def main():
+            return await asyncio.gather(*(flight.do_async("k", work) for _ in range(3)))
+
+        self.assertEqual(asyncio.run(main()), ["비동기"] * 3)
+        self.assertEqual(len(calls), 1)
+
+    def test_api_report_counts_only_this_run(self):
+        """The run report shows coalesced requests since the run's snapshot, not the process-wide total."""
+        flight = SingleFlight()
+        flight._stats["coalesced"] = 7  # 이전 실행에서 병합된 요청
+        with patch.object(gemini, "_single_flight", flight):
+            before = gemini.snapshot_api_stats()
+            flight._stats["coalesced"] += 2
+            self.assertIn("중복 요청 병합 2회", gemini.format_api_report(before))
+            self.assertIn("중복 요청 병합 9회", gemini.format_api_report())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from types import SimpleNamespace
+
+from api.token_accounting import (TokenBudgetExceeded, estimate_tokens, token_ledger, reserve_tokens,
+                                  release_tokens, record_usage)
+
+class TestTokenAccounting(unittest.TestCase):
+
+    def test_estimator_handles_korean(self):
+        """Korean text is not collapsed into a handful of whitespace-separated words."""
+        korean = "보호 접지 회로의 연속성을 확인해야 합니다"
+        self.assertGreater(estimate_tokens(korean), len(korean.split()) * 2)
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertLess(estimate_tokens("protective bonding circuit"), 10)
+
+    def test_usage_metadata_preferred(self):
+        """Usage metadata on the response is recorded instead of the estimate."""
+        response = SimpleNamespace(usage_metadata=SimpleNamespace(prompt_token_count=120, candidates_token_count=30))
+        with token_ledger() as ledger:
+            self.assertEqual(record_usage("프롬프트", "응답", response), (120, 30))
+            record_usage("프롬프트", "응답")
+        self.assertEqual(ledger.calls, 2)
+        self.assertEqual(ledger.measured_calls, 1)
+        self.assertGreaterEqual(ledger.input_tokens, 120)
+
+    def test_input_budget_enforced_with_reservations(self):
+        """In-flight reservations count toward the input budget and are released on failure."""
+        with token_ledger(max_input_tokens=100) as ledger:
+            reserve_tokens(60)
+            with self.assertRaises(TokenBudgetExceeded):
+                reserve_tokens(60)
+            release_tokens(60)
+            reserve_tokens(60)
+            record_usage("x", "y", estimated_input=60)
+        self.assertEqual(ledger.calls, 1)
+
+    def test_output_budget_blocks_next_request(self):
+        """Once the output budget is used up, further requests fail fast."""
+        response = SimpleNamespace(usage_metadata=SimpleNamespace(prompt_token_count=10, candidates_token_count=50))
+        with token_ledger(max_output_tokens=50):
+            reserve_tokens(10)
+            record_usage("x", "y", response, estimated_input=10)
+            with self.assertRaises(TokenBudgetExceeded):
+                reserve_tokens(10)
+
+    def test_nested_ledgers_both_record(self):
+        """An inner scope records into the outer run ledger as well."""
+        with token_ledger() as outer:
+            with token_ledger() as inner:
+                record_usage("텍스트", "응답")
+        self.assertEqual((outer.calls, inner.calls), (1, 1))
+
+if __name__ == '__main__':
+    unittest.main()
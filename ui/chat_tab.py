@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import os
+import queue
 import threading
 from functools import partial
 
@@ -12,9 +13,14 @@ from ui.ui_utils import (
 )
 
 # API 및 채팅 컨텍스트 모듈
-from api.gemini import call_gemini_with_prompts
+from api.gemini import call_gemini_with_prompts, stream_gemini_with_prompts
+from api.request_context import PromptType, prompt_context
 from utils import chat_context
 
+# 스트리밍 응답을 화면에 반영하는 주기 (ms)
+STREAM_FLUSH_INTERVAL_MS = 50
+_STREAM_END = object()
+
 def create_chat_tab(parent):
     """채팅 탭 구성"""
     # 메인 프레임
@@ -298,57 +304,102 @@ def handle_chat_input(entry_box, chat_display):
         daemon=True
     ).start()
 
+@prompt_context(PromptType.CHAT)
 def generate_ai_response(user_input, chat_display):
-    """백그라운드에서 AI 응답 생성"""
+    """백그라운드에서 AI 응답 생성 (스트리밍 조각을 큐에 넣고 UI 스레드가 주기적으로 반영)"""
+    from ui.gui_main import get_root
+    root = get_root()
+    
+    # UI 루프가 없으면 전체 응답을 받아 한 번에 표시
+    if not root:
+        try:
+            response = call_gemini_with_prompts(user_input, [])
+            if not response or not response.strip():
+                response = "죄송합니다, 응답을 생성할 수 없었습니다. 다시 시도해주세요."
+        except Exception as e:
+            response = f"오류: 응답 생성 중 오류가 발생했습니다: {str(e)}"
+            log_message(response, "error")
+        update_chat_display(chat_display, response)
+        return
+    
+    chunk_queue = queue.Queue()
+    root.after(0, partial(poll_stream_queue, root, chat_display, chunk_queue, {"started": False}))
+    
     try:
-        # API 호출
-        response = call_gemini_with_prompts(user_input, [])
-        
-        # 응답이 없는 경우 처리
-        if not response or not response.strip():
-            response = "죄송합니다, 응답을 생성할 수 없었습니다. 다시 시도해주세요."
-        
-        # 현재 스레드가 메인 스레드가 아닌 경우, 메인 스레드에서 UI 업데이트
-        if threading.current_thread() != threading.main_thread():
-            # 구현 방식에 따라 다름 - tkinter는 thread safe하지 않음
-            from ui.gui_main import get_root
-            root = get_root()
-            if root:
-                root.after(0, partial(update_chat_display, chat_display, response))
-            else:
-                update_chat_display(chat_display, response)
-        else:
-            update_chat_display(chat_display, response)
-            
+        for chunk in stream_gemini_with_prompts(user_input, []):
+            chunk_queue.put(chunk)
     except Exception as e:
         error_message = f"응답 생성 중 오류가 발생했습니다: {str(e)}"
         log_message(error_message, "error")
-        
-        # UI 업데이트
-        from ui.gui_main import get_root
-        root = get_root()
-        if root:
-            root.after(0, partial(update_chat_display, chat_display, f"오류: {error_message}"))
-        else:
-            update_chat_display(chat_display, f"오류: {error_message}")
+        chunk_queue.put(Exception(error_message))
+    finally:
+        chunk_queue.put(_STREAM_END)
+
+def poll_stream_queue(root, chat_display, chunk_queue, state):
+    """
+    UI 스레드에서 STREAM_FLUSH_INTERVAL_MS마다 큐에 쌓인 조각을 모아 채팅 화면에 추가
+    
+    Args:
+        state: {"started": bool} - 첫 조각을 이미 표시했는지 여부
+    """
+    pieces = []
+    finished = False
+    error = None
+    while True:
+        try:
+            item = chunk_queue.get_nowait()
+        except queue.Empty:
+            break
+        if item is _STREAM_END:
+            finished = True
+            break
+        if isinstance(item, Exception):
+            error = item
+            continue
+        pieces.append(item)
+    
+    text = "".join(pieces)
+    if error is not None:
+        if state["started"]:
+            update_chat_display(chat_display, text, append=True, final=True)
+        update_chat_display(chat_display, f"오류: {error}")
+        return
+    
+    if text or finished:
+        if not state["started"] and finished and not text:
+            text = "죄송합니다, 응답을 생성할 수 없었습니다. 다시 시도해주세요."
+        update_chat_display(chat_display, text, append=state["started"], final=finished)
+        state["started"] = True
+    
+    if not finished:
+        root.after(STREAM_FLUSH_INTERVAL_MS, partial(poll_stream_queue, root, chat_display, chunk_queue, state))
 
-def update_chat_display(chat_display, response):
-    """채팅 화면에 응답 업데이트"""
+def update_chat_display(chat_display, response, append=False, final=True):
+    """
+    채팅 화면에 응답 업데이트
+    
+    Args:
+        response: 표시할 응답 (스트리밍 시 이번에 도착한 조각들)
+        append: True이면 진행 중인 응답 뒤에 이어 붙임
+        final: True이면 응답을 마무리 (빈 줄 추가)
+    """
     if not chat_display:
         return
         
-    # 임시 '응답 생성 중...' 메시지 제거
     chat_display.config(state=tk.NORMAL)
     
-    # 마지막 줄이 시스템 메시지인 경우 삭제
-    last_line_start = chat_display.index("end-2l linestart")
-    last_line = chat_display.get(last_line_start, "end-1c")
-    
-    if "응답 생성 중..." in last_line:
-        chat_display.delete(last_line_start, "end-1c")
+    if not append:
+        # 임시 '응답 생성 중...' 메시지 제거 (마지막 줄이 시스템 메시지인 경우 삭제)
+        last_line_start = chat_display.index("end-2l linestart")
+        last_line = chat_display.get(last_line_start, "end-1c")
+        
+        if "응답 생성 중..." in last_line:
+            chat_display.delete(last_line_start, "end-1c")
+        
+        chat_display.insert(tk.END, "🤖 AI: ", "assistant")
     
     # 응답 추가
-    chat_display.insert(tk.END, f"🤖 AI: {response}\n\n", "assistant")
+    chat_display.insert(tk.END, response + ("\n\n" if final else ""), "assistant")
     chat_display.see(tk.END)
     chat_display.config(state=tk.DISABLED)
 
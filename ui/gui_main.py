@@ -7,7 +7,7 @@ import traceback
 # UI 유틸리티 임포트 (순환 참조 피하기)
 from ui.ui_utils import (
     set_root, set_log_box, log_message, show_api_key_dialog, update_all_prompt_statuses, update_api_status,
-    PRIMARY_COLOR, SECONDARY_COLOR, BG_COLOR, CARD_COLOR, TEXT_COLOR, 
+    on_api_health_changed, poll_api_status_queue, PRIMARY_COLOR, SECONDARY_COLOR, BG_COLOR, CARD_COLOR, TEXT_COLOR, 
     BORDER_COLOR, HOVER_COLOR
 )
 
@@ -266,6 +266,13 @@ def create_main_window(app_context=None):
         if app_context:
             log_message("App context is provided.", "debug")
             app_context.set_ui_root(root)
+            # API 상태 모니터 시작 (실제 요청을 집계하고 유휴 시에만 프로브, 헤더는 이벤트로 갱신)
+            from api.health import HEALTH_EVENT, start_health_monitor
+            app_context.add_event_listener(HEALTH_EVENT, on_api_health_changed)
+            start_health_monitor()
+            # 상태 이벤트는 작업 스레드에서 오므로 UI 스레드가 큐를 주기적으로 확인해 반영
+            set_root(root)
+            root.after(0, poll_api_status_queue)
         else:
             log_message("App context is missing.", "warning")
 
@@ -3,6 +3,7 @@ from tkinter import ttk, messagebox, scrolledtext
 import os
 import json
 from datetime import datetime
+from utils.prompt_loader import get_prompt_registry
 from ui.ui_utils import log_message, select_prompt_tab, update_all_prompt_statuses, show_prompt_preview
 
 # UI 테마 및 색상 가져오기
@@ -409,6 +410,7 @@ def move_prompt_in_list_to_position(start_idx, end_idx):
                 
                 with open(filepath, "w", encoding="utf-8") as f:
                     json.dump(data, f, ensure_ascii=False, indent=2)
+                get_prompt_registry().update_file(filename, data)
                     
             except Exception as e:
                 print(f"우선순위 업데이트 중 오류: {e}")
@@ -555,6 +557,7 @@ def save_prompt(name, types, content, priority, status_label, last_saved_label):
         filepath = os.path.join("prompts", f"{name}.json")
         with open(filepath, "w", encoding="utf-8") as f:
             json.dump(prompt_data, f, ensure_ascii=False, indent=2)
+        get_prompt_registry().update_file(f"{name}.json", prompt_data)
 
         # 상태 업데이트
         if status_label:
@@ -727,6 +730,7 @@ def delete_prompt():
         filepath = os.path.join("prompts", f"{name}.json")
         if os.path.exists(filepath):
             os.remove(filepath)
+            get_prompt_registry().remove_file(f"{name}.json")
             messagebox.showinfo("삭제 완료", f"프롬프트 '{name}'이(가) 삭제되었습니다.")
             
             # 목록 새로고침
@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import os
+import queue
 import sys
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
@@ -37,6 +38,10 @@ AI_STATUS_COLORS = {
 root = None
 log_box = None
 
+# 작업 스레드에서 받은 API 상태 이벤트 (UI 스레드가 주기적으로 꺼내 헤더에 반영)
+_api_status_queue = queue.Queue()
+API_STATUS_POLL_INTERVAL_MS = 500
+
 # 타입 변수 정의
 TkRoot = TypeVar('TkRoot', bound=tk.Tk)
 TkWidget = TypeVar('TkWidget', bound=tk.Widget)
@@ -405,8 +410,51 @@ def show_api_key_dialog():
     info_text.bind("<Button-1>", open_api_link)
     info_text.config(cursor="hand2")
 
-def update_api_status():
-    """헤더의 API 상태 표시 업데이트"""
+def format_api_status_text(snapshot=None):
+    """헤더에 표시할 API 상태 문자열 (상태 모니터 스냅숏 기반)"""
+    if snapshot is None:
+        from api.health import get_health_monitor
+        snapshot = get_health_monitor().snapshot()
+
+    status = snapshot["status"]
+    if status == "no_key":
+        return "API 연결 안됨 ⚠️"
+    if status == "unknown":
+        # 아직 요청 결과가 없으면 연결 여부를 단정하지 않음
+        return "API 상태 확인 중"
+    if status == "down":
+        return "API 연결 오류 ⚠️"
+    text = "API 연결됨 ✓" if status == "healthy" else "API 지연 ⚠️"
+    if snapshot.get("p50") is not None:
+        text += f" (p50 {snapshot['p50']:.1f}s / p95 {snapshot['p95']:.1f}s)"
+    return text
+
+def on_api_health_changed(snapshot):
+    """API 상태 이벤트 리스너 (작업 스레드에서 호출되므로 Tk를 직접 호출하지 않고 큐에만 넣음)"""
+    _api_status_queue.put(snapshot)
+
+def poll_api_status_queue():
+    """UI 스레드에서 API_STATUS_POLL_INTERVAL_MS마다 쌓인 API 상태 이벤트를 꺼내 헤더에 반영"""
+    global root
+    if not root:
+        return
+
+    latest = None
+    while True:
+        try:
+            latest = _api_status_queue.get_nowait()
+        except queue.Empty:
+            break
+    if latest is not None:
+        update_api_status(latest)
+
+    try:
+        root.after(API_STATUS_POLL_INTERVAL_MS, poll_api_status_queue)
+    except tk.TclError:
+        pass  # 창이 닫힌 경우
+
+def update_api_status(snapshot=None):
+    """헤더의 API 상태 표시 업데이트 (snapshot이 없으면 상태 모니터에서 새로 읽음)"""
     global root
     
     if not root:
@@ -423,9 +471,8 @@ def update_api_status():
                     if isinstance(child, tk.Frame):
                         for api_widget in child.winfo_children():
                             if isinstance(api_widget, tk.Label) and "API" in api_widget.cget("text"):
-                                # API 상태 업데이트
-                                api_status_text = "API 연결됨 ✓" if os.environ.get("GEMINI_API_KEY") else "API 연결 안됨 ⚠️"
-                                api_widget.config(text=api_status_text)
+                                # API 상태 업데이트 (상태 모니터의 캐시된 값, 왕복 요청 없음)
+                                api_widget.config(text=format_api_status_text(snapshot))
                                 break
     except Exception as e:
         print(f"API 상태 업데이트 중 오류: {e}")
@@ -55,31 +55,36 @@ def safe_function(func):
             return None
     return wrapper
 
-def save_result_file(df, original_path=None):
-    """결과 파일 저장 - generator와 extended_generator에서 중복 사용되던 함수 통합"""
+def result_output_path(original_path=None):
+    """결과 파일 경로 (output/<원본 이름>_result_<시각>.xlsx, 원본 경로가 없으면 output/result_<시각>.xlsx)"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    
+    # 원본 경로가 없는 경우 기본 파일명 사용
+    if not original_path:
+        return os.path.join("output", f"result_{timestamp}.xlsx")
+    
+    # 파일명과 확장자 추출
+    filename = os.path.basename(original_path)
+    name, ext = os.path.splitext(filename)
+    
+    # 파일 형식에 맞게 저장 (엑셀이 아니면 기본적으로 엑셀로 저장)
+    if ext.lower() in ['.xlsx', '.xls']:
+        return os.path.join("output", f"{name}_result_{timestamp}{ext}")
+    return os.path.join("output", f"{name}_result_{timestamp}.xlsx")
+
+def save_result_file(df, original_path=None, output_path=None):
+    """
+    결과 파일 저장 - generator와 extended_generator에서 중복 사용되던 함수 통합
+    
+    Args:
+        df: 저장할 데이터프레임
+        original_path: 원본 파일 경로 (결과 파일 이름에 사용)
+        output_path: 저장할 경로 (None이면 result_output_path(original_path))
+    """
     try:
         os.makedirs("output", exist_ok=True)
-        
-        # 원본 경로가 없는 경우 기본 파일명 사용
-        if not original_path:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_path = os.path.join("output", f"result_{timestamp}.xlsx")
-            df.to_excel(output_path, index=False)
-            return output_path
-        
-        # 파일명과 확장자 추출
-        filename = os.path.basename(original_path)
-        name, ext = os.path.splitext(filename)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # 파일 형식에 맞게 저장
-        if ext.lower() in ['.xlsx', '.xls']:
-            output_path = os.path.join("output", f"{name}_result_{timestamp}{ext}")
-            df.to_excel(output_path, index=False)
-        else:
-            # 기본적으로 엑셀로 저장
-            output_path = os.path.join("output", f"{name}_result_{timestamp}.xlsx")
-            df.to_excel(output_path, index=False)
+        output_path = output_path or result_output_path(original_path)
+        df.to_excel(output_path, index=False)
         
         logger.info(f"결과 파일 저장 완료: {output_path}")
         return output_path
@@ -5,8 +5,111 @@ import os
 DEFAULT_CONFIG = {
     "api": {
         "timeout": 30,
+        "queue_timeout": 600,
         "max_retries": 3,
-        "parallel_requests": 5
+        "retry_base_delay": 1.0,
+        "retry_max_delay": 20.0,
+        "parallel_requests": 5,
+        "max_parallel_requests": 50,
+        "requests_per_minute": 360,
+        "tokens_per_minute": 4000000,
+        "async_concurrency": 100,
+        "interactive_reserved_concurrency": 1,
+        "lane_weights": {"interactive": 4, "batch": 1}
+    },
+    "llm": {
+        "backend": "gemini",
+        "local": {
+            "seed": 0,
+            "latency_distribution": "lognormal",
+            "latency_median": 0.8,
+            "latency_sigma": 0.4,
+            "latency_min": 0.05,
+            "latency_max": 10.0,
+            "rate_limit_error_rate": 0.0,
+            "server_error_rate": 0.0,
+            "responses_path": "",
+            "output_chars": 200
+        },
+        "cassette": {
+            "mode": "",
+            "path": os.path.join("data", "cassettes", "gemini.jsonl.gz"),
+            "replay_latency": False
+        }
+    },
+    "cache": {
+        "enabled": True,
+        "path": os.path.join("data", "response_cache.sqlite3"),
+        "ttl_seconds": 7 * 24 * 3600,
+        "max_entries": 20000,
+        "max_size_mb": 200
+    },
+    "execution": {
+        "max_workers": 0,
+        "ordered_write_back": False
+    },
+    "output": {
+        "flush_every": 50,
+        "flush_interval_seconds": 5.0,
+        "keep_partial": False,
+        "patch_template": True
+    },
+    "manifest": {
+        "enabled": True,
+        "directory": os.path.join("data", "manifests")
+    },
+    "journal": {
+        "enabled": True,
+        "directory": os.path.join("data", "runs"),
+        "fsync_every": 20,
+        "fsync_interval_seconds": 2.0
+    },
+    "routing": {
+        "enabled": True,
+        "fast_model": "gemini-1.5-flash",
+        "heavy_model": "gemini-1.5-pro",
+        "complexity_threshold": 2.0,
+        "chars_per_point": 400,
+        "requirement_min_chars": 60,
+        "simple_column_count": 4
+    },
+    "generation_profiles": {
+        "remark-short": {"max_output_tokens": 512},
+        "remark-batch-json": {"response_mime_type": "application/json"},
+        "chat": {},
+        "matching-json": {"temperature": 0.0, "max_output_tokens": 4096, "response_mime_type": "application/json"},
+        "analyzer-json": {"temperature": 0.0, "max_output_tokens": 1024, "response_mime_type": "application/json"}
+    },
+    "token_budget": {
+        "max_input_tokens": 0,
+        "max_output_tokens": 0,
+        "output_tokens_per_item": 400
+    },
+    "circuit_breaker": {
+        "enabled": True,
+        "failure_rate_threshold": 0.5,
+        "window_size": 20,
+        "min_calls": 5,
+        "open_seconds": 30,
+        "half_open_max_calls": 1,
+        "max_pause_seconds": 300
+    },
+    "hedging": {
+        "enabled": False,
+        "percentile": 0.95,
+        "max_extra_ratio": 0.05,
+        "min_samples": 20,
+        "min_delay_seconds": 1.0,
+        "window_size": 500
+    },
+    "health": {
+        "ttl_seconds": 60,
+        "window_size": 200,
+        "window_seconds": 300,
+        "slow_latency_seconds": 15,
+        "check_interval_seconds": 5,
+        "probe_model": "gemini-1.5-flash",
+        "background_probe": True
     },
     "ui": {
         "theme": "light",
@@ -0,0 +1,105 @@
+"""
+엑셀 템플릿 셀 패치 모듈
+템플릿 통합 문서를 openpyxl로 한 번 열어 출력 열의 셀만 결과 값으로 바꾼 뒤 새 파일로 저장합니다.
+데이터프레임 전체를 다시 쓰지 않으므로 다른 시트, 서식, 병합 셀, 수식이 그대로 유지됩니다.
+
+pandas.read_excel(header=0)은 시트의 A1부터 읽으므로, 데이터프레임의 행 위치 p와 열 위치 k는
+시트의 (p + 2)행, (k + 1)열에 해당합니다. 첫 행의 머리글이 데이터프레임 열과 다르면 패치하지 않습니다.
+"""
+import os
+
+from openpyxl import load_workbook
+from openpyxl.cell.cell import MergedCell
+
+# 셀 패치를 지원하는 템플릿 확장자 (.xls는 openpyxl로 열 수 없고, .xlsm은 매크로 보존이 필요)
+PATCHABLE_EXTENSIONS = (".xlsx",)
+
+HEADER_ROW = 1
+
+
+class TemplatePatchError(ValueError):
+    """템플릿 구조가 데이터프레임과 달라 셀 단위로 패치할 수 없는 경우"""
+
+
+def can_patch(template_path):
+    """셀 패치를 지원하는 템플릿인지 확인"""
+    return bool(template_path) and os.path.splitext(template_path)[1].lower() in PATCHABLE_EXTENSIONS
+
+
+def _header_matches(header, column):
+    """머리글 셀 값이 pandas 열 이름과 같은지 확인 (중복 열 이름의 '.1' 접미사 허용)"""
+    if header is None or str(header).strip() == "":
+        return str(column).startswith("Unnamed: ")
+    text = str(header)
+    column = str(column)
+    return column == text or column.strip() == text.strip() or (
+        column.startswith(text + ".") and column[len(text) + 1:].isdigit())
+
+
+def _get_sheet(workbook, sheet_name):
+    if isinstance(sheet_name, int):
+        if sheet_name >= len(workbook.worksheets):
+            raise TemplatePatchError(f"시트 번호가 범위를 벗어났습니다: {sheet_name}")
+        return workbook.worksheets[sheet_name]
+    if sheet_name not in workbook.sheetnames:
+        raise TemplatePatchError(f"템플릿에 시트가 없습니다: {sheet_name}")
+    return workbook[sheet_name]
+
+
+def patch_template_cells(template_path, sheet_name, columns, output_col, updates, output_path):
+    """
+    템플릿의 출력 열 셀만 바꿔 새 파일로 저장
+
+    Args:
+        template_path: 템플릿 파일 경로 (.xlsx)
+        sheet_name: 시트 이름 또는 번호 (pandas.read_excel의 sheet_name과 같음)
+        columns: 데이터프레임의 열 목록 (pandas로 읽은 템플릿 열 뒤에 추가된 열은 기록하지 않음)
+        output_col: 결과를 기록할 열 이름
+        updates: {데이터프레임 행 위치(0부터): 값}
+        output_path: 저장할 경로
+
+    Returns:
+        패치한 셀 수
+
+    Raises:
+        TemplatePatchError: 머리글이 다르거나 병합 셀의 일부라 기록할 수 없는 경우
+    """
+    columns = list(columns)
+    if output_col not in columns:
+        raise TemplatePatchError(f"출력 열이 데이터프레임에 없습니다: {output_col}")
+
+    workbook = load_workbook(template_path)
+    sheet = _get_sheet(workbook, sheet_name)
+
+    # 머리글 확인 (머리글이 빈 칸에서 끝나는 뒤쪽 열은 생성 중 데이터프레임에 추가된 열)
+    template_width = len(columns)
+    for idx, column in enumerate(columns, start=1):
+        header = sheet.cell(row=HEADER_ROW, column=idx).value
+        if _header_matches(header, column):
+            continue
+        if header is None or str(header).strip() == "":
+            template_width = idx - 1
+            break
+        raise TemplatePatchError(f"{idx}열 머리글({header!r})이 데이터프레임 열({column!r})과 다릅니다")
+    for idx in range(template_width + 1, len(columns) + 1):
+        if str(sheet.cell(row=HEADER_ROW, column=idx).value or "").strip():
+            raise TemplatePatchError(f"{idx}열 머리글이 데이터프레임 열과 다릅니다")
+
+    # 출력 열이 템플릿에 없으면 템플릿 마지막 열 다음에 머리글과 함께 기록
+    if output_col in columns[:template_width]:
+        col_idx = columns.index(output_col) + 1
+    else:
+        col_idx = template_width + 1
+        sheet.cell(row=HEADER_ROW, column=col_idx).value = output_col
+
+    for position, value in updates.items():
+        cell = sheet.cell(row=position + HEADER_ROW + 1, column=col_idx)
+        if isinstance(cell, MergedCell):
+            raise TemplatePatchError(f"병합된 셀에는 기록할 수 없습니다: {cell.coordinate}")
+        cell.value = value
+        if isinstance(value, str) and value.startswith("="):
+            cell.data_type = "s"  # '='로 시작하는 검토 의견이 수식으로 저장되지 않게 함
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    workbook.save(output_path)
+    return len(updates)
@@ -5,14 +5,145 @@ import threading
 import time
 from tkinter import ttk
 
-# 캐시 관련 전역 변수
-_prompt_cache = {}
-_prompt_cache_timestamp = {}
-_cache_lock = threading.Lock()
+# 파일 변경 확인 최소 간격 (초) - 행마다 디렉토리를 다시 훑지 않도록 제한
+REGISTRY_CHECK_INTERVAL = 1.0
+
+class PromptRegistry:
+    """
+    프롬프트 레지스트리
+    
+    prompts/ 디렉토리의 JSON 파일을 한 번 읽어 유형별로 색인해 두고,
+    파일별 수정 시간/크기가 바뀐 파일만 다시 읽습니다.
+    프롬프트 탭에서 저장/삭제할 때는 update_file/remove_file로 즉시 반영합니다.
+    """
+    
+    def __init__(self, prompt_dir="prompts", check_interval=REGISTRY_CHECK_INTERVAL):
+        self.prompt_dir = prompt_dir
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._files = {}        # 파일 이름 -> (수정 시간, 크기, 프롬프트 항목 또는 None)
+        self._by_type = None    # 유형 -> 우선순위 순 프롬프트 항목 목록
+        self._last_check = None
+    
+    @staticmethod
+    def _make_entry(file, data):
+        """JSON 데이터를 프롬프트 항목으로 변환"""
+        # 유형 확인 (문자열로 된 경우 리스트로 변환)
+        prompt_types = data.get("type", [])
+        if isinstance(prompt_types, str):
+            prompt_types = [prompt_types]
+        elif not isinstance(prompt_types, list):
+            prompt_types = []
+        
+        return {
+            # 파일 이름에서 .json 제거
+            "prompt_name": data.get("prompt_name", file[:-5]),
+            "priority": data.get("priority", 999),
+            "template": data.get("template", ""),
+            "type": prompt_types,
+            "data": data
+        }
+    
+    def _load_file(self, file, signature):
+        """파일 1개 로드 (실패 시 None 항목으로 기록해 같은 버전을 반복해서 읽지 않음)"""
+        try:
+            with open(os.path.join(self.prompt_dir, file), "r", encoding="utf-8") as f:
+                entry = self._make_entry(file, json.load(f))
+        except Exception as e:
+            print(f"프롬프트 파일 로드 실패: {file} - {str(e)}")
+            entry = None
+        self._files[file] = signature + (entry,)
+    
+    def _refresh(self, force=False):
+        """변경된 파일만 다시 로드 (잠금 보유 상태에서 호출)"""
+        now = time.monotonic()
+        if not force and self._last_check is not None and now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        
+        if not os.path.exists(self.prompt_dir):
+            os.makedirs(self.prompt_dir, exist_ok=True)
+        
+        seen = set()
+        changed = False
+        for item in os.scandir(self.prompt_dir):
+            if not item.name.endswith(".json") or not item.is_file():
+                continue
+            seen.add(item.name)
+            stat = item.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+            cached = self._files.get(item.name)
+            if cached is None or cached[:2] != signature:
+                self._load_file(item.name, signature)
+                changed = True
+        
+        for file in set(self._files) - seen:
+            del self._files[file]
+            changed = True
+        
+        if changed or self._by_type is None:
+            self._rebuild_index()
+    
+    def _rebuild_index(self):
+        """유형별 색인 재구성 (우선순위 기준 정렬)"""
+        by_type = {}
+        for _, _, entry in self._files.values():
+            if entry is None:
+                continue
+            for prompt_type in entry["type"]:
+                by_type.setdefault(prompt_type, []).append(entry)
+        for entries in by_type.values():
+            entries.sort(key=lambda x: x["priority"])
+        self._by_type = by_type
+    
+    def get_prompts(self, prompt_type):
+        """지정된 유형의 프롬프트 항목 목록 (우선순위 순)"""
+        with self._lock:
+            try:
+                self._refresh()
+            except Exception as e:
+                print(f"프롬프트 로드 중 예기치 않은 오류: {str(e)}")
+            return list((self._by_type or {}).get(prompt_type, []))
+    
+    def update_file(self, file, data):
+        """저장된 프롬프트 파일을 레지스트리에 즉시 반영"""
+        path = os.path.join(self.prompt_dir, file)
+        with self._lock:
+            try:
+                stat = os.stat(path)
+                signature = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                signature = (0, 0)
+            self._files[file] = signature + (self._make_entry(file, data),)
+            self._rebuild_index()
+    
+    def remove_file(self, file):
+        """삭제된 프롬프트 파일을 레지스트리에서 즉시 제거"""
+        with self._lock:
+            if self._files.pop(file, None) is not None:
+                self._rebuild_index()
+    
+    def invalidate(self):
+        """다음 조회 시 모든 파일을 다시 확인하도록 표시"""
+        with self._lock:
+            self._last_check = None
+
+_registries = {}
+_registry_lock = threading.Lock()
+
+def get_prompt_registry(prompt_dir="prompts"):
+    """프롬프트 디렉토리(절대 경로 기준)별 공용 레지스트리 반환"""
+    key = os.path.abspath(prompt_dir)
+    with _registry_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = PromptRegistry(key)
+            _registries[key] = registry
+        return registry
 
 def load_prompts_by_type(prompt_type, as_dict=False, include_metadata=False):
     """
-    지정된 유형의 프롬프트를 로드합니다.
+    지정된 유형의 프롬프트를 로드합니다. (PromptRegistry에서 조회)
     
     Args:
         prompt_type: 프롬프트 유형 ("remark" 또는 "chat")
@@ -22,94 +153,18 @@ def load_prompts_by_type(prompt_type, as_dict=False, include_metadata=False):
     Returns:
         프롬프트 목록 또는 딕셔너리
     """
-    prompt_dir = "prompts"
-    if not os.path.exists(prompt_dir):
-        os.makedirs(prompt_dir, exist_ok=True)
-        return {} if as_dict else []
-
-    result = {} if as_dict else []
-    all_prompts = []
-    
-    try:
-        # 모든 프롬프트 파일 로드
-        for file in os.listdir(prompt_dir):
-            if not file.endswith(".json"):
-                continue
-                
-            try:
-                with open(os.path.join(prompt_dir, file), "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    
-                    # 파일 이름에서 .json 제거
-                    prompt_name = data.get("prompt_name", file[:-5])
-                    
-                    # 유형 확인 (문자열로 된 경우 리스트로 변환)
-                    prompt_types = data.get("type", [])
-                    if isinstance(prompt_types, str):
-                        prompt_types = [prompt_types]
-                    elif not isinstance(prompt_types, list):
-                        prompt_types = []
-                        
-                    # 지정된 유형이 있는지 확인
-                    if prompt_type in prompt_types:
-                        priority = data.get("priority", 999)
-                        template = data.get("template", "")
-                        
-                        if include_metadata:
-                            all_prompts.append({
-                                "prompt_name": prompt_name,
-                                "priority": priority,
-                                "template": template,
-                                "type": prompt_types,
-                                "data": data
-                            })
-                        else:
-                            all_prompts.append({
-                                "prompt_name": prompt_name,
-                                "priority": priority,
-                                "template": template
-                            })
-            except Exception as e:
-                print(f"프롬프트 파일 로드 실패: {file} - {str(e)}")
-                
-        # 우선순위 기준으로 정렬
-        all_prompts.sort(key=lambda x: x["priority"])
-        
-        # 반환 형태에 맞게 처리
-        if as_dict:
-            for prompt in all_prompts:
-                prompt_name = prompt["prompt_name"]
-                if include_metadata:
-                    result[prompt_name] = prompt["data"]
-                else:
-                    result[prompt_name] = prompt["template"]
-        else:
-            result = [prompt["template"] for prompt in all_prompts]
-    except Exception as e:
-        print(f"프롬프트 로드 중 예기치 않은 오류: {str(e)}")
+    all_prompts = get_prompt_registry().get_prompts(prompt_type)
     
-    return result
+    # 반환 형태에 맞게 처리
+    if as_dict:
+        if include_metadata:
+            return {prompt["prompt_name"]: prompt["data"] for prompt in all_prompts}
+        return {prompt["prompt_name"]: prompt["template"] for prompt in all_prompts}
+    return [prompt["template"] for prompt in all_prompts]
 
 def load_prompts_by_type_cached(prompt_type, as_dict=False, include_metadata=False):
-    """캐싱된 프롬프트 로더"""
-    global _prompt_cache, _prompt_cache_timestamp, _cache_lock
-    
-    cache_key = f"{prompt_type}_{as_dict}_{include_metadata}"
-    
-    with _cache_lock:
-        # 캐시 유효성 검사
-        if cache_key in _prompt_cache:
-            # 디렉토리의 최신 수정 시간 확인
-            dir_mtime = os.path.getmtime("prompts") if os.path.exists("prompts") else 0
-            if dir_mtime <= _prompt_cache_timestamp.get(cache_key, 0):
-                return _prompt_cache[cache_key]
-        
-        # 캐시 없거나 만료됨 - 다시 로드
-        result = load_prompts_by_type(prompt_type, as_dict, include_metadata)
-        _prompt_cache[cache_key] = result
-        _prompt_cache_timestamp[cache_key] = time.time()
-        
-        return result
+    """캐싱된 프롬프트 로더 (하위 호환용 - load_prompts_by_type도 레지스트리를 사용)"""
+    return load_prompts_by_type(prompt_type, as_dict, include_metadata)
 
 # 스레드 기반 처리 함수
 def run_in_background(func, callback=None, error_handler=None, *args, **kwargs):
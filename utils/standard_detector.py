@@ -195,6 +195,7 @@ def get_standard_info(standard_id):
 def enhance_detection_with_ai(file_path, text_content):
     """AI 기반 규격 감지 향상"""
     from api.gemini import call_gemini
+    from api.generation_profiles import PROFILE_ANALYZER_JSON
     
     # 복합적 프롬프트 작성
     prompt = f"""
@@ -224,7 +225,7 @@ def enhance_detection_with_ai(file_path, text_content):
 """
     
     try:
-        response = call_gemini(prompt)
+        response = call_gemini(prompt, profile=PROFILE_ANALYZER_JSON)
         
         # JSON 응답 추출
         import re